@@ -0,0 +1,82 @@
+"""
+Micro-benchmark — bootstrap del IVB (/api/ivb/{id}/uncertainty).
+Compara el remuestreo por patrones (services/ivb_bootstrap) con el remuestreo
+directo de índices de fila, sobre un proyecto sintético sin base de datos.
+Ejecutar (desde backend/): python benchmarks/bench_bootstrap.py [filas] [replicas]
+"""
+import os, sys, random, time
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import numpy as np
+from services import ivb_engine, ivb_bootstrap
+from services.lexicon import INDECISION, CONDITIONAL
+
+_TIPOS_EMOCION = ["ira", "miedo", "frustracion", "esperanza", "desconfianza", "orgullo"]
+_TIPOS_NARRATIVA = ["dominante", "emergente", "contrarrelato"]
+_TIPOS_COMUNIDAD = ["activo", "polarizado", "amplificador", "silencioso"]
+
+
+def _proyecto(filas: int, rng: random.Random) -> dict:
+    """Columnas sintéticas con `filas` repartidas entre las tablas remuestreadas."""
+    frase = lambda: rng.choice(["el gobierno no cumple", "suben los precios"] + INDECISION + CONDITIONAL)
+    n_nar, n_emo, n_len, n_com = filas // 4, filas // 2, filas // 5, filas // 20
+    data = {
+        "narrativas": {"project_id": [1] * n_nar, "texto": [frase() for _ in range(n_nar)],
+                       "tipo": [rng.choice(_TIPOS_NARRATIVA) for _ in range(n_nar)],
+                       "peso": [rng.randint(1, 10) for _ in range(n_nar)]},
+        "emociones": {"project_id": [1] * n_emo, "tipo": [rng.choice(_TIPOS_EMOCION) for _ in range(n_emo)],
+                      "intensidad": [round(rng.uniform(1, 10), 1) for _ in range(n_emo)]},
+        "lenguaje": {"project_id": [1] * n_len, "termino": [frase() for _ in range(n_len)],
+                     "contexto": [frase() for _ in range(n_len)],
+                     "frecuencia": [rng.randint(1, 50) for _ in range(n_len)]},
+        "comunidades": {"project_id": [1] * n_com, "tipo": [rng.choice(_TIPOS_COMUNIDAD) for _ in range(n_com)],
+                        "tamanio_estimado": [rng.randint(10, 5000) for _ in range(n_com)],
+                        "influencia": [rng.randint(1, 10) for _ in range(n_com)]},
+        "arquetipos": {"project_id": [], "peso_relativo": [], "emocion_dominante": []},
+        "riesgos": {"project_id": [], "velocidad_crecimiento": [], "activo": []},
+    }
+    return {t: ivb_engine.to_columns(t, d) for t, d in data.items()}
+
+
+def _por_indices(cols: dict, b: int, rng: np.random.Generator, bloque: int = 50) -> dict:
+    """Referencia: sortea índices de fila (b × n) por bloques de réplicas."""
+    s = {c: np.zeros(b) for c in ivb_engine.CAMPOS}
+    for tabla, c in cols.items():
+        n = len(c["project_id"])
+        if n == 0:
+            continue
+        aportes = ivb_engine.contribuciones(tabla, c)
+        m = np.column_stack(list(aportes.values()))
+        for i in range(0, b, bloque):
+            k = min(bloque, b - i)
+            sumas = m[rng.integers(0, n, size=(k, n))].sum(axis=1)
+            for j, campo in enumerate(aportes):
+                s[campo][i:i + k] += sumas[:, j]
+    return s
+
+
+def _medir(fn, *args, repeticiones=3):
+    mejor, out = float("inf"), None
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        out = fn(*args)
+        mejor = min(mejor, time.perf_counter() - t0)
+    return mejor, out
+
+
+if __name__ == "__main__":
+    filas = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    b = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    cols = _proyecto(filas, random.Random(42))
+    n = sum(len(c["project_id"]) for c in cols.values())
+
+    rng = np.random.default_rng(1)
+    t_pat, s_pat = _medir(lambda: ivb_bootstrap.replicas(ivb_bootstrap.patrones(cols), b, rng))
+    t_idx, s_idx = _medir(_por_indices, cols, b, np.random.default_rng(1), repeticiones=1)
+    ivb_pat = ivb_engine.indice(ivb_engine.componentes(s_pat))
+    ivb_idx = ivb_engine.indice(ivb_engine.componentes(s_idx))
+
+    print(f"Filas: {n:,}   réplicas: {b:,}")
+    print(f"  índices de fila     {t_idx * 1000:9.1f} ms   IVB {ivb_idx.mean():.2f} ± {ivb_idx.std():.3f}")
+    print(f"  patrones (actual)   {t_pat * 1000:9.1f} ms   IVB {ivb_pat.mean():.2f} ± {ivb_pat.std():.3f}"
+          f"   ({t_idx / t_pat:.0f}x)")
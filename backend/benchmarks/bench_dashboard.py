@@ -0,0 +1,78 @@
+"""
+Micro-benchmark — /api/dashboard: consultas secuenciales vs. una sola consulta.
+Usa una base SQLite temporal con los datos de seed_gobierno y agrega una
+latencia fija por consulta para simular el viaje de ida y vuelta a un
+PostgreSQL remoto (el costo que domina en producción).
+Ejecutar (desde backend/): python benchmarks/bench_dashboard.py [latencias_ms ...]
+"""
+import os, sys, tempfile, time, contextlib, io, inspect
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+_DB = os.path.join(tempfile.mkdtemp(), "bench_dashboard.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{_DB}"
+
+from sqlalchemy import event, func
+from database import SessionLocal, engine
+from models.project import Project
+from models.narrative import Narrative
+from models.emotion import Emotion
+from models.archetype import Archetype
+from models.language_code import LanguageCode
+from models.community import Community
+from models.risk import Risk
+from routes.dashboard import get_dashboard
+
+
+# Implementación previa: una consulta por dato (13 viajes)
+def _previo(project_id, db):
+    p = db.query(Project).filter(Project.id == project_id).first()
+    totales = {M.__tablename__: db.query(func.count(M.id)).filter(M.project_id == project_id).scalar()
+               for M in (Narrative, Emotion, Archetype, LanguageCode, Community)}
+    riesgos = {n: db.query(func.count(Risk.id)).filter(Risk.project_id == project_id, Risk.nivel == n,
+                                                      Risk.activo == True).scalar()
+               for n in ("rojo", "amarillo", "verde")}
+    emociones = db.query(Emotion.tipo, func.avg(Emotion.intensidad), func.count(Emotion.id)) \
+                  .filter(Emotion.project_id == project_id).group_by(Emotion.tipo).all()
+    narrativas = db.query(Narrative.tipo, func.count(Narrative.id)) \
+                   .filter(Narrative.project_id == project_id).group_by(Narrative.tipo).all()
+    arquetipos = db.query(Archetype).filter(Archetype.project_id == project_id) \
+                   .order_by(Archetype.peso_relativo.desc()).limit(5).all()
+    criticos = db.query(Risk).filter(Risk.project_id == project_id, Risk.nivel == "rojo", Risk.activo == True) \
+                 .order_by(Risk.velocidad_crecimiento.desc()).limit(5).all()
+    return p, totales, riesgos, emociones, narrativas, arquetipos, criticos
+
+
+_latencia = {"s": 0.0, "consultas": 0}
+
+@event.listens_for(engine, "before_cursor_execute")
+def _viaje(conn, cursor, statement, parameters, context, executemany):
+    _latencia["consultas"] += 1
+    if _latencia["s"]:
+        time.sleep(_latencia["s"])
+
+
+def _medir(fn, pid, repeticiones=20):
+    db = SessionLocal()
+    fn(pid, db)   # calentamiento (contadores, caché de sentencias)
+    _latencia["consultas"] = 0
+    t0 = time.perf_counter()
+    for _ in range(repeticiones):
+        fn(pid, db)
+        db.rollback()
+    db.close()
+    return (time.perf_counter() - t0) / repeticiones, _latencia["consultas"] / repeticiones
+
+
+if __name__ == "__main__":
+    latencias = [float(a) for a in sys.argv[1:]] or [0, 1, 5]
+    with contextlib.redirect_stdout(io.StringIO()):
+        import seed_gobierno
+    pid = SessionLocal().query(Project.id).scalar()
+
+    print(f"{'latencia':>9} | {'previo':>18} | {'una consulta':>18} | mejora")
+    for ms in latencias:
+        _latencia["s"] = ms / 1000
+        t_old, q_old = _medir(_previo, pid)
+        t_new, q_new = _medir(inspect.unwrap(get_dashboard), pid)   # sin la caché de resultados
+        print(f"{ms:7.1f}ms | {t_old * 1000:8.2f} ms ({q_old:4.1f} q) | "
+              f"{t_new * 1000:8.2f} ms ({q_new:4.1f} q) | {t_old / t_new:5.1f}x")
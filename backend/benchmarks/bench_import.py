@@ -0,0 +1,150 @@
+"""
+Micro-benchmark — importación de Excel (services/excel_parser.py).
+  escritura  un objeto del ORM por fila (db.add + flush, la implementación
+             previa) vs. masivo.insertar (INSERT de varias filas por lote)
+  validación coerción de una hoja ya leída: celda por celda con iterrows (la
+             implementación previa) vs. por columnas (_Hoja)
+  completa   parse_excel sobre un libro generado, en filas/s
+  hojas      libro con las seis hojas: lectura y validación en el mismo hilo
+             (procesos=1) vs. una hoja por proceso; la ganancia depende de
+             los núcleos disponibles (con uno solo, los procesos sólo suman
+             su arranque)
+Usa una base SQLite temporal; las tablas derivadas se mantienen en ambos
+casos (por el flush o por el ChangeSet).
+Ejecutar (desde backend/): python benchmarks/bench_import.py [filas]
+"""
+import os, sys, tempfile, time, datetime, random
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+_DIR = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_DIR, 'bench_import.db')}"
+
+import pandas as pd
+from database import SessionLocal, create_tables
+from models.project import Project
+from models.emotion import Emotion
+from services import masivo
+from services.excel_parser import parse_excel, _Hoja, _parse_emociones
+
+
+def _columnas(pid, n, rng):
+    return {
+        "project_id": [pid] * n,
+        "tipo":       [rng.choice(["ira", "miedo", "esperanza", "frustracion"]) for _ in range(n)],
+        "intensidad": [float(rng.randint(1, 10)) for _ in range(n)],
+        "fuente":     [rng.choice(["twitter", "radio", None]) for _ in range(n)],
+        "fecha":      [datetime.date(2026, 1, 1) + datetime.timedelta(days=rng.randint(0, 90)) for _ in range(n)],
+        "notas":      ["comentario de ejemplo"] * n,
+    }
+
+
+def _proyecto(db, nombre):
+    p = Project(nombre=nombre)
+    db.add(p)
+    db.commit()
+    return p.id
+
+
+def _orm(db, cols):
+    nombres = list(cols)
+    for valores in zip(*cols.values()):
+        db.add(Emotion(**dict(zip(nombres, valores))))
+    db.commit()
+
+
+def _masivo(db, cols):
+    masivo.insertar(db, Emotion, cols)
+    db.commit()
+
+
+# Coerción previa: una llamada por celda
+def _safe(conv, val, default):
+    try:
+        if pd.isna(val): return default
+        return conv(val)
+    except Exception:
+        return default
+
+
+def _previo(df, pid):
+    filas = []
+    for _, row in df.iterrows():
+        tipo = _safe(lambda v: str(v).strip() or None, row.get("tipo"), None)
+        if not tipo: continue
+        filas.append((pid, tipo.lower(), _safe(float, row.get("intensidad"), 5.0),
+                      _safe(lambda v: str(v).strip() or None, row.get("fuente"), None),
+                      _safe(lambda v: pd.to_datetime(v).date(), row.get("fecha"), None),
+                      _safe(lambda v: str(v).strip() or None, row.get("notas"), None)))
+    return filas
+
+
+def _hoja(n, rng):
+    return pd.DataFrame({
+        "tipo":       [rng.choice(["Ira", "miedo ", "esperanza", None]) for _ in range(n)],
+        "intensidad": [rng.choice([3, 7.5, "8", None]) for _ in range(n)],
+        "fuente":     [rng.choice(["Twitter", "Radio", None]) for _ in range(n)],
+        "fecha":      [rng.choice([datetime.date(2026, 1, 3), "2026-02-10", None]) for _ in range(n)],
+        "notas":      ["comentario de ejemplo"] * n,
+    })
+
+
+# Columnas de _hoja renombradas para cada hoja del template
+_HOJAS = {
+    "narrativas":  {"tipo": "texto", "intensidad": "peso"},
+    "emociones":   {},
+    "arquetipos":  {"tipo": "nombre", "intensidad": "peso_relativo", "fuente": "emocion"},
+    "lenguaje":    {"tipo": "termino", "intensidad": "frecuencia"},
+    "comunidades": {"tipo": "nombre", "intensidad": "influencia", "fuente": "plataforma"},
+    "riesgos":     {"tipo": "tema", "intensidad": "velocidad"},
+}
+
+
+def _libro(path, n, rng):
+    hoja = _hoja(n, rng)
+    with pd.ExcelWriter(path) as w:
+        hoja.to_excel(w, sheet_name="emociones", index=False)
+        hoja.rename(columns={"tipo": "termino", "intensidad": "frecuencia"}) \
+            .head(n // 5).to_excel(w, sheet_name="lenguaje", index=False)
+
+
+def _libro_completo(path, n, rng):
+    hoja = _hoja(n, rng)
+    with pd.ExcelWriter(path) as w:
+        for nombre, columnas in _HOJAS.items():
+            hoja.rename(columns=columnas).to_excel(w, sheet_name=nombre, index=False)
+
+
+if __name__ == "__main__":
+    filas = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    create_tables()
+    db = SessionLocal()
+    rng = random.Random(1)
+
+    print(f"escritura de {filas} emociones")
+    for nombre, fn in (("orm (db.add)", _orm), ("masivo.insertar", _masivo)):
+        cols = _columnas(_proyecto(db, nombre), filas, rng)
+        t0 = time.perf_counter()
+        fn(db, cols)
+        t = time.perf_counter() - t0
+        print(f"  {nombre:<16} {t:7.2f} s  {filas / t:10,.0f} filas/s")
+
+    df = _hoja(filas, rng)
+    print(f"\nvalidación de {filas} filas (hoja emociones ya leída)")
+    for nombre, fn in (("celda por celda", lambda: _previo(df, 1)),
+                       ("por columnas", lambda: _parse_emociones(_Hoja(df), 1))):
+        t0 = time.perf_counter()
+        fn()
+        print(f"  {nombre:<16} {time.perf_counter() - t0:7.3f} s")
+
+    path = os.path.join(_DIR, "libro.xlsx")
+    _libro(path, filas, rng)
+    r = parse_excel(path, _proyecto(db, "excel"), db)
+    print(f"\nparse_excel ({sum(r['importados'].values())} filas): "
+          f"{r['segundos']:.2f} s  {r['filas_por_segundo']:,} filas/s")
+
+    path = os.path.join(_DIR, "libro_completo.xlsx")
+    _libro_completo(path, filas, rng)
+    print(f"\nseis hojas de {filas} filas ({os.cpu_count()} CPU)")
+    for nombre, procesos in (("un hilo", 1), ("un proceso por hoja", len(_HOJAS))):
+        r = parse_excel(path, _proyecto(db, nombre), db, procesos=procesos)
+        print(f"  {nombre:<20} {r['segundos']:7.2f} s  {r['filas_por_segundo']:10,} filas/s")
@@ -0,0 +1,79 @@
+"""
+Micro-benchmark — serialización de respuestas (respuestas.py).
+Compara, para una página grande de /api/emotions y para /api/ivb y
+/api/ivb/{id}/series:
+  previo    jsonable_encoder + json de la biblioteca estándar (JSONResponse)
+  orjson    jsonable_encoder + orjson (RespuestaJSON, clase por defecto)
+  directo   orjson sin jsonable_encoder (@json_directo)
+y el tiempo de punta a punta de la ruta del listado con y sin ?fields=.
+Usa una base SQLite temporal con los datos de seed_gobierno más emociones
+sintéticas.
+Ejecutar (desde backend/): python benchmarks/bench_json.py [filas]
+"""
+import os, sys, tempfile, time, contextlib, io, datetime, random
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+_DB = os.path.join(tempfile.mkdtemp(), "bench_json.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{_DB}"
+
+from sqlalchemy import insert
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+from database import SessionLocal
+from models.project import Project
+from models.emotion import Emotion
+from respuestas import dumps
+
+
+def _medir(fn, repeticiones=20):
+    fn()   # calentamiento
+    t0 = time.perf_counter()
+    for _ in range(repeticiones):
+        fn()
+    return (time.perf_counter() - t0) / repeticiones
+
+
+def _serializaciones(contenido) -> dict:
+    return {
+        "previo":  _medir(lambda: JSONResponse(jsonable_encoder(contenido))),
+        "orjson":  _medir(lambda: dumps(jsonable_encoder(contenido))),
+        "directo": _medir(lambda: dumps(contenido)),
+    }
+
+
+if __name__ == "__main__":
+    filas = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    import main
+    with contextlib.redirect_stdout(io.StringIO()):
+        import seed_gobierno
+    db = SessionLocal()
+    pid = db.query(Project.id).scalar()
+    rng = random.Random(1)
+    db.execute(insert(Emotion), [
+        {"project_id": pid, "tipo": rng.choice(["ira", "miedo", "esperanza"]), "intensidad": rng.randint(1, 10),
+         "fuente": "twitter", "fecha": datetime.date(2026, 1, 1) + datetime.timedelta(days=rng.randint(0, 90)),
+         "notas": "comentario de ejemplo " * 4}
+        for _ in range(filas)
+    ])
+    db.commit()
+    db.close()
+
+    client = TestClient(main.app)
+    cargas = {
+        f"emotions ({filas} filas)": client.get(f"/api/emotions/{pid}", params={"limit": filas}).json(),
+        "ivb":                       client.get(f"/api/ivb/{pid}").json(),
+        "ivb/series":                client.get(f"/api/ivb/{pid}/series").json(),
+    }
+    print(f"{'respuesta':>22} | {'previo':>10} | {'orjson':>10} | {'directo':>10} | mejora")
+    for nombre, contenido in cargas.items():
+        t = _serializaciones(contenido)
+        print(f"{nombre:>22} | {t['previo'] * 1000:7.3f} ms | {t['orjson'] * 1000:7.3f} ms | "
+              f"{t['directo'] * 1000:7.3f} ms | {t['previo'] / t['directo']:5.1f}x")
+
+    print(f"\nGET /api/emotions/{pid}?limit={filas} de punta a punta")
+    for fields in (None, "id,tipo,intensidad,fecha"):
+        params = {"limit": filas, **({"fields": fields} if fields else {})}
+        t = _medir(lambda: client.get(f"/api/emotions/{pid}", params=params), repeticiones=10)
+        n = len(client.get(f"/api/emotions/{pid}", params=params).content)
+        print(f"  fields={fields or '(todos)':<26} {t * 1000:8.2f} ms  {n / 1024:8.1f} KiB")
@@ -0,0 +1,81 @@
+"""
+Micro-benchmark — matcher de léxicos del IVB vs. el `_has_kw` anterior.
+Simula el trabajo de una llamada a /api/ivb: indecisión por narrativa y, por
+código de lenguaje, indecisión + condicional sobre termino y contexto.
+Al final, el mismo `scan` por fila con léxicos 4 y 16 veces más grandes: el
+matcher recorre cada texto una vez, así que su costo no crece con la cantidad
+de palabras clave (el `_has_kw` previo hace una búsqueda por palabra).
+Ejecutar (desde backend/): python benchmarks/bench_lexicon.py [filas] [tasa_aciertos]
+"""
+import os, sys, random, time
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from services.lexicon import INDECISION, CONDITIONAL, MATCHER, KeywordMatcher
+
+# Implementación previa (routes/ivb.py antes del matcher)
+def _has_kw(text: str, keywords: list) -> bool:
+    t = (text or "").lower()
+    return any(k in t for k in keywords)
+
+_PALABRAS = (
+    "la gente dice que el gobierno no cumple con el pueblo mientras sube el precio "
+    "del combustible en las ciudades y el campo los transportistas bloquean carreteras "
+    "sin respuesta de las autoridades economía crisis dólar empleo salud educación "
+    "corrupción inseguridad vecinos redes"
+).split()
+
+def _texto(rng, n, tasa):
+    palabras = [rng.choice(_PALABRAS) for _ in range(n)]
+    if rng.random() < tasa:
+        palabras.insert(rng.randrange(n), rng.choice(INDECISION + CONDITIONAL))
+    return " ".join(palabras)
+
+def _previo(narrativas, terminos, contextos):
+    for t in narrativas:
+        _has_kw(t, INDECISION)
+    for termino, contexto in zip(terminos, contextos):
+        _has_kw(termino, INDECISION) or _has_kw(contexto, INDECISION)
+        _has_kw(termino, CONDITIONAL) or _has_kw(contexto, CONDITIONAL)
+
+def _por_fila(narrativas, terminos, contextos):
+    for t in narrativas:
+        MATCHER.scan(t)
+    for termino, contexto in zip(terminos, contextos):
+        MATCHER.scan(termino, contexto)
+
+def _por_columna(narrativas, terminos, contextos):
+    MATCHER.scan_many(narrativas)
+    MATCHER.scan_many(terminos, contextos)
+
+def _medir(fn, *args, repeticiones=5):
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        fn(*args)
+        mejor = min(mejor, time.perf_counter() - t0)
+    return mejor
+
+if __name__ == "__main__":
+    filas = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    tasa = float(sys.argv[2]) if len(sys.argv) > 2 else 0.10
+    rng = random.Random(42)
+    narrativas = [_texto(rng, 18, tasa) for _ in range(filas)]
+    terminos = [_texto(rng, 3, tasa) for _ in range(filas)]
+    contextos = [_texto(rng, 12, tasa) for _ in range(filas)]
+
+    t_old = _medir(_previo, narrativas, terminos, contextos)
+    print(f"Filas: {filas:,} narrativas + {filas:,} códigos de lenguaje (aciertos ~{tasa:.0%})")
+    print(f"  _has_kw (previo)            {t_old * 1000:8.1f} ms")
+    for nombre, fn in (("KeywordMatcher.scan", _por_fila), ("KeywordMatcher.scan_many", _por_columna)):
+        t = _medir(fn, narrativas, terminos, contextos)
+        print(f"  {nombre:<27} {t * 1000:8.1f} ms   ({t_old / t:.1f}x)")
+
+    print(f"\nPor fila sobre {filas:,} narrativas, según el tamaño de los léxicos")
+    for k in (1, 4, 16):
+        ind = INDECISION + [f"{w} {i}" for w in INDECISION for i in range(k - 1)]
+        cond = CONDITIONAL + [f"{w} {i}" for w in CONDITIONAL for i in range(k - 1)]
+        matcher = KeywordMatcher({"indecision": ind, "condicional": cond})
+        t_old = _medir(lambda: [(_has_kw(t, ind), _has_kw(t, cond)) for t in narrativas])
+        t_new = _medir(lambda: [matcher.scan(t) for t in narrativas])
+        print(f"  {len(ind) + len(cond):4} palabras  _has_kw {t_old * 1000:8.1f} ms   "
+              f"scan {t_new * 1000:8.1f} ms   ({t_old / t_new:.1f}x)")
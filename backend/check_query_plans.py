@@ -0,0 +1,158 @@
+"""
+Chequeo de planes de consulta de las rutas más usadas.
+
+Carga los datos de seed_gobierno en una base temporal (o usa DATABASE_URL con
+--base-actual), llama a cada ruta, captura sus SELECT y pide el plan de cada
+uno. Falla (código 1) si alguno recorre entera una tabla de datos por proyecto
+en lugar de buscar por índice:
+  SQLite      EXPLAIN QUERY PLAN → "SCAN <tabla>"
+  PostgreSQL  EXPLAIN con enable_seqscan = off → "Seq Scan on <tabla>"
+(en PostgreSQL se desalienta el Seq Scan porque con tablas chicas el
+planificador lo prefiere aunque haya índice: si aparece igual, no hay índice
+que sirva). En los listados paginados también falla si la página se ordena
+aparte en lugar de salir en el orden del índice:
+  SQLite      "USE TEMP B-TREE FOR ORDER BY"
+  PostgreSQL  nodo Sort (con enable_sort = off)
+Ejecutar (desde backend/): python check_query_plans.py [--base-actual]
+Sobre la base temporal también lo corre tests/test_query_plans.py.
+"""
+import os, sys, re, tempfile, contextlib, io
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+if __name__ == "__main__" and "--base-actual" not in sys.argv[1:]:
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'planes.db')}"
+
+from sqlalchemy import event
+from fastapi.testclient import TestClient
+from database import SessionLocal, engine
+from models.project import Project
+from services import result_cache
+
+# Tablas por proyecto: nunca deberían leerse completas en una ruta de proyecto
+TABLAS = {"narratives", "emotions", "archetypes", "language_codes", "communities", "risks",
+          "simulations", "ivb_stats", "lexical_features", "project_summaries", "data_versions",
+          "emotion_rollups"}
+
+RUTAS = [
+    "/api/projects/{pid}",
+    "/api/dashboard/{pid}",
+    "/api/ivb/{pid}",
+    "/api/ivb/{pid}?engine=columnar",
+    "/api/ivb/{pid}?engine=sql",
+    "/api/ivb/{pid}/series",
+    "/api/evolution/{pid}",
+    "/api/evolution/{pid}?granularidad=dia&desde=2026-01-01&hasta=2026-01-31",
+    "/api/emotions/{pid}/radar",
+    "/api/narratives/{pid}",
+    "/api/emotions/{pid}",
+    "/api/archetypes/{pid}",
+    "/api/language/{pid}",
+    "/api/communities/{pid}",
+    "/api/risks/{pid}",
+    "/api/ai/simulations/{pid}",
+    "/api/compare/?ids={pid}",
+]
+
+# Listados paginados por clave (services/paginacion.py)
+LISTADOS = {
+    "/api/narratives/{pid}",
+    "/api/emotions/{pid}",
+    "/api/archetypes/{pid}",
+    "/api/language/{pid}",
+    "/api/communities/{pid}",
+    "/api/risks/{pid}",
+    "/api/ai/simulations/{pid}",
+}
+
+_SCAN = {
+    "sqlite": re.compile(r"\bSCAN (\w+)"),
+    "postgresql": re.compile(r"Seq Scan on (\w+)"),
+}
+
+_ORDEN = {
+    "sqlite": re.compile(r"USE TEMP B-TREE FOR (RIGHT PART OF )?ORDER BY"),
+    "postgresql": re.compile(r"^\s*(->\s*)?(Incremental )?Sort\b"),
+}
+
+
+def _plan(conn, dialecto: str, sentencia: str, parametros) -> list:
+    if dialecto == "sqlite":
+        return [fila[-1] for fila in conn.exec_driver_sql("EXPLAIN QUERY PLAN " + sentencia, parametros)]
+    conn.exec_driver_sql("SET LOCAL enable_seqscan = off")
+    conn.exec_driver_sql("SET LOCAL enable_sort = off")
+    return [fila[0] for fila in conn.exec_driver_sql("EXPLAIN " + sentencia, parametros)]
+
+
+def capturar(client, pid) -> tuple:
+    """(capturadas, fallas): (ruta, es listado, sentencia, parámetros) de cada
+    SELECT emitido por las rutas, y las rutas que no responden 200."""
+    capturadas, fallas, ruta_actual = [], [], [None, False]
+
+    def _antes(conn, cursor, sentencia, parametros, context, executemany):
+        if sentencia.lstrip().upper().startswith(("SELECT", "WITH")) and not executemany:
+            capturadas.append((ruta_actual[0], ruta_actual[1], sentencia, parametros))
+
+    event.listen(engine, "before_cursor_execute", _antes)
+    try:
+        for ruta in RUTAS:
+            ruta_actual[0], ruta_actual[1] = ruta.format(pid=pid), ruta in LISTADOS
+            r = client.get(ruta_actual[0])
+            if r.status_code != 200:
+                fallas.append((ruta_actual[0], f"responde {r.status_code}", "", []))
+    finally:
+        event.remove(engine, "before_cursor_execute", _antes)
+    return capturadas, fallas
+
+
+def revisar(capturadas) -> list:
+    """(ruta, problema, sentencia, plan) de cada recorrido completo de una
+    tabla por proyecto y de cada página de un listado que se ordena aparte."""
+    dialecto = engine.dialect.name
+    patron, orden = _SCAN[dialecto], _ORDEN[dialecto]
+    fallas, vistas = [], set()
+    with engine.connect() as conn:
+        for ruta, listado, sentencia, parametros in capturadas:
+            if (ruta, sentencia) in vistas:
+                continue
+            vistas.add((ruta, sentencia))
+            with conn.begin():
+                plan = _plan(conn, dialecto, sentencia, parametros)
+            for linea in plan:
+                m = patron.search(linea)
+                if m and m.group(1) in TABLAS:
+                    fallas.append((ruta, f"recorre toda la tabla {m.group(1)}", sentencia, plan))
+                elif listado and "LIMIT" in sentencia and orden.search(linea):
+                    fallas.append((ruta, "ordena la página fuera del índice", sentencia, plan))
+    return fallas
+
+
+def chequear(client, pid) -> tuple:
+    """(consultas capturadas, fallas) de todas las RUTAS con el proyecto pid."""
+    # Las rutas con caché también tienen que llegar a la base
+    result_cache.CACHE.invalidar()
+    capturadas, fallas = capturar(client, pid)
+    return capturadas, fallas + revisar(capturadas)
+
+
+if __name__ == "__main__":
+    import main   # rutas (sin el evento de arranque: nada de reindexado en segundo plano)
+    from database import create_tables
+    create_tables()
+    db = SessionLocal()
+    if db.query(Project).count() == 0:
+        with contextlib.redirect_stdout(io.StringIO()):
+            import seed_gobierno
+    pid = db.query(Project.id).order_by(Project.id).limit(1).scalar()
+    db.close()
+
+    capturadas, fallas = chequear(TestClient(main.app), pid)
+    print(f"{len(RUTAS)} rutas, {len(capturadas)} consultas revisadas ({engine.dialect.name}).")
+    for ruta, problema, sentencia, plan in fallas:
+        print(f"\n✗ {ruta}: {problema}")
+        if sentencia:
+            print("  " + " ".join(sentencia.split())[:300])
+        for linea in plan:
+            print(f"    {linea}")
+    if fallas:
+        sys.exit(1)
+    print("✓ Ninguna ruta recorre completa una tabla por proyecto ni ordena aparte un listado.")
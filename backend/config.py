@@ -4,6 +4,13 @@ class Settings(BaseSettings):
     database_url: str = "sqlite:///./etnografica_gobierno.db"
     gemini_api_key: str = ""          # Gratis en: https://aistudio.google.com/apikey
     environment: str = "development"
+    result_cache_size: int = 512      # resultados analíticos en memoria (0 = sin caché)
+    result_cache_ttl: float = 300     # segundos; 0 = sin vencimiento
+    page_size_default: int = 500      # filas por página de los listados sin ?limit
+    page_size_max: int = 2000         # máximo aceptado en ?limit
+    bulk_max_rows: int = 10000        # filas por pedido en las rutas /bulk
+    import_workers: int = 2           # importaciones de Excel en paralelo (en SQLite siempre 1)
+    import_processes: int = 0         # procesos por importación para leer hojas en paralelo (0 = uno por CPU)
 
     class Config:
         env_file = ".env"
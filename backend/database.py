@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import declarative_base, sessionmaker
 from config import settings
 
@@ -20,6 +20,22 @@ engine = create_engine(db_url, connect_args=connect_args)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+@event.listens_for(SessionLocal, "after_flush")
+def _after_flush(session, flush_context):
+    # Tablas derivadas (estadísticos del IVB, ...) en la misma transacción
+    from services import changes
+    changes.after_flush(session)
+
+@event.listens_for(SessionLocal, "after_commit")
+def _after_commit(session):
+    from services import changes
+    changes.after_commit(session)
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _after_rollback(session):
+    from services import changes
+    changes.after_rollback(session)
+
 def get_db():
     db = SessionLocal()
     try:
@@ -29,3 +45,6 @@ def get_db():
 
 def create_tables():
     Base.metadata.create_all(bind=engine)
+    # create_all no modifica tablas que ya existen: el resto lo hacen las migraciones
+    import migrations
+    migrations.aplicar(engine)
@@ -0,0 +1,52 @@
+"""
+GET condicionales — ETag a partir de la versión de datos del proyecto.
+
+Dependencias para las rutas GET: calculan el ETag con una sola consulta a
+data_versions (services/data_version.py) y, si coincide con `If-None-Match`,
+responden 304 antes de ejecutar la ruta, sin tocar las tablas de datos. Si no
+coincide, agregan ETag y `Cache-Control: no-cache` a la respuesta para que el
+navegador revalide en la próxima lectura.
+
+    @router.get("/{project_id}", dependencies=[Depends(etag_proyecto)])
+"""
+import hashlib
+from typing import List
+from fastapi import Depends, HTTPException, Query, Request, Response
+from sqlalchemy.orm import Session
+from database import get_db
+from services import data_version
+from services.lexicon import LEXICON_VERSION
+
+
+def _etag(*partes) -> str:
+    # Los léxicos entran en la firma: el IVB cambia si cambian aunque los datos no
+    firma = ":".join(str(p) for p in partes + (LEXICON_VERSION,))
+    return f'W/"{hashlib.sha1(firma.encode()).hexdigest()[:20]}"'
+
+
+def _responder(request: Request, response: Response, etag: str):
+    enviado = request.headers.get("if-none-match")
+    if enviado:
+        candidatos = {e.strip().removeprefix("W/") for e in enviado.split(",")}
+        if "*" in candidatos or etag.removeprefix("W/") in candidatos:
+            raise HTTPException(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
+
+
+def etag_proyecto(project_id: int, request: Request, response: Response, db: Session = Depends(get_db)):
+    """Rutas de un proyecto (`/{project_id}`...)."""
+    # leida(): la caché de resultados arma su clave con esta misma versión
+    _responder(request, response, _etag("p", project_id, data_version.leida(db, project_id)))
+
+
+def etag_proyectos(request: Request, response: Response, db: Session = Depends(get_db)):
+    """Rutas que dependen de todos los proyectos (listado)."""
+    _responder(request, response, _etag("todos", *data_version.global_(db)))
+
+
+def etag_comparacion(request: Request, response: Response, ids: List[int] = Query(...),
+                     db: Session = Depends(get_db)):
+    """Comparación entre proyectos (`?ids=1&ids=2`)."""
+    versiones = data_version.get_many(db, dict.fromkeys(ids))
+    _responder(request, response, _etag("c", *sorted(versiones.items())))
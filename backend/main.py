@@ -4,9 +4,11 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
 from database import create_tables
-from routes import projects, upload, dashboard, narratives, emotions, archetypes, language, communities, risks, ai, evolution, ivb
+from respuestas import RespuestaJSON
+from routes import projects, upload, dashboard, narratives, emotions, archetypes, language, communities, risks, ai, evolution, ivb, compare
 
-app = FastAPI(title="Social Rank Bolivia — Gobierno Nacional API", version="1.0.0")
+app = FastAPI(title="Social Rank Bolivia — Gobierno Nacional API", version="1.0.0",
+              default_response_class=RespuestaJSON)
 
 app.add_middleware(
     CORSMiddleware,
@@ -14,6 +16,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Total-Count"],
 )
 
 @app.on_event("startup")
@@ -30,6 +33,22 @@ def startup():
             import seed_gobierno
     except Exception as e:
         print(f"[seed] Error: {e}")
+    # Rollup de emociones de los proyectos anteriores a la tabla
+    from database import SessionLocal
+    from services import emotion_rollup
+    db = SessionLocal()
+    try:
+        emotion_rollup.completar(db)
+    finally:
+        db.close()
+    # Índice léxico: completa lo que falte o quedó de otra versión de los léxicos
+    from services import lexical_index
+    lexical_index.iniciar_reindexado()
+
+@app.on_event("shutdown")
+def shutdown():
+    from services import importaciones
+    importaciones.cancelar_todos()
 
 # ── API routes ────────────────────────────────────────────────────────────
 app.include_router(projects.router,     prefix="/api/projects",     tags=["Proyectos"])
@@ -44,6 +63,13 @@ app.include_router(risks.router,        prefix="/api/risks",         tags=["Ries
 app.include_router(ai.router,           prefix="/api/ai",            tags=["IA"])
 app.include_router(evolution.router,    prefix="/api/evolution",     tags=["Evolución"])
 app.include_router(ivb.router,          prefix="/api/ivb",           tags=["IVB"])
+app.include_router(compare.router,      prefix="/api/compare",       tags=["Comparación"])
+
+@app.get("/api/cache/estado", tags=["Caché"])
+def cache_status():
+    """Entradas, aciertos y fallos de la caché de resultados analíticos."""
+    from services import result_cache
+    return result_cache.estado()
 
 # ── Servir frontend React (build estático) ────────────────────────────────
 _DIST = os.path.join(os.path.dirname(__file__), "..", "frontend", "dist")
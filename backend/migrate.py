@@ -0,0 +1,20 @@
+"""
+Migraciones de esquema (ver migrations/__init__.py).
+Ejecutar: python migrate.py            (crea tablas faltantes y aplica lo pendiente)
+          python migrate.py --estado   (sólo muestra aplicadas y pendientes)
+"""
+import sys
+sys.path.insert(0, '.')
+
+import models
+import migrations
+from database import create_tables, engine
+
+if "--estado" not in sys.argv[1:]:
+    create_tables()
+
+hechas = migrations.aplicadas(engine)
+for version, nombre in migrations.disponibles():
+    estado = f"aplicada {hechas[version]}" if version in hechas else "PENDIENTE"
+    print(f"  {nombre:<40} {estado}")
+print(f"Migraciones: {len(hechas)} aplicada(s), {len(migrations.pendientes(engine))} pendiente(s).")
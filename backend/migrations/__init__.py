@@ -0,0 +1,65 @@
+"""
+Migraciones de esquema versionadas.
+
+`create_tables()` (database.py) crea con create_all las tablas que faltan, con
+los índices tal como están en los modelos, y después aplica en orden las
+migraciones de este paquete que la base todavía no registró en
+schema_migrations. Así una base existente evoluciona sin borrarla.
+
+Cada migración es un módulo `vNNNN_descripcion.py` con `upgrade(conn)`, que
+corre dentro de una transacción junto con su registro. En una base nueva
+create_all ya dejó el esquema al día, así que las migraciones tienen que ser
+idempotentes (CREATE INDEX IF NOT EXISTS, columnas que se agregan sólo si
+faltan, ...). Estado y aplicación manual: python migrate.py
+"""
+import importlib
+import pkgutil
+import re
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, func, insert, select
+from sqlalchemy.exc import IntegrityError
+
+_metadata = MetaData()
+
+schema_migrations = Table(
+    "schema_migrations", _metadata,
+    Column("version", Integer, primary_key=True),
+    Column("nombre", String(200), nullable=False),
+    Column("aplicada_en", DateTime(timezone=True), server_default=func.now()),
+)
+
+_PATRON = re.compile(r"^v(\d{4})_\w+$")
+
+
+def disponibles() -> list:
+    """(versión, módulo) de todas las migraciones del paquete, en orden."""
+    return sorted((int(m.group(1)), info.name)
+                  for info in pkgutil.iter_modules(__path__)
+                  if (m := _PATRON.match(info.name)))
+
+
+def aplicadas(engine) -> dict:
+    """versión → fecha de aplicación."""
+    _metadata.create_all(engine)
+    with engine.connect() as conn:
+        return dict(conn.execute(select(schema_migrations.c.version, schema_migrations.c.aplicada_en)).all())
+
+
+def pendientes(engine) -> list:
+    hechas = aplicadas(engine)
+    return [(v, nombre) for v, nombre in disponibles() if v not in hechas]
+
+
+def aplicar(engine) -> list:
+    """Aplica las migraciones pendientes; devuelve los módulos aplicados."""
+    hechas = []
+    for version, nombre in pendientes(engine):
+        modulo = importlib.import_module(f"{__name__}.{nombre}")
+        try:
+            with engine.begin() as conn:
+                modulo.upgrade(conn)
+                conn.execute(insert(schema_migrations).values(version=version, nombre=nombre))
+        except IntegrityError:
+            # Otro proceso (otro worker al arrancar) la aplicó en paralelo
+            continue
+        hechas.append(nombre)
+    return hechas
@@ -0,0 +1,24 @@
+"""
+Índices compuestos (project_id, columna de filtro u orden) para las rutas por
+proyecto: listados ordenados por peso, frecuencia, influencia o fecha, series
+por fecha, riesgos críticos por nivel y velocidad, e historial de simulaciones.
+"""
+
+INDICES = [
+    ("ix_narratives_project_peso",           "narratives",      "project_id, peso"),
+    ("ix_narratives_project_tipo",           "narratives",      "project_id, tipo"),
+    ("ix_narratives_project_fecha",          "narratives",      "project_id, fecha_deteccion"),
+    ("ix_emotions_project_fecha",            "emotions",        "project_id, fecha"),
+    ("ix_archetypes_project_peso",           "archetypes",      "project_id, peso_relativo"),
+    ("ix_language_codes_project_frecuencia", "language_codes",  "project_id, frecuencia"),
+    ("ix_communities_project_influencia",    "communities",     "project_id, influencia"),
+    ("ix_risks_project_nivel",               "risks",           "project_id, nivel, velocidad_crecimiento"),
+    ("ix_risks_project_fecha",               "risks",           "project_id, fecha_deteccion"),
+    ("ix_simulations_project_created",       "simulations",     "project_id, created_at"),
+    ("ix_emotion_rollups_project_dia",       "emotion_rollups", "project_id, dia"),
+]
+
+
+def upgrade(conn):
+    for nombre, tabla, columnas in INDICES:
+        conn.exec_driver_sql(f"CREATE INDEX IF NOT EXISTS {nombre} ON {tabla} ({columnas})")
@@ -0,0 +1,16 @@
+"""
+Índice de expresiones para el listado de riesgos (routes/risks.py), que se
+ordena por gravedad (CASE sobre nivel) y crecimiento (coalesce de la
+velocidad): ver models/risk.py. Con el índice, cada página de la paginación
+por clave recorre el índice desde el cursor en lugar de ordenar todos los
+riesgos del proyecto. Las expresiones tienen que ser idénticas a las de la
+consulta.
+"""
+
+
+def upgrade(conn):
+    conn.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS ix_risks_project_gravedad ON risks (project_id, activo, "
+        "(CASE nivel WHEN 'rojo' THEN 0 WHEN 'amarillo' THEN 1 WHEN 'verde' THEN 2 ELSE 3 END), "
+        "coalesce(velocidad_crecimiento, 0) DESC, id)"
+    )
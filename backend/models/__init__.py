@@ -6,3 +6,8 @@ from .language_code import LanguageCode
 from .community import Community
 from .risk import Risk
 from .simulation import Simulation
+from .ivb_stats import IVBStats
+from .lexical_feature import LexicalFeature
+from .project_summary import ProjectSummary
+from .data_version import DataVersion
+from .emotion_rollup import EmotionRollup
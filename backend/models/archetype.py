@@ -1,9 +1,10 @@
-from sqlalchemy import Column, Integer, String, Text, Float, ForeignKey, DateTime, JSON
+from sqlalchemy import Column, Integer, String, Text, Float, ForeignKey, DateTime, JSON, Index
 from sqlalchemy.sql import func
 from database import Base
 
 class Archetype(Base):
     __tablename__ = "archetypes"
+    __table_args__ = (Index("ix_archetypes_project_peso", "project_id", "peso_relativo"),)
 
     id               = Column(Integer, primary_key=True, index=True)
     project_id       = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), nullable=False)
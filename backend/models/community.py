@@ -1,9 +1,10 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Index
 from sqlalchemy.sql import func
 from database import Base
 
 class Community(Base):
     __tablename__ = "communities"
+    __table_args__ = (Index("ix_communities_project_influencia", "project_id", "influencia"),)
 
     id               = Column(Integer, primary_key=True, index=True)
     project_id       = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), nullable=False)
@@ -0,0 +1,10 @@
+from sqlalchemy import Column, Integer, BigInteger, ForeignKey
+from database import Base
+
+class DataVersion(Base):
+    """Versión de los datos de cada proyecto (ver services/data_version.py).
+    Crece en cada escritura; de ella salen los ETag de las rutas GET."""
+    __tablename__ = "data_versions"
+
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), primary_key=True)
+    version    = Column(BigInteger, nullable=False)
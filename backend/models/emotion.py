@@ -1,9 +1,10 @@
-from sqlalchemy import Column, Integer, String, Text, Date, Float, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Text, Date, Float, ForeignKey, DateTime, Index
 from sqlalchemy.sql import func
 from database import Base
 
 class Emotion(Base):
     __tablename__ = "emotions"
+    __table_args__ = (Index("ix_emotions_project_fecha", "project_id", "fecha"),)
 
     id          = Column(Integer, primary_key=True, index=True)
     project_id  = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), nullable=False)
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, String, Date, Float, ForeignKey, Index
+from database import Base
+
+class EmotionRollup(Base):
+    """Emociones agregadas por proyecto, tipo, día y tramo de intensidad
+    (ver services/emotion_rollup.py). Se mantiene en cada escritura; radar,
+    dashboard, evolución y el componente emocional del IVB leen de aquí."""
+    __tablename__ = "emotion_rollups"
+    __table_args__ = (Index("ix_emotion_rollups_project_dia", "project_id", "dia"),)
+
+    project_id     = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), primary_key=True)
+    tipo           = Column(String(50), primary_key=True)
+    dia            = Column(Date, primary_key=True)       # SIN_FECHA para emociones sin fecha
+    tramo          = Column(Integer, primary_key=True)    # umbrales de esperanza del IVB; 0 en los demás tipos
+    n              = Column(Integer, nullable=False, default=0)
+    n_valor        = Column(Integer, nullable=False, default=0)   # con intensidad no nula
+    suma           = Column(Float, nullable=False, default=0.0)   # Σ intensidad (no nulas)
+    suma_cuadrados = Column(Float, nullable=False, default=0.0)   # Σ intensidad²
@@ -0,0 +1,42 @@
+from sqlalchemy import Column, Integer, Float, ForeignKey, DateTime
+from sqlalchemy.sql import func
+from database import Base
+
+class IVBStats(Base):
+    """Estadísticos suficientes del IVB por proyecto (ver services/ivb_engine.CAMPOS).
+    Se mantienen en cada escritura; el IVB se arma a partir de ellos en O(1)."""
+    __tablename__ = "ivb_stats"
+
+    project_id            = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), primary_key=True)
+    # Narrativas
+    narrativas            = Column(Float, default=0.0)
+    narr_indecision       = Column(Float, default=0.0)   # con vocabulario de indecisión
+    narr_volatiles        = Column(Float, default=0.0)   # emergente | contrarrelato
+    narr_condicionales    = Column(Float, default=0.0)   # emergente con peso 3-7
+    # Lenguaje (ponderado por frecuencia)
+    lenguaje              = Column(Float, default=0.0)
+    leng_frecuencia       = Column(Float, default=0.0)
+    leng_indecision       = Column(Float, default=0.0)
+    leng_condicional      = Column(Float, default=0.0)
+    # Emociones
+    emociones             = Column(Float, default=0.0)
+    blandas_n             = Column(Float, default=0.0)   # desconfianza | frustracion | miedo
+    blandas_suma          = Column(Float, default=0.0)
+    duras_n               = Column(Float, default=0.0)   # ira | orgullo
+    duras_suma            = Column(Float, default=0.0)
+    esperanza_n           = Column(Float, default=0.0)
+    esperanza_baja_n      = Column(Float, default=0.0)   # esperanza ≤ 6
+    esperanza_baja_suma   = Column(Float, default=0.0)
+    esperanza_cond_n      = Column(Float, default=0.0)   # esperanza 3-7
+    # Comunidades (peso = tamaño × influencia)
+    comunidades           = Column(Float, default=0.0)
+    comunidades_peso      = Column(Float, default=0.0)
+    comunidades_peso_tipo = Column(Float, default=0.0)
+    # Arquetipos
+    arquetipos            = Column(Float, default=0.0)
+    arquetipos_peso       = Column(Float, default=0.0)
+    arquetipos_blando     = Column(Float, default=0.0)
+    # Riesgos activos
+    riesgos               = Column(Float, default=0.0)
+    riesgos_velocidad     = Column(Float, default=0.0)
+    updated_at            = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -1,9 +1,10 @@
-from sqlalchemy import Column, Integer, String, Text, Date, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Text, Date, ForeignKey, DateTime, Index
 from sqlalchemy.sql import func
 from database import Base
 
 class LanguageCode(Base):
     __tablename__ = "language_codes"
+    __table_args__ = (Index("ix_language_codes_project_frecuencia", "project_id", "frecuencia"),)
 
     id               = Column(Integer, primary_key=True, index=True)
     project_id       = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), nullable=False)
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, String, Boolean, Text, ForeignKey, DateTime
+from sqlalchemy.sql import func
+from database import Base
+
+class LexicalFeature(Base):
+    """Coincidencias de léxicos precalculadas por narrativa o código de lenguaje
+    (ver services/lexical_index.py). `version` es la de services/lexicon.py al
+    momento de indexar; las filas con otra versión se reindexan."""
+    __tablename__ = "lexical_features"
+
+    tabla             = Column(String(20), primary_key=True)   # narrativas | lenguaje
+    fila_id           = Column(Integer, primary_key=True)      # id en narratives / language_codes
+    project_id        = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), nullable=False, index=True)
+    indecision        = Column(Boolean, default=False)
+    condicional       = Column(Boolean, default=False)
+    texto_normalizado = Column(Text)
+    version           = Column(String(16), nullable=False)
+    updated_at        = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -1,9 +1,14 @@
-from sqlalchemy import Column, Integer, String, Text, Date, Float, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Text, Date, Float, ForeignKey, DateTime, Index
 from sqlalchemy.sql import func
 from database import Base
 
 class Narrative(Base):
     __tablename__ = "narratives"
+    __table_args__ = (
+        Index("ix_narratives_project_peso", "project_id", "peso"),
+        Index("ix_narratives_project_tipo", "project_id", "tipo"),
+        Index("ix_narratives_project_fecha", "project_id", "fecha_deteccion"),
+    )
 
     id               = Column(Integer, primary_key=True, index=True)
     project_id       = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), nullable=False)
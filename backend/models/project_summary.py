@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, ForeignKey, DateTime
+from sqlalchemy.sql import func
+from database import Base
+
+class ProjectSummary(Base):
+    """Contadores por proyecto para el listado y el dashboard
+    (ver services/project_summary.py). Se mantienen en cada escritura."""
+    __tablename__ = "project_summaries"
+
+    project_id       = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), primary_key=True)
+    narrativas       = Column(Integer, default=0)
+    emociones        = Column(Integer, default=0)
+    arquetipos       = Column(Integer, default=0)
+    lenguaje         = Column(Integer, default=0)
+    comunidades      = Column(Integer, default=0)
+    # Riesgos activos
+    riesgos_activos  = Column(Integer, default=0)
+    riesgos_rojo     = Column(Integer, default=0)
+    riesgos_amarillo = Column(Integer, default=0)
+    riesgos_verde    = Column(Integer, default=0)
+    updated_at       = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
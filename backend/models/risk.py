@@ -1,9 +1,13 @@
-from sqlalchemy import Column, Integer, String, Text, Date, Boolean, ForeignKey, DateTime, JSON
+from sqlalchemy import Column, Integer, String, Text, Date, Boolean, ForeignKey, DateTime, JSON, Index, literal_column
 from sqlalchemy.sql import func
 from database import Base
 
 class Risk(Base):
     __tablename__ = "risks"
+    __table_args__ = (
+        Index("ix_risks_project_nivel", "project_id", "nivel", "velocidad_crecimiento"),
+        Index("ix_risks_project_fecha", "project_id", "fecha_deteccion"),
+    )
 
     id                      = Column(Integer, primary_key=True, index=True)
     project_id              = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), nullable=False)
@@ -15,3 +19,14 @@ class Risk(Base):
     fecha_deteccion         = Column(Date)
     activo                  = Column(Boolean, default=True)
     created_at              = Column(DateTime(timezone=True), server_default=func.now())
+
+# Orden del listado (routes/risks.py): rojo → amarillo → verde → otros y, dentro
+# de cada nivel, los que más crecen primero. Las constantes van escritas en el
+# SQL y no como parámetros para que la consulta coincida con el índice de
+# expresiones: así cada página recorre el índice en lugar de ordenar todos los
+# riesgos del proyecto.
+GRAVEDAD = literal_column("(CASE nivel WHEN 'rojo' THEN 0 WHEN 'amarillo' THEN 1 WHEN 'verde' THEN 2 ELSE 3 END)",
+                          Integer)
+CRECIMIENTO = literal_column("coalesce(velocidad_crecimiento, 0)", Integer)
+
+Index("ix_risks_project_gravedad", Risk.project_id, Risk.activo, GRAVEDAD, CRECIMIENTO.desc(), Risk.id)
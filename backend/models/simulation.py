@@ -1,9 +1,10 @@
-from sqlalchemy import Column, Integer, Text, ForeignKey, DateTime, JSON
+from sqlalchemy import Column, Integer, Text, ForeignKey, DateTime, JSON, Index
 from sqlalchemy.sql import func
 from database import Base
 
 class Simulation(Base):
     __tablename__ = "simulations"
+    __table_args__ = (Index("ix_simulations_project_created", "project_id", "created_at"),)
 
     id                  = Column(Integer, primary_key=True, index=True)
     project_id          = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), nullable=False)
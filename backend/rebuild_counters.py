@@ -0,0 +1,24 @@
+"""
+Reconstruye los contadores por proyecto (tabla project_summaries) y el rollup
+de emociones (emotion_rollups) a partir de las tablas de datos. Usar si los
+contadores quedaron desfasados, p. ej. tras cargar datos por SQL directo.
+Ejecutar: python rebuild_counters.py [project_id ...]   (sin ids: todos)
+"""
+import sys
+sys.path.insert(0, '.')
+
+import models
+from database import create_tables, SessionLocal
+from services import emotion_rollup, project_summary
+
+create_tables()
+db = SessionLocal()
+
+ids = [int(a) for a in sys.argv[1:]] or None
+conteos = project_summary.rebuild(db, ids)
+filas = emotion_rollup.rebuild(db, ids)
+db.close()
+
+for pid, c in sorted(conteos.items()):
+    print(f"  Proyecto {pid}: " + ", ".join(f"{k}={v}" for k, v in c.items()))
+print(f"Contadores reconstruidos: {len(conteos)} proyecto(s); rollup de emociones: {filas} fila(s).")
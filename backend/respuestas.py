@@ -0,0 +1,67 @@
+"""
+Respuestas JSON con orjson.
+
+`RespuestaJSON` es la clase de respuesta por defecto de la app (main.py):
+serializa con orjson, bastante más rápido que el json de la biblioteca
+estándar, con fechas, claves no str y tipos de numpy nativos. La salida es la
+misma (JSON compacto en UTF-8).
+
+Igual FastAPI pasa antes lo que devuelve cada ruta por jsonable_encoder, que
+recorre y copia todo el resultado en Python. Las rutas con respuestas grandes
+(listados, IVB, dashboard, evolución) se decoran con @json_directo: lo que
+devuelven va derecho a orjson, con las cabeceras que pusieron las
+dependencias (ETag, cursor de paginación).
+
+    @router.get("/{project_id}", dependencies=[Depends(etag_proyecto)])
+    @json_directo
+    @cacheada("ivb")
+    def get_ivb(...):
+"""
+import decimal
+import functools
+import inspect
+import orjson
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+_OPCIONES = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def _otros(v):
+    # numeric de PostgreSQL (AVG de enteros) y lo que orjson no conoce
+    if isinstance(v, decimal.Decimal):
+        return float(v)
+    if isinstance(v, (set, frozenset)):
+        return list(v)
+    return jsonable_encoder(v)
+
+
+def dumps(contenido) -> bytes:
+    return orjson.dumps(contenido, default=_otros, option=_OPCIONES)
+
+
+class RespuestaJSON(JSONResponse):
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+
+def json_directo(fn):
+    """Serializa el resultado de la ruta con orjson sin pasar por
+    jsonable_encoder. Agrega `response` a la firma si la ruta no lo pide,
+    para copiar las cabeceras y el código de estado de las dependencias."""
+    firma = inspect.signature(fn)
+    propio = "response" in firma.parameters
+
+    @functools.wraps(fn)
+    def envoltura(*args, **kwargs):
+        response = kwargs["response"] if propio else kwargs.pop("response")
+        resultado = fn(*args, **kwargs)
+        if isinstance(resultado, Response):
+            return resultado
+        return RespuestaJSON(resultado, status_code=response.status_code or 200, headers=response.headers)
+
+    if not propio:
+        extra = inspect.Parameter("response", inspect.Parameter.KEYWORD_ONLY, annotation=Response)
+        envoltura.__signature__ = firma.replace(parameters=[*firma.parameters.values(), extra])
+    return envoltura
@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from database import get_db
+from etags import etag_proyecto
 from models.project import Project
 from models.archetype import Archetype
 from models.emotion import Emotion
@@ -22,8 +23,8 @@ class RecommendRequest(BaseModel):
 def build_project_context(project_id: int, db: Session) -> dict:
     project = db.query(Project).filter(Project.id == project_id).first()
     arquetipos = db.query(Archetype).filter(Archetype.project_id == project_id).all()
-    emociones = db.query(Emotion).filter(Emotion.project_id == project_id).limit(30).all()
-    narrativas = db.query(Narrative).filter(Narrative.project_id == project_id).order_by(Narrative.peso.desc()).limit(10).all()
+    emociones = db.query(Emotion).filter(Emotion.project_id == project_id).order_by(Emotion.id).limit(30).all()
+    narrativas = db.query(Narrative).filter(Narrative.project_id == project_id).order_by(Narrative.peso.desc(), Narrative.id).limit(10).all()
     riesgos = db.query(Risk).filter(Risk.project_id == project_id, Risk.activo == True, Risk.nivel == "rojo").all()
     return {
         "proyecto": project.nombre if project else "Desconocido",
@@ -55,7 +56,7 @@ def recommend(req: RecommendRequest, db: Session = Depends(get_db)):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.get("/simulations/{project_id}")
+@router.get("/simulations/{project_id}", dependencies=[Depends(etag_proyecto)])
 def list_simulations(project_id: int, db: Session = Depends(get_db)):
     items = db.query(Simulation).filter(Simulation.project_id == project_id).order_by(Simulation.created_at.desc()).limit(20).all()
     return [{"id": s.id, "mensaje": s.mensaje_propuesto, "resultado": s.resultado_json,
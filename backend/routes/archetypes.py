@@ -1,12 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Body, HTTPException, Response
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from typing import Optional, List
 from database import get_db
+from etags import etag_proyecto
+from respuestas import json_directo
 from models.archetype import Archetype
+from services import masivo, project_summary
+from services.paginacion import Pagina, cabeceras, paginar
+from services.proyeccion import Proyeccion, lista
 
 router = APIRouter()
 
+CAMPOS = {
+    "id": Archetype.id,
+    "nombre": Archetype.nombre,
+    "descripcion": Archetype.descripcion,
+    "peso_relativo": Archetype.peso_relativo,
+    "emocion_dominante": Archetype.emocion_dominante,
+    "canales": (Archetype.canales, lista),
+    "valores_clave": Archetype.valores_clave,
+    "miedos": Archetype.miedos,
+}
+
 class ArchetypeSchema(BaseModel):
     project_id: int
     nombre: str
@@ -17,12 +33,17 @@ class ArchetypeSchema(BaseModel):
     valores_clave: Optional[str] = None
     miedos: Optional[str] = None
 
-@router.get("/{project_id}")
-def list_archetypes(project_id: int, db: Session = Depends(get_db)):
-    items = db.query(Archetype).filter(Archetype.project_id == project_id).order_by(Archetype.peso_relativo.desc()).all()
-    return [{"id": a.id, "nombre": a.nombre, "descripcion": a.descripcion,
-             "peso_relativo": a.peso_relativo, "emocion_dominante": a.emocion_dominante,
-             "canales": a.canales or [], "valores_clave": a.valores_clave, "miedos": a.miedos} for a in items]
+ArchetypeSchemaParcial = masivo.esquema_parcial(ArchetypeSchema)
+
+@router.get("/{project_id}", dependencies=[Depends(etag_proyecto)])
+@json_directo
+def list_archetypes(project_id: int, response: Response, pagina: Pagina = Depends(),
+                    fields: Optional[str] = None, db: Session = Depends(get_db)):
+    proy = Proyeccion(CAMPOS, fields)
+    filas, siguiente = paginar(db.query(*proy.columnas).filter(Archetype.project_id == project_id),
+                               [(Archetype.peso_relativo, True), (Archetype.id, True)], pagina)
+    cabeceras(response, siguiente, project_summary.get(db, project_id)["arquetipos"] if pagina.total else None)
+    return [proy.fila(f) for f in filas]
 
 @router.post("/")
 def create_archetype(data: ArchetypeSchema, db: Session = Depends(get_db)):
@@ -30,6 +51,21 @@ def create_archetype(data: ArchetypeSchema, db: Session = Depends(get_db)):
     db.add(item); db.commit(); db.refresh(item)
     return {"id": item.id}
 
+@router.post("/bulk")
+def create_archetypes_bulk(data: List[ArchetypeSchema] = Body(..., max_length=masivo.MAX_FILAS), db: Session = Depends(get_db)):
+    """Alta de varias filas en una transacción (ver services/masivo.py)."""
+    return {"ids": masivo.crear(db, Archetype, [d.model_dump() for d in data])}
+
+@router.patch("/bulk")
+def update_archetypes_bulk(data: List[ArchetypeSchemaParcial] = Body(..., max_length=masivo.MAX_FILAS),
+                           db: Session = Depends(get_db)):
+    """Cada fila lleva su id y sólo los campos a cambiar."""
+    return {"modificados": masivo.modificar(db, Archetype, [d.model_dump(exclude_unset=True) for d in data])}
+
+@router.delete("/bulk")
+def delete_archetypes_bulk(ids: List[int] = Body(..., max_length=masivo.MAX_FILAS), db: Session = Depends(get_db)):
+    return {"borrados": masivo.borrar(db, Archetype, ids)}
+
 @router.put("/{item_id}")
 def update_archetype(item_id: int, data: ArchetypeSchema, db: Session = Depends(get_db)):
     item = db.query(Archetype).filter(Archetype.id == item_id).first()
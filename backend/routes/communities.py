@@ -1,12 +1,27 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Body, HTTPException, Response
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
-from typing import Optional
+from typing import Optional, List
 from database import get_db
+from etags import etag_proyecto
+from respuestas import json_directo
 from models.community import Community
+from services import masivo, project_summary
+from services.paginacion import Pagina, cabeceras, paginar
+from services.proyeccion import Proyeccion
 
 router = APIRouter()
 
+CAMPOS = {
+    "id": Community.id,
+    "plataforma": Community.plataforma,
+    "nombre_grupo": Community.nombre_grupo,
+    "tipo": Community.tipo,
+    "tamanio_estimado": Community.tamanio_estimado,
+    "descripcion": Community.descripcion,
+    "influencia": Community.influencia,
+}
+
 class CommunitySchema(BaseModel):
     project_id: int
     plataforma: Optional[str] = None
@@ -16,12 +31,17 @@ class CommunitySchema(BaseModel):
     descripcion: Optional[str] = None
     influencia: Optional[int] = 5
 
-@router.get("/{project_id}")
-def list_communities(project_id: int, db: Session = Depends(get_db)):
-    items = db.query(Community).filter(Community.project_id == project_id).order_by(Community.influencia.desc()).all()
-    return [{"id": c.id, "plataforma": c.plataforma, "nombre_grupo": c.nombre_grupo,
-             "tipo": c.tipo, "tamanio_estimado": c.tamanio_estimado,
-             "descripcion": c.descripcion, "influencia": c.influencia} for c in items]
+CommunitySchemaParcial = masivo.esquema_parcial(CommunitySchema)
+
+@router.get("/{project_id}", dependencies=[Depends(etag_proyecto)])
+@json_directo
+def list_communities(project_id: int, response: Response, pagina: Pagina = Depends(),
+                     fields: Optional[str] = None, db: Session = Depends(get_db)):
+    proy = Proyeccion(CAMPOS, fields)
+    filas, siguiente = paginar(db.query(*proy.columnas).filter(Community.project_id == project_id),
+                               [(Community.influencia, True), (Community.id, True)], pagina)
+    cabeceras(response, siguiente, project_summary.get(db, project_id)["comunidades"] if pagina.total else None)
+    return [proy.fila(f) for f in filas]
 
 @router.post("/")
 def create_community(data: CommunitySchema, db: Session = Depends(get_db)):
@@ -29,6 +49,21 @@ def create_community(data: CommunitySchema, db: Session = Depends(get_db)):
     db.add(item); db.commit(); db.refresh(item)
     return {"id": item.id}
 
+@router.post("/bulk")
+def create_communities_bulk(data: List[CommunitySchema] = Body(..., max_length=masivo.MAX_FILAS), db: Session = Depends(get_db)):
+    """Alta de varias filas en una transacción (ver services/masivo.py)."""
+    return {"ids": masivo.crear(db, Community, [d.model_dump() for d in data])}
+
+@router.patch("/bulk")
+def update_communities_bulk(data: List[CommunitySchemaParcial] = Body(..., max_length=masivo.MAX_FILAS),
+                            db: Session = Depends(get_db)):
+    """Cada fila lleva su id y sólo los campos a cambiar."""
+    return {"modificados": masivo.modificar(db, Community, [d.model_dump(exclude_unset=True) for d in data])}
+
+@router.delete("/bulk")
+def delete_communities_bulk(ids: List[int] = Body(..., max_length=masivo.MAX_FILAS), db: Session = Depends(get_db)):
+    return {"borrados": masivo.borrar(db, Community, ids)}
+
 @router.put("/{item_id}")
 def update_community(item_id: int, data: CommunitySchema, db: Session = Depends(get_db)):
     item = db.query(Community).filter(Community.id == item_id).first()
@@ -0,0 +1,91 @@
+"""
+Comparación entre proyectos — IVB, riesgos y radar emocional de varios
+proyectos a la vez (p. ej. Gobierno Nacional vs. Gobernación).
+
+Todo se trae con una consulta por tabla filtrada por `project_id IN (...)` y se
+agrupa por proyecto en una sola pasada NumPy, de modo que agregar proyectos no
+suma consultas.
+"""
+from typing import List
+import numpy as np
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from sqlalchemy import func
+from database import get_db
+from etags import etag_comparacion
+from respuestas import json_directo
+from models.project import Project
+from models.risk import Risk
+from services import ivb_engine
+from routes.ivb import _estado
+
+router = APIRouter()
+
+_NIVELES = ("rojo", "amarillo", "verde")
+
+
+def _por_proyecto(ids: np.ndarray, project_id: np.ndarray) -> np.ndarray:
+    """Posición en `ids` del proyecto de cada fila."""
+    orden = np.argsort(ids)
+    return orden[np.searchsorted(ids, project_id, sorter=orden)]
+
+
+def _radar(ids: np.ndarray, emociones: dict) -> list:
+    """Promedio de intensidad y cantidad por (proyecto, tipo), como en el dashboard."""
+    pos = _por_proyecto(ids, emociones["project_id"])
+    tipos, t = np.unique(emociones["tipo"], return_inverse=True)
+    clave = pos * len(tipos) + t
+    celdas = len(ids) * len(tipos)
+    intensidad = emociones["intensidad"]
+    con_valor = ~np.isnan(intensidad)
+    cuenta = np.bincount(clave, minlength=celdas).reshape(len(ids), -1)
+    n = np.bincount(clave[con_valor], minlength=celdas).reshape(len(ids), -1)
+    suma = np.bincount(clave[con_valor], weights=intensidad[con_valor], minlength=celdas).reshape(len(ids), -1)
+    return [
+        [{"tipo": str(tipos[j]) or None, "avg": round(float(suma[i, j] / n[i, j]), 1) if n[i, j] else 0, "count": int(cuenta[i, j])}
+         for j in np.flatnonzero(cuenta[i])]
+        for i in range(len(ids))
+    ]
+
+
+@router.get("/", dependencies=[Depends(etag_comparacion)])
+@json_directo
+def compare_projects(ids: List[int] = Query(..., description="ids de proyecto, p. ej. ?ids=1&ids=2"),
+                     db: Session = Depends(get_db)):
+    ids = list(dict.fromkeys(ids))
+    proyectos = {p.id: p for p in db.query(Project).filter(Project.id.in_(ids)).all()}
+    faltantes = [i for i in ids if i not in proyectos]
+    if faltantes:
+        raise HTTPException(status_code=404, detail=f"Proyecto no encontrado: {faltantes}")
+
+    # IVB de todos los proyectos en una pasada
+    cols = ivb_engine.load_columns(db, ids)
+    arr = np.asarray(ids, dtype=float)
+    comp = ivb_engine.componentes(ivb_engine.estadisticos_por_proyecto(cols, ids))
+    ivb = ivb_engine.indice(comp)
+
+    totales = {tabla: np.bincount(_por_proyecto(arr, c["project_id"]), minlength=len(ids))
+               for tabla, c in cols.items() if tabla != "riesgos"}
+    radar = _radar(arr, cols["emociones"])
+
+    # Riesgos activos por nivel
+    riesgos = {i: dict.fromkeys(_NIVELES, 0) for i in ids}
+    for pid, nivel, n in db.query(Risk.project_id, Risk.nivel, func.count(Risk.id)).filter(
+            Risk.project_id.in_(ids), Risk.activo == True, Risk.nivel.in_(_NIVELES)
+    ).group_by(Risk.project_id, Risk.nivel).all():
+        riesgos[pid][nivel] = n
+
+    resultado = []
+    for i, pid in enumerate(ids):
+        p = proyectos[pid]
+        score = round(float(ivb[i]), 1)
+        resultado.append({
+            "proyecto": {"id": p.id, "nombre": p.nombre, "cliente": p.cliente, "contexto_pais": p.contexto_pais},
+            "ivb": score,
+            "estado": _estado(score),
+            "componentes": {k: round(float(v[i]), 1) for k, v in comp.items()},
+            "totales": {tabla: int(n[i]) for tabla, n in totales.items()},
+            "riesgos": riesgos[pid],
+            "emociones_radar": radar[i],
+        })
+    return {"proyectos": resultado}
@@ -1,70 +1,120 @@
+"""
+Dashboard del proyecto.
+
+Todo el tablero sale de una sola consulta: un UNION ALL de secciones (datos
+del proyecto, contadores, emociones por tipo, narrativas por tipo, top de
+arquetipos y riesgos críticos) con la misma forma de fila, que se reparte en
+Python. Las emociones salen del rollup diario (services/emotion_rollup.py).
+Con una base remota es un único viaje de ida y vuelta en lugar de uno por
+consulta. Sólo se usan CAST, GROUP BY y subconsultas con LIMIT, así que corre
+igual en SQLite y en PostgreSQL.
+"""
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import Float, String, cast, func, literal, null, select, union_all
 from database import get_db
+from etags import etag_proyecto
+from respuestas import json_directo
 from models.project import Project
+from models.project_summary import ProjectSummary
 from models.narrative import Narrative
-from models.emotion import Emotion
+from models.emotion_rollup import EmotionRollup
 from models.archetype import Archetype
-from models.language_code import LanguageCode
-from models.community import Community
 from models.risk import Risk
+from services import emotion_rollup, project_summary
+from services.result_cache import cacheada
 
 router = APIRouter()
 
-@router.get("/{project_id}")
+_CONTADORES = ("narrativas", "emociones", "arquetipos", "lenguaje", "comunidades",
+               "riesgos_rojo", "riesgos_amarillo", "riesgos_verde")
+
+
+def _fila(seccion: str, t1=None, t2=None, t3=None, n1=None, n2=None) -> list:
+    """Columnas comunes a todas las secciones: 3 de texto y 2 numéricas."""
+    texto = [cast(x if x is not None else null(), String) for x in (t1, t2, t3)]
+    numero = [cast(x if x is not None else null(), Float) for x in (n1, n2)]
+    return [cast(literal(seccion), String)] + texto + numero
+
+
+def _consulta(project_id: int):
+    partes = [
+        select(*_fila("proyecto", Project.nombre, Project.cliente, Project.contexto_pais))
+        .where(Project.id == project_id),
+    ]
+    partes += [
+        select(*_fila("contador", literal(c, String), n1=getattr(ProjectSummary, c)))
+        .where(ProjectSummary.project_id == project_id)
+        for c in _CONTADORES
+    ]
+    partes += [
+        select(*_fila("emocion", EmotionRollup.tipo, n1=emotion_rollup.promedio(), n2=func.sum(EmotionRollup.n)))
+        .where(EmotionRollup.project_id == project_id).group_by(EmotionRollup.tipo),
+        select(*_fila("narrativa", Narrative.tipo, n1=func.count(Narrative.id)))
+        .where(Narrative.project_id == project_id).group_by(Narrative.tipo),
+    ]
+    top = select(Archetype.id, Archetype.nombre, Archetype.emocion_dominante, Archetype.peso_relativo) \
+        .where(Archetype.project_id == project_id) \
+        .order_by(Archetype.peso_relativo.desc()).limit(5).subquery()
+    criticos = select(Risk.id, Risk.tema, Risk.nivel, Risk.velocidad_crecimiento) \
+        .where(Risk.project_id == project_id, Risk.nivel == "rojo", Risk.activo == True) \
+        .order_by(Risk.velocidad_crecimiento.desc()).limit(5).subquery()
+    partes += [
+        select(*_fila("arquetipo", top.c.nombre, top.c.emocion_dominante, n1=top.c.peso_relativo, n2=top.c.id)),
+        select(*_fila("riesgo", criticos.c.tema, criticos.c.nivel, n1=criticos.c.velocidad_crecimiento, n2=criticos.c.id)),
+    ]
+    return union_all(*partes)
+
+
+def _por_clave(filas):
+    # Orden de GROUP BY: nulos primero, luego alfabético
+    return sorted(filas, key=lambda f: (f[1] is not None, f[1] or ""))
+
+
+def _por_valor(filas):
+    # ORDER BY n1 DESC (nulos al final); empates por id
+    return sorted(filas, key=lambda f: (f[4] is None, -(f[4] or 0), f[5]))
+
+
+def _entero(x):
+    return int(x) if x is not None else None
+
+
+@router.get("/{project_id}", dependencies=[Depends(etag_proyecto)])
+@json_directo
+@cacheada("dashboard")
 def get_dashboard(project_id: int, db: Session = Depends(get_db)):
-    p = db.query(Project).filter(Project.id == project_id).first()
-    if not p:
+    secciones = {}
+    for fila in db.execute(_consulta(project_id)).all():
+        secciones.setdefault(fila[0], []).append(fila)
+
+    if "proyecto" not in secciones:
         raise HTTPException(status_code=404, detail="Proyecto no encontrado")
+    _, nombre, cliente, contexto_pais, _, _ = secciones["proyecto"][0]
 
-    # Conteos generales
-    total_narrativas  = db.query(func.count(Narrative.id)).filter(Narrative.project_id == project_id).scalar()
-    total_emociones   = db.query(func.count(Emotion.id)).filter(Emotion.project_id == project_id).scalar()
-    total_arquetipos  = db.query(func.count(Archetype.id)).filter(Archetype.project_id == project_id).scalar()
-    total_lenguaje    = db.query(func.count(LanguageCode.id)).filter(LanguageCode.project_id == project_id).scalar()
-    total_comunidades = db.query(func.count(Community.id)).filter(Community.project_id == project_id).scalar()
-    riesgos_rojos     = db.query(func.count(Risk.id)).filter(Risk.project_id == project_id, Risk.nivel == "rojo", Risk.activo == True).scalar()
-    riesgos_amarillos = db.query(func.count(Risk.id)).filter(Risk.project_id == project_id, Risk.nivel == "amarillo", Risk.activo == True).scalar()
-    riesgos_verdes    = db.query(func.count(Risk.id)).filter(Risk.project_id == project_id, Risk.nivel == "verde", Risk.activo == True).scalar()
-
-    # Emociones promedio por tipo
-    emociones_avg = db.query(
-        Emotion.tipo,
-        func.avg(Emotion.intensidad).label("avg"),
-        func.count(Emotion.id).label("count")
-    ).filter(Emotion.project_id == project_id).group_by(Emotion.tipo).all()
-
-    # Narrativas por tipo
-    narrativas_tipo = db.query(
-        Narrative.tipo,
-        func.count(Narrative.id).label("count")
-    ).filter(Narrative.project_id == project_id).group_by(Narrative.tipo).all()
-
-    # Arquetipos top 5
-    arquetipos_top = db.query(Archetype).filter(
-        Archetype.project_id == project_id
-    ).order_by(Archetype.peso_relativo.desc()).limit(5).all()
-
-    # Riesgos activos críticos
-    riesgos_criticos = db.query(Risk).filter(
-        Risk.project_id == project_id,
-        Risk.nivel == "rojo",
-        Risk.activo == True
-    ).order_by(Risk.velocidad_crecimiento.desc()).limit(5).all()
+    # Conteos generales (contadores mantenidos en escritura; si el proyecto
+    # todavía no tiene fila, se construye)
+    if "contador" in secciones:
+        c = {f[1]: int(f[4]) for f in secciones["contador"]}
+    else:
+        c = project_summary.get(db, project_id)
 
     return {
-        "proyecto": {"id": p.id, "nombre": p.nombre, "cliente": p.cliente, "contexto_pais": p.contexto_pais},
+        "proyecto": {"id": project_id, "nombre": nombre, "cliente": cliente, "contexto_pais": contexto_pais},
         "totales": {
-            "narrativas": total_narrativas,
-            "emociones": total_emociones,
-            "arquetipos": total_arquetipos,
-            "lenguaje": total_lenguaje,
-            "comunidades": total_comunidades,
+            "narrativas": c["narrativas"],
+            "emociones": c["emociones"],
+            "arquetipos": c["arquetipos"],
+            "lenguaje": c["lenguaje"],
+            "comunidades": c["comunidades"],
         },
-        "riesgos": {"rojo": riesgos_rojos, "amarillo": riesgos_amarillos, "verde": riesgos_verdes},
-        "emociones_radar": [{"tipo": e.tipo, "avg": round(float(e.avg), 1), "count": e.count} for e in emociones_avg],
-        "narrativas_por_tipo": [{"tipo": n.tipo or "sin tipo", "count": n.count} for n in narrativas_tipo],
-        "arquetipos_top": [{"nombre": a.nombre, "peso": a.peso_relativo, "emocion": a.emocion_dominante} for a in arquetipos_top],
-        "riesgos_criticos": [{"tema": r.tema, "nivel": r.nivel, "velocidad": r.velocidad_crecimiento} for r in riesgos_criticos],
+        "riesgos": {"rojo": c["riesgos_rojo"], "amarillo": c["riesgos_amarillo"], "verde": c["riesgos_verde"]},
+        "emociones_radar": [{"tipo": f[1], "avg": round(f[4], 1) if f[4] is not None else 0, "count": int(f[5])}
+                            for f in _por_clave(secciones.get("emocion", []))],
+        "narrativas_por_tipo": [{"tipo": f[1] or "sin tipo", "count": int(f[4])}
+                                for f in _por_clave(secciones.get("narrativa", []))],
+        "arquetipos_top": [{"nombre": f[1], "peso": f[4], "emocion": f[2]}
+                           for f in _por_valor(secciones.get("arquetipo", []))],
+        "riesgos_criticos": [{"tema": f[1], "nivel": f[2], "velocidad": _entero(f[4])}
+                             for f in _por_valor(secciones.get("riesgo", []))],
     }
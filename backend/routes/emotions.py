@@ -1,14 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Body, HTTPException, Response
 from sqlalchemy.orm import Session
-from sqlalchemy import func
 from pydantic import BaseModel
-from typing import Optional
+from typing import Optional, List
 from datetime import date
 from database import get_db
+from etags import etag_proyecto
+from respuestas import json_directo
 from models.emotion import Emotion
+from services import emotion_rollup, masivo, project_summary
+from services.paginacion import Pagina, cabeceras, paginar
+from services.proyeccion import Proyeccion
+from services.result_cache import cacheada
 
 router = APIRouter()
 
+CAMPOS = {
+    "id": Emotion.id,
+    "tipo": Emotion.tipo,
+    "intensidad": Emotion.intensidad,
+    "fuente": Emotion.fuente,
+    "fecha": Emotion.fecha,
+    "notas": Emotion.notas,
+}
+
 class EmotionSchema(BaseModel):
     project_id: int
     tipo: str
@@ -17,20 +31,27 @@ class EmotionSchema(BaseModel):
     fecha: Optional[date] = None
     notas: Optional[str] = None
 
-@router.get("/{project_id}")
-def list_emotions(project_id: int, db: Session = Depends(get_db)):
-    items = db.query(Emotion).filter(Emotion.project_id == project_id).order_by(Emotion.fecha.desc()).all()
-    return [{"id": e.id, "tipo": e.tipo, "intensidad": e.intensidad, "fuente": e.fuente,
-             "fecha": str(e.fecha) if e.fecha else None, "notas": e.notas} for e in items]
+EmotionSchemaParcial = masivo.esquema_parcial(EmotionSchema)
+
+@router.get("/{project_id}", dependencies=[Depends(etag_proyecto)])
+@json_directo
+def list_emotions(project_id: int, response: Response, pagina: Pagina = Depends(),
+                  fields: Optional[str] = None, db: Session = Depends(get_db)):
+    proy = Proyeccion(CAMPOS, fields)
+    filas, siguiente = paginar(db.query(*proy.columnas).filter(Emotion.project_id == project_id),
+                               [(Emotion.fecha, True), (Emotion.id, True)], pagina)
+    cabeceras(response, siguiente, project_summary.get(db, project_id)["emociones"] if pagina.total else None)
+    return [proy.fila(f) for f in filas]
 
-@router.get("/{project_id}/radar")
+@router.get("/{project_id}/radar", dependencies=[Depends(etag_proyecto)])
+@json_directo
+@cacheada("radar")
 def radar_data(project_id: int, db: Session = Depends(get_db)):
-    TIPOS = ["ira", "miedo", "frustracion", "esperanza", "desconfianza", "orgullo"]
+    # Una consulta sobre el rollup (días × tipos), no sobre las emociones
+    por_tipo = emotion_rollup.por_tipo(db, project_id)
     result = []
-    for tipo in TIPOS:
-        avg = db.query(func.avg(Emotion.intensidad)).filter(
-            Emotion.project_id == project_id, Emotion.tipo == tipo
-        ).scalar()
+    for tipo in emotion_rollup.TIPOS:
+        avg = por_tipo.get(tipo, {}).get("promedio")
         result.append({"tipo": tipo, "valor": round(float(avg), 1) if avg else 0})
     return result
 
@@ -40,6 +61,21 @@ def create_emotion(data: EmotionSchema, db: Session = Depends(get_db)):
     db.add(item); db.commit(); db.refresh(item)
     return {"id": item.id}
 
+@router.post("/bulk")
+def create_emotions_bulk(data: List[EmotionSchema] = Body(..., max_length=masivo.MAX_FILAS), db: Session = Depends(get_db)):
+    """Alta de varias filas en una transacción (ver services/masivo.py)."""
+    return {"ids": masivo.crear(db, Emotion, [d.model_dump() for d in data])}
+
+@router.patch("/bulk")
+def update_emotions_bulk(data: List[EmotionSchemaParcial] = Body(..., max_length=masivo.MAX_FILAS),
+                         db: Session = Depends(get_db)):
+    """Cada fila lleva su id y sólo los campos a cambiar."""
+    return {"modificados": masivo.modificar(db, Emotion, [d.model_dump(exclude_unset=True) for d in data])}
+
+@router.delete("/bulk")
+def delete_emotions_bulk(ids: List[int] = Body(..., max_length=masivo.MAX_FILAS), db: Session = Depends(get_db)):
+    return {"borrados": masivo.borrar(db, Emotion, ids)}
+
 @router.put("/{item_id}")
 def update_emotion(item_id: int, data: EmotionSchema, db: Session = Depends(get_db)):
     item = db.query(Emotion).filter(Emotion.id == item_id).first()
@@ -1,49 +1,107 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from sqlalchemy import func
+from datetime import date
+from typing import Optional
 from database import get_db
+from etags import etag_proyecto
+from respuestas import json_directo
 from models.narrative import Narrative
-from models.emotion import Emotion
+from models.emotion_rollup import EmotionRollup
 from models.risk import Risk
+from services import emotion_rollup, periodos
+from services.project_summary import NIVELES
+from services.result_cache import cacheada
 
 router = APIRouter()
 
-@router.get("/{project_id}")
-def get_evolution(project_id: int, db: Session = Depends(get_db)):
-    # Narrativas por mes
-    _mes_n = func.strftime('%Y-%m', Narrative.fecha_deteccion)
-    narrativas_mes = db.query(
-        _mes_n.label("mes"),
+MAX_PERIODOS = 3660
+
+
+def _en_rango(columna, desde, hasta) -> list:
+    filtros = [columna != None]
+    if desde is not None:
+        filtros.append(columna >= desde)
+    if hasta is not None:
+        filtros.append(columna <= hasta)
+    return filtros
+
+
+@router.get("/{project_id}", dependencies=[Depends(etag_proyecto)])
+@json_directo
+@cacheada("evolution")
+def get_evolution(
+    project_id: int,
+    granularidad: str = Query("mes", pattern="^(dia|semana|mes)$"),
+    desde: Optional[date] = None,
+    hasta: Optional[date] = None,
+    db: Session = Depends(get_db),
+):
+    """Narrativas, intensidad emocional y riesgos por día, semana (de lunes) o mes.
+    Todos los periodos del rango aparecen aunque no tengan datos; `mes` es la
+    etiqueta del periodo (YYYY-MM por mes, fecha de inicio por día o semana)."""
+    if desde is not None and hasta is not None and desde > hasta:
+        raise HTTPException(400, "desde debe ser anterior a hasta")
+    dialecto = db.get_bind().dialect.name
+
+    # Narrativas por periodo
+    _per_n = periodos.inicio(Narrative.fecha_deteccion, granularidad, dialecto)
+    narrativas = db.query(
+        _per_n.label("periodo"),
         func.count(Narrative.id).label("count")
     ).filter(
         Narrative.project_id == project_id,
-        Narrative.fecha_deteccion != None
-    ).group_by(_mes_n).order_by(_mes_n).all()
-
-    # Emociones promedio por mes
-    _mes_e = func.strftime('%Y-%m', Emotion.fecha)
-    emociones_mes = db.query(
-        _mes_e.label("mes"),
-        Emotion.tipo,
-        func.avg(Emotion.intensidad).label("avg")
+        *_en_rango(Narrative.fecha_deteccion, desde, hasta)
+    ).group_by(_per_n).all()
+
+    # Emociones promedio por periodo (desde el rollup diario)
+    _per_e = periodos.inicio(EmotionRollup.dia, granularidad, dialecto)
+    emociones = db.query(
+        _per_e.label("periodo"),
+        EmotionRollup.tipo,
+        emotion_rollup.promedio().label("avg")
     ).filter(
-        Emotion.project_id == project_id,
-        Emotion.fecha != None
-    ).group_by(_mes_e, Emotion.tipo).order_by(_mes_e).all()
-
-    # Riesgos por mes detectados
-    _mes_r = func.strftime('%Y-%m', Risk.fecha_deteccion)
-    riesgos_mes = db.query(
-        _mes_r.label("mes"),
+        EmotionRollup.project_id == project_id,
+        EmotionRollup.dia != emotion_rollup.SIN_FECHA,
+        *_en_rango(EmotionRollup.dia, desde, hasta)
+    ).group_by(_per_e, EmotionRollup.tipo).all()
+
+    # Riesgos detectados por periodo
+    _per_r = periodos.inicio(Risk.fecha_deteccion, granularidad, dialecto)
+    riesgos = db.query(
+        _per_r.label("periodo"),
         Risk.nivel,
         func.count(Risk.id).label("count")
     ).filter(
         Risk.project_id == project_id,
-        Risk.fecha_deteccion != None
-    ).group_by(_mes_r, Risk.nivel).order_by(_mes_r).all()
-
-    return {
-        "narrativas_por_mes": [{"mes": r.mes, "count": r.count} for r in narrativas_mes],
-        "emociones_por_mes":  [{"mes": r.mes, "tipo": r.tipo, "avg": round(float(r.avg), 1)} for r in emociones_mes],
-        "riesgos_por_mes":    [{"mes": r.mes, "nivel": r.nivel, "count": r.count} for r in riesgos_mes],
-    }
+        *_en_rango(Risk.fecha_deteccion, desde, hasta)
+    ).group_by(_per_r, Risk.nivel).all()
+
+    # Eje completo: el rango pedido o, si no, del primer al último periodo con datos
+    vistos = [r.periodo for filas in (narrativas, emociones, riesgos) for r in filas]
+    inicio = desde if desde is not None else min(vistos, default=None)
+    fin = hasta if hasta is not None else max(vistos, default=None)
+    resultado = {"granularidad": granularidad, "periodos": [],
+                 "narrativas_por_mes": [], "emociones_por_mes": [], "riesgos_por_mes": []}
+    if inicio is None or fin is None:
+        return resultado
+    if periodos.cantidad(inicio, fin, granularidad) > MAX_PERIODOS:
+        raise HTTPException(400, f"El rango supera los {MAX_PERIODOS} periodos; acotar desde/hasta o usar otra granularidad")
+
+    n_por_periodo = {r.periodo: r.count for r in narrativas}
+    avg = {(r.periodo, r.tipo): r.avg for r in emociones}
+    conteo = {(r.periodo, r.nivel): r.count for r in riesgos}
+    tipos = sorted({t for _, t in avg})
+    niveles = sorted(set(NIVELES) | {n for _, n in conteo}, key=lambda n: (n is None, n or ""))
+
+    for p in periodos.eje(inicio, fin, granularidad):
+        et = periodos.etiqueta(p, granularidad)
+        resultado["periodos"].append(et)
+        resultado["narrativas_por_mes"].append({"mes": et, "count": n_por_periodo.get(p, 0)})
+        for t in tipos:
+            a = avg.get((p, t))
+            resultado["emociones_por_mes"].append(
+                {"mes": et, "tipo": t, "avg": round(float(a), 1) if a is not None else None})
+        for n in niveles:
+            resultado["riesgos_por_mes"].append({"mes": et, "nivel": n, "count": conteo.get((p, n), 0)})
+    return resultado
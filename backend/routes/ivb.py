@@ -9,35 +9,29 @@ Componentes y pesos:
   IVN — Índice de Volatilidad Narrativa      20%
   ICC — Índice de Confianza Condicional      15%
 """
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
+from datetime import date
+from typing import Optional
 import statistics
 from database import get_db
+from etags import etag_proyecto
+from respuestas import json_directo
 from models.narrative import Narrative
 from models.emotion import Emotion
 from models.language_code import LanguageCode
 from models.community import Community
 from models.risk import Risk
 from models.archetype import Archetype
+from services import ivb_bootstrap, ivb_engine, ivb_series, ivb_sql, ivb_stats, lexical_index
+from services.lexicon import MATCHER
+from services.result_cache import cacheada
 
 router = APIRouter()
 
-# ── Vocabulario de indecisión ──────────────────────────────────────────────────
-_INDECISION = [
-    "todavía", "estoy viendo", "no me convence", "último momento", "capaz",
-    "depende", "aún no", "sin decidir", "ninguno", "todos tienen",
-    "no hay por quién", "puede definirlo", "indeciso", "blando",
-    "a último", "viendo opciones", "evaluando",
-]
 
-_CONDITIONAL = [
-    "si cumple", "por ahora", "me gusta pero", "a ver si",
-    "voto si", "si hace", "todavía viendo", "con reservas",
-]
-
-def _has_kw(text: str, keywords: list) -> bool:
-    t = (text or "").lower()
-    return any(k in t for k in keywords)
+def _has_kw(lexicon: str, *texts) -> bool:
+    return lexicon in MATCHER.match(*texts)
 
 
 # ── Sub-índices ────────────────────────────────────────────────────────────────
@@ -46,7 +40,7 @@ def _iin(narratives, language) -> float:
     """Índice de Indefinición Narrativa (0-100)"""
     n_score = 0.0
     if narratives:
-        hits = sum(1 for n in narratives if _has_kw(n.texto, _INDECISION))
+        hits = sum(1 for n in narratives if _has_kw("indecision", n.texto))
         n_score = hits / len(narratives) * 100
 
     l_score = 0.0
@@ -54,7 +48,7 @@ def _iin(narratives, language) -> float:
     if total_freq > 0:
         hit_freq = sum(
             lc.frecuencia or 0 for lc in language
-            if _has_kw(lc.termino, _INDECISION) or _has_kw(lc.contexto, _INDECISION)
+            if _has_kw("indecision", lc.termino, lc.contexto)
         )
         l_score = hit_freq / total_freq * 100
 
@@ -152,7 +146,7 @@ def _icc(narratives, emotions, language) -> float:
     total_freq = sum(lc.frecuencia or 0 for lc in language) or 1
     cond_freq = sum(
         lc.frecuencia or 0 for lc in language
-        if _has_kw(lc.termino, _CONDITIONAL) or _has_kw(lc.contexto, _CONDITIONAL)
+        if _has_kw("condicional", lc.termino, lc.contexto)
     )
     l_score = cond_freq / total_freq * 100
 
@@ -215,10 +209,10 @@ def _recomendacion(ivb: float, ieb: float, ivn: float) -> str:
         )
 
 
-# ── Endpoint principal ─────────────────────────────────────────────────────────
+# ── Motores de cálculo ─────────────────────────────────────────────────────────
 
-@router.get("/{project_id}")
-def get_ivb(project_id: int, db: Session = Depends(get_db)):
+def _valores_python(project_id: int, db: Session):
+    """Motor de referencia: objetos ORM completos y sub-índices en Python puro."""
     narratives  = db.query(Narrative).filter(Narrative.project_id == project_id).all()
     emotions    = db.query(Emotion).filter(Emotion.project_id == project_id).all()
     language    = db.query(LanguageCode).filter(LanguageCode.project_id == project_id).all()
@@ -226,16 +220,58 @@ def get_ivb(project_id: int, db: Session = Depends(get_db)):
     risks       = db.query(Risk).filter(Risk.project_id == project_id, Risk.activo == True).all()
     archetypes  = db.query(Archetype).filter(Archetype.project_id == project_id).all()
 
-    iin_v = _iin(narratives, language)
-    ieb_v = _ieb(emotions)
-    inm_v = _inm(communities, archetypes)
-    ivn_v = _ivn(narratives, risks)
-    icc_v = _icc(narratives, emotions, language)
+    valores = {
+        "IIN": _iin(narratives, language),
+        "IEB": _ieb(emotions),
+        "INM": _inm(communities, archetypes),
+        "IVN": _ivn(narratives, risks),
+        "ICC": _icc(narratives, emotions, language),
+    }
+    meta = {
+        "narrativas": len(narratives), "emociones": len(emotions),
+        "lenguaje": len(language), "comunidades": len(communities),
+    }
+    return valores, meta
 
-    ivb = round(
-        0.25 * iin_v + 0.20 * ieb_v + 0.20 * inm_v + 0.20 * ivn_v + 0.15 * icc_v,
-        1
-    )
+
+def _desde_estadisticos(s: dict):
+    valores = {k: float(v) for k, v in ivb_engine.componentes(s).items()}
+    meta = {
+        "narrativas": int(round(s["narrativas"])), "emociones": int(round(s["emociones"])),
+        "lenguaje": int(round(s["lenguaje"])), "comunidades": int(round(s["comunidades"])),
+    }
+    return valores, meta
+
+
+def _valores_columnar(project_id: int, db: Session):
+    """Motor columnar: sólo las columnas necesarias, como arreglos NumPy."""
+    return _desde_estadisticos(ivb_stats.recompute(db, project_id))
+
+
+def _valores_incremental(project_id: int, db: Session):
+    """Motor incremental: estadísticos mantenidos en cada escritura (tabla ivb_stats)."""
+    return _desde_estadisticos(ivb_stats.get(db, project_id))
+
+
+def _valores_sql(project_id: int, db: Session):
+    """Motor SQL: agregados GROUP BY en la base; sólo el texto viaja a Python."""
+    return _desde_estadisticos(ivb_sql.estadisticos_proyecto(db, project_id))
+
+
+_MOTORES = {
+    "incremental": _valores_incremental,
+    "columnar": _valores_columnar,
+    "sql": _valores_sql,
+    "python": _valores_python,
+}
+
+
+# ── Respuesta ──────────────────────────────────────────────────────────────────
+
+def _respuesta(valores: dict, meta: dict) -> dict:
+    iin_v, ieb_v, inm_v, ivn_v, icc_v = (valores[k] for k in ("IIN", "IEB", "INM", "IVN", "ICC"))
+
+    ivb = round(float(ivb_engine.indice(valores)), 1)
 
     estado = _estado(ivb)
 
@@ -284,8 +320,111 @@ def get_ivb(project_id: int, db: Session = Depends(get_db)):
             {"rango": "56 – 75",  "estado": "Voto blando alto",     "lectura": "Zona crítica de disputa",           "color": "#f7964a"},
             {"rango": "76 – 100", "estado": "Voto blando extremo",  "lectura": "Riesgo alto de abstención/castigo", "color": "#f76c6c"},
         ],
-        "meta": {
-            "narrativas": len(narratives), "emociones": len(emotions),
-            "lenguaje": len(language), "comunidades": len(communities),
+        "meta": meta,
+    }
+
+
+# ── Endpoint principal ─────────────────────────────────────────────────────────
+
+@router.get("/{project_id}", dependencies=[Depends(etag_proyecto)])
+@json_directo
+@cacheada("ivb")
+def get_ivb(
+    project_id: int,
+    engine: str = Query("incremental", pattern="^(incremental|columnar|sql|python)$"),
+    db: Session = Depends(get_db),
+):
+    valores, meta = _MOTORES[engine](project_id, db)
+    return _respuesta(valores, meta)
+
+
+@router.get("/{project_id}/series", dependencies=[Depends(etag_proyecto)])
+@json_directo
+def get_ivb_series(
+    project_id: int,
+    granularidad: str = Query("dia", pattern="^(dia|semana)$"),
+    modo: str = Query("acumulado", pattern="^(acumulado|movil)$"),
+    ventana: int = Query(7, ge=1, le=365),
+    desde: Optional[date] = None,
+    hasta: Optional[date] = None,
+    db: Session = Depends(get_db),
+):
+    """IVB y componentes por día o semana. `acumulado` usa todo lo detectado hasta
+    cada punto; `movil` sólo los últimos `ventana` periodos. Los puntos cubren
+    el tramo con eventos dentro de desde/hasta, hasta ivb_series.MAX_PUNTOS."""
+    if desde is not None and hasta is not None and desde > hasta:
+        raise HTTPException(status_code=400, detail="desde debe ser anterior o igual a hasta")
+    try:
+        return ivb_series.get(db, project_id, granularidad=granularidad, modo=modo,
+                              ventana=ventana, desde=desde, hasta=hasta)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/{project_id}/uncertainty", dependencies=[Depends(etag_proyecto)])
+def get_ivb_uncertainty(
+    project_id: int,
+    replicas: int = Query(2000, ge=100, le=20000),
+    nivel: float = Query(0.95, gt=0.5, lt=1),
+    delta: float = Query(0.05, gt=0, le=0.2),
+    semilla: Optional[int] = None,
+    db: Session = Depends(get_db),
+):
+    """Intervalos bootstrap del IVB y de cada componente, y sensibilidad del
+    índice a cambios de `delta` en cada peso."""
+    return ivb_bootstrap.analizar(db, project_id, replicas_n=replicas, nivel=nivel,
+                                  delta=delta, semilla=semilla)
+
+
+def _consistencia(db: Session, project_id: int) -> dict:
+    guardado = ivb_stats.read(db, project_id)
+    actual = ivb_stats.recompute(db, project_id)
+    if guardado is None:
+        deriva = {}
+    else:
+        deriva = {
+            c: {"guardado": guardado[c], "recalculado": actual[c], "diferencia": guardado[c] - actual[c]}
+            for c in actual
+            if abs(guardado[c] - actual[c]) > 1e-6 * max(1.0, abs(actual[c]))
+        }
+    comp_guardado = ivb_engine.componentes(guardado) if guardado else {}
+    comp_actual = ivb_engine.componentes(actual)
+    return {
+        "inicializado": guardado is not None,
+        "consistente": guardado is not None and not deriva,
+        "deriva": deriva,
+        "componentes": {
+            k: {"guardado": round(float(comp_guardado[k]), 4) if guardado else None,
+                "recalculado": round(float(v), 4)}
+            for k, v in comp_actual.items()
         },
     }
+
+
+@router.get("/{project_id}/consistencia")
+def check_ivb(project_id: int, db: Session = Depends(get_db)):
+    """Compara los estadísticos guardados con un recálculo desde cero (no escribe nada)."""
+    return _consistencia(db, project_id)
+
+
+@router.post("/{project_id}/consistencia/reparar")
+def repair_ivb(project_id: int, db: Session = Depends(get_db)):
+    """Como GET /consistencia, y si los estadísticos faltan o están desfasados
+    los reconstruye. `reparado` indica si hubo que escribir."""
+    r = _consistencia(db, project_id)
+    reparado = not r["consistente"]
+    if reparado:
+        ivb_stats.rebuild(db, project_id)
+    return {**r, "reparado": reparado}
+
+
+@router.get("/lexico/estado")
+def lexicon_index_status(db: Session = Depends(get_db)):
+    """Versión de los léxicos, filas pendientes de indexar y estado del reindexado."""
+    return lexical_index.estado(db)
+
+
+@router.post("/lexico/reindexar")
+def reindex_lexicon():
+    """Lanza el reindexado del índice léxico en segundo plano."""
+    return {"iniciado": lexical_index.iniciar_reindexado()}
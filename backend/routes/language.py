@@ -1,10 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Body, HTTPException, Response
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
-from typing import Optional
+from typing import Optional, List
 from datetime import date
 from database import get_db
+from etags import etag_proyecto
+from respuestas import json_directo
 from models.language_code import LanguageCode
+from services import masivo, project_summary
+from services.paginacion import Pagina, cabeceras, paginar
+from services.proyeccion import Proyeccion
 
 router = APIRouter()
 
@@ -18,24 +23,28 @@ class LangSchema(BaseModel):
     funcion_cultural: Optional[str] = None      # indecision|desconfianza|activacion|espanto|economia|gestion|emocional|identidad
     impacto_voto_blando: Optional[str] = None   # activa|neutral|espanta
 
-def _serialize(l: LanguageCode) -> dict:
-    return {
-        "id": l.id,
-        "termino": l.termino,
-        "tipo": l.tipo,
-        "frecuencia": l.frecuencia,
-        "contexto": l.contexto,
-        "fecha_deteccion": str(l.fecha_deteccion) if l.fecha_deteccion else None,
-        "funcion_cultural": l.funcion_cultural,
-        "impacto_voto_blando": l.impacto_voto_blando,
-    }
-
-@router.get("/{project_id}")
-def list_language(project_id: int, db: Session = Depends(get_db)):
-    items = db.query(LanguageCode).filter(
-        LanguageCode.project_id == project_id
-    ).order_by(LanguageCode.frecuencia.desc()).all()
-    return [_serialize(l) for l in items]
+LangSchemaParcial = masivo.esquema_parcial(LangSchema)
+
+CAMPOS = {
+    "id": LanguageCode.id,
+    "termino": LanguageCode.termino,
+    "tipo": LanguageCode.tipo,
+    "frecuencia": LanguageCode.frecuencia,
+    "contexto": LanguageCode.contexto,
+    "fecha_deteccion": LanguageCode.fecha_deteccion,
+    "funcion_cultural": LanguageCode.funcion_cultural,
+    "impacto_voto_blando": LanguageCode.impacto_voto_blando,
+}
+
+@router.get("/{project_id}", dependencies=[Depends(etag_proyecto)])
+@json_directo
+def list_language(project_id: int, response: Response, pagina: Pagina = Depends(),
+                  fields: Optional[str] = None, db: Session = Depends(get_db)):
+    proy = Proyeccion(CAMPOS, fields)
+    filas, siguiente = paginar(db.query(*proy.columnas).filter(LanguageCode.project_id == project_id),
+                               [(LanguageCode.frecuencia, True), (LanguageCode.id, True)], pagina)
+    cabeceras(response, siguiente, project_summary.get(db, project_id)["lenguaje"] if pagina.total else None)
+    return [proy.fila(f) for f in filas]
 
 @router.post("/")
 def create_language(data: LangSchema, db: Session = Depends(get_db)):
@@ -43,6 +52,21 @@ def create_language(data: LangSchema, db: Session = Depends(get_db)):
     db.add(item); db.commit(); db.refresh(item)
     return {"id": item.id}
 
+@router.post("/bulk")
+def create_language_bulk(data: List[LangSchema] = Body(..., max_length=masivo.MAX_FILAS), db: Session = Depends(get_db)):
+    """Alta de varias filas en una transacción (ver services/masivo.py)."""
+    return {"ids": masivo.crear(db, LanguageCode, [d.model_dump() for d in data])}
+
+@router.patch("/bulk")
+def update_language_bulk(data: List[LangSchemaParcial] = Body(..., max_length=masivo.MAX_FILAS),
+                         db: Session = Depends(get_db)):
+    """Cada fila lleva su id y sólo los campos a cambiar."""
+    return {"modificados": masivo.modificar(db, LanguageCode, [d.model_dump(exclude_unset=True) for d in data])}
+
+@router.delete("/bulk")
+def delete_language_bulk(ids: List[int] = Body(..., max_length=masivo.MAX_FILAS), db: Session = Depends(get_db)):
+    return {"borrados": masivo.borrar(db, LanguageCode, ids)}
+
 @router.put("/{item_id}")
 def update_language(item_id: int, data: LangSchema, db: Session = Depends(get_db)):
     item = db.query(LanguageCode).filter(LanguageCode.id == item_id).first()
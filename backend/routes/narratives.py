@@ -1,13 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Body, HTTPException, Response
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
-from typing import Optional
+from typing import Optional, List
 from datetime import date
 from database import get_db
+from etags import etag_proyecto
+from respuestas import json_directo
 from models.narrative import Narrative
+from services import masivo, project_summary
+from services.paginacion import Pagina, cabeceras, paginar
+from services.proyeccion import Proyeccion
 
 router = APIRouter()
 
+CAMPOS = {
+    "id": Narrative.id,
+    "texto": Narrative.texto,
+    "tipo": Narrative.tipo,
+    "actor_politico": Narrative.actor_politico,
+    "fecha_deteccion": Narrative.fecha_deteccion,
+    "peso": Narrative.peso,
+    "created_at": (Narrative.created_at, str),
+}
+
 class NarrativeSchema(BaseModel):
     project_id: int
     texto: str
@@ -16,12 +31,17 @@ class NarrativeSchema(BaseModel):
     fecha_deteccion: Optional[date] = None
     peso: Optional[float] = 5.0
 
-@router.get("/{project_id}")
-def list_narratives(project_id: int, db: Session = Depends(get_db)):
-    items = db.query(Narrative).filter(Narrative.project_id == project_id).order_by(Narrative.peso.desc()).all()
-    return [{"id": n.id, "texto": n.texto, "tipo": n.tipo, "actor_politico": n.actor_politico,
-             "fecha_deteccion": str(n.fecha_deteccion) if n.fecha_deteccion else None,
-             "peso": n.peso, "created_at": str(n.created_at)} for n in items]
+NarrativeSchemaParcial = masivo.esquema_parcial(NarrativeSchema)
+
+@router.get("/{project_id}", dependencies=[Depends(etag_proyecto)])
+@json_directo
+def list_narratives(project_id: int, response: Response, pagina: Pagina = Depends(),
+                    fields: Optional[str] = None, db: Session = Depends(get_db)):
+    proy = Proyeccion(CAMPOS, fields)
+    filas, siguiente = paginar(db.query(*proy.columnas).filter(Narrative.project_id == project_id),
+                               [(Narrative.peso, True), (Narrative.id, True)], pagina)
+    cabeceras(response, siguiente, project_summary.get(db, project_id)["narrativas"] if pagina.total else None)
+    return [proy.fila(f) for f in filas]
 
 @router.post("/")
 def create_narrative(data: NarrativeSchema, db: Session = Depends(get_db)):
@@ -29,6 +49,21 @@ def create_narrative(data: NarrativeSchema, db: Session = Depends(get_db)):
     db.add(item); db.commit(); db.refresh(item)
     return {"id": item.id}
 
+@router.post("/bulk")
+def create_narratives_bulk(data: List[NarrativeSchema] = Body(..., max_length=masivo.MAX_FILAS), db: Session = Depends(get_db)):
+    """Alta de varias filas en una transacción (ver services/masivo.py)."""
+    return {"ids": masivo.crear(db, Narrative, [d.model_dump() for d in data])}
+
+@router.patch("/bulk")
+def update_narratives_bulk(data: List[NarrativeSchemaParcial] = Body(..., max_length=masivo.MAX_FILAS),
+                           db: Session = Depends(get_db)):
+    """Cada fila lleva su id y sólo los campos a cambiar."""
+    return {"modificados": masivo.modificar(db, Narrative, [d.model_dump(exclude_unset=True) for d in data])}
+
+@router.delete("/bulk")
+def delete_narratives_bulk(ids: List[int] = Body(..., max_length=masivo.MAX_FILAS), db: Session = Depends(get_db)):
+    return {"borrados": masivo.borrar(db, Narrative, ids)}
+
 @router.put("/{item_id}")
 def update_narrative(item_id: int, data: NarrativeSchema, db: Session = Depends(get_db)):
     item = db.query(Narrative).filter(Narrative.id == item_id).first()
@@ -1,15 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy import func
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
 from pydantic import BaseModel
 from typing import Optional
 from datetime import date
 from database import get_db
+from etags import etag_proyecto, etag_proyectos
+from respuestas import json_directo
 from models.project import Project
-from models.narrative import Narrative
-from models.emotion import Emotion
-from models.archetype import Archetype
-from models.risk import Risk
+from models.project_summary import ProjectSummary
+from services import exportacion, project_summary
+from services.paginacion import Pagina, cabeceras, paginar
+from services.proyeccion import Proyeccion
 
 router = APIRouter()
 
@@ -23,28 +27,55 @@ class ProjectCreate(BaseModel):
 class ProjectUpdate(ProjectCreate):
     activo: Optional[bool] = None
 
-@router.get("/")
-def list_projects(db: Session = Depends(get_db)):
-    projects = db.query(Project).order_by(Project.created_at.desc()).all()
-    result = []
-    for p in projects:
-        result.append({
-            "id": p.id,
-            "nombre": p.nombre,
-            "cliente": p.cliente,
-            "contexto_pais": p.contexto_pais,
-            "fecha_inicio": str(p.fecha_inicio) if p.fecha_inicio else None,
-            "descripcion": p.descripcion,
-            "activo": p.activo,
-            "created_at": str(p.created_at),
-            "stats": {
-                "narrativas": db.query(func.count(Narrative.id)).filter(Narrative.project_id == p.id).scalar(),
-                "emociones": db.query(func.count(Emotion.id)).filter(Emotion.project_id == p.id).scalar(),
-                "arquetipos": db.query(func.count(Archetype.id)).filter(Archetype.project_id == p.id).scalar(),
-                "riesgos_activos": db.query(func.count(Risk.id)).filter(Risk.project_id == p.id, Risk.activo == True).scalar(),
-            }
-        })
-    return result
+def _stats(narrativas, emociones, arquetipos, riesgos_activos) -> dict:
+    return {"narrativas": narrativas, "emociones": emociones,
+            "arquetipos": arquetipos, "riesgos_activos": riesgos_activos}
+
+CAMPOS = {
+    "id": Project.id,
+    "nombre": Project.nombre,
+    "cliente": Project.cliente,
+    "contexto_pais": Project.contexto_pais,
+    "fecha_inicio": Project.fecha_inicio,
+    "descripcion": Project.descripcion,
+    "activo": Project.activo,
+    "created_at": (Project.created_at, str),
+    "stats": ((ProjectSummary.narrativas, ProjectSummary.emociones,
+               ProjectSummary.arquetipos, ProjectSummary.riesgos_activos), _stats),
+}
+
+@router.get("/", dependencies=[Depends(etag_proyectos)])
+@json_directo
+def list_projects(response: Response, pagina: Pagina = Depends(), fields: Optional[str] = None,
+                  db: Session = Depends(get_db)):
+    proy = Proyeccion(CAMPOS, fields)
+    stats = proy.incluye("stats")
+    creado = Project.created_at
+    if db.get_bind().dialect.name == "sqlite":
+        # CURRENT_TIMESTAMP guarda "YYYY-MM-DD HH:MM:SS" pero SQLAlchemy compara
+        # con microsegundos: el cursor compara el texto normalizado
+        creado = func.datetime(Project.created_at)
+
+    def consultar():
+        q = db.query(*proy.columnas).select_from(Project)
+        if stats:
+            # Al final, para detectar los proyectos sin contadores
+            q = q.add_columns(Project.id, ProjectSummary.project_id) \
+                 .outerjoin(ProjectSummary, ProjectSummary.project_id == Project.id)
+        return paginar(q, [(creado, True), (Project.id, False)], pagina)
+
+    filas, siguiente = consultar()
+    faltan = [f[-2] for f in filas if f[-1] is None] if stats else []
+    if faltan:
+        # Proyectos anteriores a los contadores: se construyen una vez
+        try:
+            project_summary.rebuild(db, faltan)
+        except IntegrityError:
+            db.rollback()
+        filas, siguiente = consultar()
+
+    cabeceras(response, siguiente, db.query(func.count(Project.id)).scalar() if pagina.total else None)
+    return [proy.fila(f) for f in filas]
 
 @router.post("/")
 def create_project(data: ProjectCreate, db: Session = Depends(get_db)):
@@ -54,13 +85,29 @@ def create_project(data: ProjectCreate, db: Session = Depends(get_db)):
     db.refresh(project)
     return {"id": project.id, "nombre": project.nombre, "activo": project.activo}
 
-@router.get("/{project_id}")
+@router.get("/{project_id}", dependencies=[Depends(etag_proyecto)])
 def get_project(project_id: int, db: Session = Depends(get_db)):
     p = db.query(Project).filter(Project.id == project_id).first()
     if not p:
         raise HTTPException(status_code=404, detail="Proyecto no encontrado")
     return p
 
+@router.get("/{project_id}/export", dependencies=[Depends(etag_proyecto)])
+def export_project(project_id: int, response: Response,
+                   format: str = Query("ndjson", pattern="^(ndjson|parquet|arrow)$"),
+                   db: Session = Depends(get_db)):
+    """Todas las tablas del proyecto en streaming (ver services/exportacion.py)."""
+    if db.query(Project.id).filter(Project.id == project_id).first() is None:
+        raise HTTPException(status_code=404, detail="Proyecto no encontrado")
+    if format != "ndjson" and not exportacion.pyarrow_disponible():
+        raise HTTPException(status_code=501, detail=f"Exportar en {format} requiere pyarrow (pip install pyarrow)")
+    tipo, extension = exportacion.FORMATOS[format]
+    cuerpo = exportacion.ndjson(project_id) if format == "ndjson" else exportacion.columnar(project_id, format)
+    # Con las cabeceras de etag_proyecto (ETag, Cache-Control)
+    return StreamingResponse(cuerpo, media_type=tipo, headers={
+        **response.headers,
+        "Content-Disposition": f'attachment; filename="proyecto_{project_id}_{format}.{extension}"'})
+
 @router.put("/{project_id}")
 def update_project(project_id: int, data: ProjectUpdate, db: Session = Depends(get_db)):
     p = db.query(Project).filter(Project.id == project_id).first()
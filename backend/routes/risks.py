@@ -1,13 +1,29 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Body, HTTPException, Response
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from typing import Optional, List
 from datetime import date
 from database import get_db
-from models.risk import Risk
+from etags import etag_proyecto
+from respuestas import json_directo
+from models.risk import Risk, GRAVEDAD, CRECIMIENTO
+from services import masivo, project_summary
+from services.paginacion import Pagina, cabeceras, paginar
+from services.proyeccion import Proyeccion, lista
 
 router = APIRouter()
 
+CAMPOS = {
+    "id": Risk.id,
+    "tema": Risk.tema,
+    "descripcion": Risk.descripcion,
+    "nivel": Risk.nivel,
+    "velocidad_crecimiento": Risk.velocidad_crecimiento,
+    "narrativas_relacionadas": (Risk.narrativas_relacionadas, lista),
+    "fecha_deteccion": Risk.fecha_deteccion,
+    "activo": Risk.activo,
+}
+
 class RiskSchema(BaseModel):
     project_id: int
     tema: str
@@ -18,16 +34,19 @@ class RiskSchema(BaseModel):
     fecha_deteccion: Optional[date] = None
     activo: Optional[bool] = True
 
-@router.get("/{project_id}")
-def list_risks(project_id: int, db: Session = Depends(get_db)):
-    ORDEN = {"rojo": 0, "amarillo": 1, "verde": 2}
-    items = db.query(Risk).filter(Risk.project_id == project_id, Risk.activo == True).all()
-    items.sort(key=lambda r: (ORDEN.get(r.nivel, 3), -(r.velocidad_crecimiento or 0)))
-    return [{"id": r.id, "tema": r.tema, "descripcion": r.descripcion, "nivel": r.nivel,
-             "velocidad_crecimiento": r.velocidad_crecimiento,
-             "narrativas_relacionadas": r.narrativas_relacionadas or [],
-             "fecha_deteccion": str(r.fecha_deteccion) if r.fecha_deteccion else None,
-             "activo": r.activo} for r in items]
+RiskSchemaParcial = masivo.esquema_parcial(RiskSchema)
+
+@router.get("/{project_id}", dependencies=[Depends(etag_proyecto)])
+@json_directo
+def list_risks(project_id: int, response: Response, pagina: Pagina = Depends(),
+               fields: Optional[str] = None, db: Session = Depends(get_db)):
+    # rojo → amarillo → verde → otros; dentro de cada nivel, los que más crecen
+    # primero (índice ix_risks_project_gravedad, ver models/risk.py)
+    proy = Proyeccion(CAMPOS, fields)
+    filas, siguiente = paginar(db.query(*proy.columnas).filter(Risk.project_id == project_id, Risk.activo == True),
+                               [(GRAVEDAD, False), (CRECIMIENTO, True), (Risk.id, False)], pagina)
+    cabeceras(response, siguiente, project_summary.get(db, project_id)["riesgos_activos"] if pagina.total else None)
+    return [proy.fila(f) for f in filas]
 
 @router.post("/")
 def create_risk(data: RiskSchema, db: Session = Depends(get_db)):
@@ -35,6 +54,21 @@ def create_risk(data: RiskSchema, db: Session = Depends(get_db)):
     db.add(item); db.commit(); db.refresh(item)
     return {"id": item.id}
 
+@router.post("/bulk")
+def create_risks_bulk(data: List[RiskSchema] = Body(..., max_length=masivo.MAX_FILAS), db: Session = Depends(get_db)):
+    """Alta de varias filas en una transacción (ver services/masivo.py)."""
+    return {"ids": masivo.crear(db, Risk, [d.model_dump() for d in data])}
+
+@router.patch("/bulk")
+def update_risks_bulk(data: List[RiskSchemaParcial] = Body(..., max_length=masivo.MAX_FILAS),
+                      db: Session = Depends(get_db)):
+    """Cada fila lleva su id y sólo los campos a cambiar."""
+    return {"modificados": masivo.modificar(db, Risk, [d.model_dump(exclude_unset=True) for d in data])}
+
+@router.delete("/bulk")
+def delete_risks_bulk(ids: List[int] = Body(..., max_length=masivo.MAX_FILAS), db: Session = Depends(get_db)):
+    return {"borrados": masivo.borrar(db, Risk, ids)}
+
 @router.put("/{item_id}")
 def update_risk(item_id: int, data: RiskSchema, db: Session = Depends(get_db)):
     item = db.query(Risk).filter(Risk.id == item_id).first()
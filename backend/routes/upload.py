@@ -1,32 +1,64 @@
+from typing import Optional
 from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, Query
 from fastapi.responses import FileResponse
 from sqlalchemy.orm import Session
-import tempfile, os
+import tempfile, os, zipfile
 from database import get_db
-from services.excel_parser import parse_excel, generate_template
+from models.project import Project
+from services import importaciones
+from services.excel_parser import generate_template
 
 router = APIRouter()
 
-@router.post("/{project_id}")
+_TROZO = 1 << 20   # bytes por lectura al copiar el archivo subido al disco
+
+@router.post("/{project_id}", status_code=202)
 async def upload_excel(
     project_id: int,
     file: UploadFile = File(...),
+    dry_run: bool = Query(False, description="Sólo validar: devuelve el reporte sin escribir"),
     db: Session = Depends(get_db)
 ):
-    if not file.filename.endswith((".xlsx", ".xls")):
-        raise HTTPException(status_code=400, detail="Solo se aceptan archivos .xlsx o .xls")
+    """Encola la importación y responde enseguida; el avance y el resultado
+    se consultan en GET /jobs/{job_id}."""
+    if not file.filename.endswith(".xlsx"):
+        raise HTTPException(status_code=400, detail="Solo se aceptan archivos .xlsx")
+    if not db.get(Project, project_id):
+        raise HTTPException(status_code=404, detail="Proyecto no encontrado")
 
-    contents = await file.read()
+    # Al disco de a trozos: el archivo nunca está entero en memoria
     with tempfile.NamedTemporaryFile(delete=False, suffix=".xlsx") as tmp:
-        tmp.write(contents)
+        while trozo := await file.read(_TROZO):
+            tmp.write(trozo)
         tmp_path = tmp.name
 
-    try:
-        result = parse_excel(tmp_path, project_id, db)
-    finally:
+    if not zipfile.is_zipfile(tmp_path):
         os.unlink(tmp_path)
+        raise HTTPException(status_code=400, detail="El archivo no es un Excel .xlsx válido")
+
+    trabajo = importaciones.encolar(project_id, tmp_path, file.filename, dry_run=dry_run)
+    return trabajo.estado_json()
+
+def _trabajo(job_id: str):
+    trabajo = importaciones.obtener(job_id)
+    if not trabajo:
+        raise HTTPException(status_code=404, detail="Importación no encontrada")
+    return trabajo
+
+@router.get("/jobs")
+def list_jobs(project_id: Optional[int] = None):
+    return [t.estado_json() for t in importaciones.listar(project_id)]
+
+@router.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    return _trabajo(job_id).estado_json()
 
-    return {"ok": True, "importados": result}
+@router.post("/jobs/{job_id}/cancel")
+def cancel_job(job_id: str):
+    trabajo = _trabajo(job_id)
+    if not importaciones.cancelar(trabajo):
+        raise HTTPException(status_code=409, detail=f"La importación ya terminó ({trabajo.estado})")
+    return trabajo.estado_json()
 
 @router.get("/template")
 def download_template():
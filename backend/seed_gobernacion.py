@@ -15,12 +15,17 @@ from models.archetype import Archetype
 from models.language_code import LanguageCode
 from models.community import Community
 from models.risk import Risk
+from models.ivb_stats import IVBStats
+from models.lexical_feature import LexicalFeature
+from models.project_summary import ProjectSummary
+from models.data_version import DataVersion
+from models.emotion_rollup import EmotionRollup
 
 create_tables()
 db = SessionLocal()
 
 # Limpiar datos previos
-for M in [Risk, Community, LanguageCode, Archetype, Emotion, Narrative, Project]:
+for M in [IVBStats, LexicalFeature, ProjectSummary, DataVersion, EmotionRollup, Risk, Community, LanguageCode, Archetype, Emotion, Narrative, Project]:
     db.query(M).delete()
 db.commit()
 
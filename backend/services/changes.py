@@ -0,0 +1,144 @@
+"""
+Cambios por escritura — mantiene las tablas derivadas en la misma transacción.
+
+database.py engancha `after_flush()` a cada sesión: los objetos insertados,
+modificados y borrados se convierten en un `ChangeSet` columnar (filas
+quitadas / agregadas por modelo) que se entrega a cada mantenedor registrado en
+`_MANTENEDORES`. Las rutas que escriben por SQL directo (sin ORM) arman su
+propio ChangeSet y llaman a `apply()`.
+
+Los proyectos tocados se acumulan en la sesión y, sólo cuando la transacción
+confirma, se avisa a las cachés en memoria registradas con `on_commit()`.
+"""
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session
+from models.project import Project
+from services import data_version, emotion_rollup, ivb_stats, lexical_index, project_summary
+
+
+class ChangeSet:
+    """Filas agregadas y quitadas por modelo, en formato columnar
+    (modelo → columna → lista de valores). Una modificación es quitar la fila
+    vieja y agregar la nueva."""
+
+    def __init__(self):
+        self.added = {}
+        self.removed = {}
+        self.new_projects = set()
+        self.deleted_projects = set()
+        self.updated_projects = set()   # cambios en la fila del proyecto (nombre, cliente, ...)
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.new_projects or self.deleted_projects
+                    or self.updated_projects)
+
+    def add(self, model, row: dict, removed: bool = False):
+        cols = (self.removed if removed else self.added).setdefault(model, {})
+        if not cols:
+            cols.update({k: [] for k in row})
+        for k, lista in cols.items():
+            lista.append(row.get(k))
+
+    def extend(self, model, cols: dict, removed: bool = False):
+        """Agrega muchas filas ya en formato columnar (escrituras masivas)."""
+        destino = (self.removed if removed else self.added).setdefault(model, {})
+        n = len(next(iter(cols.values()), ()))
+        previas = len(next(iter(destino.values()), ()))
+        for k in set(destino) | set(cols):
+            destino.setdefault(k, [None] * previas).extend(cols.get(k, [None] * n))
+
+    def items(self):
+        """(modelo, signo, columnas) — signo -1 para filas quitadas, +1 para agregadas."""
+        for model, cols in self.removed.items():
+            yield model, -1, cols
+        for model, cols in self.added.items():
+            yield model, 1, cols
+
+    def project_ids(self) -> set:
+        ids = self.new_projects | self.deleted_projects | self.updated_projects
+        for _, _, cols in self.items():
+            ids.update(cols.get("project_id", ()))
+        ids.discard(None)
+        return ids
+
+
+def _fila(state, viejo: bool = False) -> dict:
+    """Valores de columna cargados en el objeto (los viejos, si viejo=True)."""
+    row = {}
+    for attr in state.mapper.column_attrs:
+        k = attr.key
+        row[k] = state.dict.get(k)
+        if viejo:
+            h = state.attrs[k].history
+            if h.deleted:
+                row[k] = h.deleted[0]
+    return row
+
+
+def collect(session: Session) -> ChangeSet:
+    """ChangeSet del flush en curso (llamar desde after_flush)."""
+    cs = ChangeSet()
+    for obj in session.new:
+        if isinstance(obj, Project):
+            cs.new_projects.add(obj.id)
+        else:
+            cs.add(type(obj), _fila(inspect(obj)))
+    for obj in session.deleted:
+        if isinstance(obj, Project):
+            cs.deleted_projects.add(obj.id)
+        else:
+            cs.add(type(obj), _fila(inspect(obj)), removed=True)
+    for obj in session.dirty:
+        if not session.is_modified(obj, include_collections=False):
+            continue
+        if isinstance(obj, Project):
+            cs.updated_projects.add(obj.id)
+            continue
+        state = inspect(obj)
+        cs.add(type(obj), _fila(state, viejo=True), removed=True)
+        cs.add(type(obj), _fila(state))
+    return cs
+
+
+def apply(session: Session, cs: ChangeSet):
+    """Propaga el ChangeSet a todas las tablas derivadas."""
+    if not cs:
+        return
+    for mantenedor in _MANTENEDORES:
+        mantenedor(session, cs)
+    session.info.setdefault("proyectos_modificados", set()).update(cs.project_ids())
+
+
+def after_flush(session: Session):
+    apply(session, collect(session))
+
+
+# ── Avisos tras commit ─────────────────────────────────────────────────────────
+
+_AL_CONFIRMAR = []
+
+
+def on_commit(fn):
+    """Registra fn(project_ids) para después de cada commit con escrituras."""
+    _AL_CONFIRMAR.append(fn)
+    return fn
+
+
+def after_commit(session: Session):
+    ids = session.info.pop("proyectos_modificados", None)
+    if ids:
+        for fn in _AL_CONFIRMAR:
+            fn(ids)
+
+
+def after_rollback(session: Session):
+    session.info.pop("proyectos_modificados", None)
+
+
+_MANTENEDORES = (
+    lexical_index.apply_changes,
+    ivb_stats.apply_changes,
+    project_summary.apply_changes,
+    emotion_rollup.apply_changes,
+    data_version.apply_changes,
+)
@@ -0,0 +1,106 @@
+"""
+Versión de datos por proyecto (tabla data_versions).
+
+Cada flush que toca un proyecto (sus filas o la del propio proyecto) sube su
+versión, en la misma transacción (mantenedor de services/changes.py). La
+versión es una marca en nanosegundos que nunca retrocede (max(versión + 1,
+ahora)), así que no se repite aunque SQLite reutilice el id de un proyecto
+borrado. etags.py arma con ella los ETag de las rutas GET, y la caché de
+resultados (services/result_cache.py) la usa en la clave con `leida()`: la
+misma versión que vio el ETag de la petición.
+"""
+import time
+from sqlalchemy import case, delete, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from models.data_version import DataVersion
+from models.project import Project
+
+
+def _ahora() -> int:
+    return time.time_ns()
+
+
+def apply_changes(session: Session, cs):
+    """Mantenedor de services/changes.py: sube la versión de los proyectos tocados."""
+    if cs.deleted_projects or cs.new_projects:
+        session.execute(delete(DataVersion).where(
+            DataVersion.project_id.in_(cs.deleted_projects | cs.new_projects)))
+    for pid in cs.new_projects - cs.deleted_projects:
+        session.execute(insert(DataVersion).values(project_id=pid, version=_ahora()))
+
+    # Lo que la sesión leyó antes de escribir ya no es su versión
+    leidas = session.info.get("versiones_leidas")
+    if leidas:
+        for pid in cs.project_ids():
+            leidas.pop(pid, None)
+
+    ids = cs.project_ids() - cs.deleted_projects - cs.new_projects
+    if ids:
+        ahora = _ahora()
+        # Sin fila todavía → se crea en la primera lectura
+        session.execute(
+            update(DataVersion).where(DataVersion.project_id.in_(ids))
+            .values(version=case((DataVersion.version + 1 > ahora, DataVersion.version + 1), else_=ahora))
+        )
+
+
+def _crear_faltantes(db: Session, project_ids=None):
+    """Primera versión para los proyectos que todavía no tienen fila (los
+    anteriores a esta tabla); sin ids, para todos."""
+    q = select(Project.id).outerjoin(DataVersion, DataVersion.project_id == Project.id) \
+        .where(DataVersion.project_id == None)
+    if project_ids is not None:
+        q = q.where(Project.id.in_(list(project_ids)))
+    faltan = db.scalars(q).all()
+    if not faltan:
+        return
+    v = _ahora()
+    try:
+        db.execute(insert(DataVersion), [{"project_id": pid, "version": v} for pid in faltan])
+        db.commit()
+    except IntegrityError:
+        # Otra petición las creó en paralelo
+        db.rollback()
+
+
+def get_many(db: Session, project_ids) -> dict:
+    """project_id → versión actual (0 para ids que no son proyectos)."""
+    ids = list(project_ids)
+    q = select(DataVersion.project_id, DataVersion.version).where(DataVersion.project_id.in_(ids))
+    versiones = dict(db.execute(q).all())
+    if len(versiones) < len(ids):
+        _crear_faltantes(db, [i for i in ids if i not in versiones])
+        versiones = dict(db.execute(q).all())
+    return {i: versiones.get(i, 0) for i in ids}
+
+
+def get(db: Session, project_id: int) -> int:
+    return get_many(db, [project_id])[project_id]
+
+
+def leida(db: Session, project_id: int) -> int:
+    """Versión que ya leyó esta sesión (el ETag de la petición); la consulta
+    si todavía no la leyó."""
+    leidas = db.info.setdefault("versiones_leidas", {})
+    if project_id not in leidas:
+        leidas[project_id] = get(db, project_id)
+    return leidas[project_id]
+
+
+# Las versiones son nanosegundos (~1.7e18): la suma se hace módulo un primo
+# para no desbordar el entero de 64 bits con más de cuatro proyectos
+_MODULO = 1_000_000_007
+
+
+def global_(db: Session) -> tuple:
+    """(proyectos, versión máxima, suma de versiones módulo _MODULO) de todos
+    los proyectos: cambia con cualquier escritura, alta o baja de proyecto."""
+    q = select(func.count(Project.id), func.count(DataVersion.project_id),
+               func.max(DataVersion.version), func.sum(DataVersion.version % _MODULO)) \
+        .select_from(Project).outerjoin(DataVersion, DataVersion.project_id == Project.id)
+    proyectos, con_version, maxima, suma = db.execute(q).one()
+    if con_version < proyectos:
+        _crear_faltantes(db)
+        proyectos, _, maxima, suma = db.execute(q).one()
+    return proyectos, maxima, suma
@@ -0,0 +1,212 @@
+"""
+Rollup de emociones (tabla emotion_rollups): conteo, suma y suma de cuadrados
+de la intensidad por proyecto, tipo y día.
+
+Cada flush suma o resta las emociones tocadas (services/changes.py) con un
+upsert por clave, así radar, dashboard, evolución y el componente emocional
+del IVB cuestan según la cantidad de días con datos y no de filas.
+
+Las emociones sin fecha van al día SIN_FECHA. Las de tipo esperanza se separan
+además en tramos según los umbrales del IVB (≤ 6 y 3-7), para poder armar
+esperanza_baja y esperanza_cond sin volver a las filas; los demás tipos usan
+el tramo 0. Al arrancar, `completar()` construye el rollup de los proyectos
+que tienen emociones y todavía no lo tienen.
+"""
+import datetime
+import numpy as np
+from sqlalchemy import case, delete, exists, func, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from models.emotion import Emotion
+from models.emotion_rollup import EmotionRollup
+from services.ivb_engine import CAMPOS, SOFT_TYPES, HARD_TYPES
+
+SIN_FECHA = datetime.date(1, 1, 1)
+TIPOS = ["ira", "miedo", "frustracion", "esperanza", "desconfianza", "orgullo"]
+
+_DEFAULT = 5.0     # intensidad que el IVB usa para las filas con nulo
+_SUMAS = ("n", "n_valor", "suma", "suma_cuadrados")
+_CLAVE = ("project_id", "tipo", "dia", "tramo")
+_INSERT = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+
+def tramo(tipo: str, intensidad) -> int:
+    """0: < 3 · 1: 3-6 · 2: (6, 7] · 3: > 7 (sólo esperanza; 0 en los demás tipos)."""
+    if tipo != "esperanza":
+        return 0
+    v = _DEFAULT if intensidad is None else intensidad
+    return 0 if v < 3 else 1 if v <= 6 else 2 if v <= 7 else 3
+
+
+def _tramo_sql(tipo, intensidad):
+    v = func.coalesce(intensidad, _DEFAULT)
+    return case((tipo != "esperanza", 0), (v < 3, 0), (v <= 6, 1), (v <= 7, 2), else_=3)
+
+
+# ── Mantenimiento en escritura ─────────────────────────────────────────────────
+
+def _deltas(cs) -> dict:
+    d = {}
+    for model, signo, cols in cs.items():
+        if model is not Emotion:
+            continue
+        for pid, tipo, fecha, v in zip(cols["project_id"], cols["tipo"], cols["fecha"], cols["intensidad"]):
+            x = d.setdefault((pid, tipo, fecha or SIN_FECHA, tramo(tipo, v)), [0, 0, 0.0, 0.0])
+            x[0] += signo
+            if v is not None:
+                x[1] += signo
+                x[2] += signo * v
+                x[3] += signo * v * v
+    return d
+
+
+def _upsert(session: Session, filas: list):
+    ins = _INSERT[session.get_bind().dialect.name](EmotionRollup)
+    session.execute(ins.on_conflict_do_update(
+        index_elements=list(_CLAVE),
+        set_={c: getattr(EmotionRollup, c) + getattr(ins.excluded, c) for c in _SUMAS},
+    ), filas)
+
+
+def apply_changes(session: Session, cs):
+    """Mantenedor de services/changes.py: suma y resta emociones por clave."""
+    if cs.deleted_projects or cs.new_projects:
+        session.execute(delete(EmotionRollup).where(
+            EmotionRollup.project_id.in_(cs.deleted_projects | cs.new_projects)))
+
+    filas = [dict(zip(_CLAVE + _SUMAS, clave + tuple(x)))
+             for clave, x in _deltas(cs).items()
+             if clave[0] not in cs.deleted_projects and any(x)]
+    if not filas:
+        return
+    _upsert(session, filas)
+    # Días que quedaron sin emociones
+    session.execute(delete(EmotionRollup).where(
+        EmotionRollup.project_id.in_({f["project_id"] for f in filas}), EmotionRollup.n <= 0))
+
+
+def rebuild(db: Session, project_ids=None) -> int:
+    """Recalcula el rollup desde la tabla emotions (todos los proyectos si no
+    se indican). Devuelve la cantidad de filas del rollup."""
+    base = select(
+        Emotion.project_id, Emotion.tipo, Emotion.intensidad,
+        func.coalesce(Emotion.fecha, SIN_FECHA).label("dia"),
+        _tramo_sql(Emotion.tipo, Emotion.intensidad).label("tramo"),
+    )
+    if project_ids is not None:
+        base = base.where(Emotion.project_id.in_(list(project_ids)))
+    e = base.subquery()
+    q = select(
+        e.c.project_id, e.c.tipo, e.c.dia, e.c.tramo,
+        func.count(), func.count(e.c.intensidad),
+        func.coalesce(func.sum(e.c.intensidad), 0.0),
+        func.coalesce(func.sum(e.c.intensidad * e.c.intensidad), 0.0),
+    ).group_by(e.c.project_id, e.c.tipo, e.c.dia, e.c.tramo)
+    filas = [dict(zip(_CLAVE + _SUMAS, r)) for r in db.execute(q)]
+
+    borrar = delete(EmotionRollup)
+    if project_ids is not None:
+        borrar = borrar.where(EmotionRollup.project_id.in_(list(project_ids)))
+    db.execute(borrar)
+    if filas:
+        db.execute(insert(EmotionRollup), filas)
+    db.commit()
+    return len(filas)
+
+
+def completar(db: Session) -> list:
+    """Construye el rollup de los proyectos con emociones que no lo tienen
+    (bases anteriores a esta tabla). Devuelve sus ids."""
+    faltan = db.scalars(
+        select(Emotion.project_id).distinct()
+        .where(~exists().where(EmotionRollup.project_id == Emotion.project_id))
+    ).all()
+    if faltan:
+        rebuild(db, faltan)
+    return list(faltan)
+
+
+# ── Lectura ────────────────────────────────────────────────────────────────────
+
+def promedio():
+    """Expresión SQL: intensidad promedio de las filas agrupadas (nulo si no hay valores)."""
+    return func.sum(EmotionRollup.suma) / func.nullif(func.sum(EmotionRollup.n_valor), 0)
+
+
+def por_tipo(db: Session, project_id: int) -> dict:
+    """tipo → {n, promedio, desvio} del proyecto."""
+    out = {}
+    for tipo, n, n_valor, suma, cuadrados in db.execute(
+        select(EmotionRollup.tipo, *[func.sum(getattr(EmotionRollup, c)) for c in _SUMAS])
+        .where(EmotionRollup.project_id == project_id).group_by(EmotionRollup.tipo)
+    ):
+        media = suma / n_valor if n_valor else None
+        varianza = max(cuadrados / n_valor - media * media, 0.0) if n_valor else None
+        out[tipo] = {"n": n, "promedio": media,
+                     "desvio": float(np.sqrt(varianza)) if varianza is not None else None}
+    return out
+
+
+def contribuciones(c: dict) -> dict:
+    """Aporte de filas del rollup a los estadísticos del IVB (campo → arreglo),
+    igual a sumar ivb_engine.contribuciones("emociones", ...) de sus emociones."""
+    tipo, tr, n = c["tipo"], c["tramo"], c["n"]
+    suma = c["suma"] + _DEFAULT * (n - c["n_valor"])
+    soft = np.isin(tipo, SOFT_TYPES)
+    hard = np.isin(tipo, HARD_TYPES)
+    hope = tipo == "esperanza"
+    baja = hope & (tr <= 1)
+    return {
+        "emociones":           n,
+        "blandas_n":           n * soft,
+        "blandas_suma":        suma * soft,
+        "duras_n":             n * hard,
+        "duras_suma":          suma * hard,
+        "esperanza_n":         n * hope,
+        "esperanza_baja_n":    n * baja,
+        "esperanza_baja_suma": suma * baja,
+        "esperanza_cond_n":    n * (hope & ((tr == 1) | (tr == 2))),
+    }
+
+
+def matriz(c: dict) -> np.ndarray:
+    """Contribuciones como matriz filas del rollup × ivb_engine.CAMPOS."""
+    m = np.zeros((len(c["n"]), len(CAMPOS)))
+    for campo, v in contribuciones(c).items():
+        m[:, CAMPOS.index(campo)] = v
+    return m
+
+
+def columnas(db: Session, project_ids, por_dia: bool = False) -> dict:
+    """Filas del rollup como arreglos (project_id, tipo, tramo, n, n_valor,
+    suma y, con por_dia, dia como datetime64 con NaT para SIN_FECHA)."""
+    claves = [EmotionRollup.project_id, EmotionRollup.tipo, EmotionRollup.tramo]
+    if por_dia:
+        claves.append(EmotionRollup.dia)
+    filas = db.execute(
+        select(*claves, func.sum(EmotionRollup.n), func.sum(EmotionRollup.n_valor), func.sum(EmotionRollup.suma))
+        .where(EmotionRollup.project_id.in_(list(project_ids))).group_by(*claves)
+    ).all()
+    valores = list(zip(*filas)) if filas else [()] * (len(claves) + 3)
+    c = {
+        "project_id": np.array(valores[0], dtype=float),
+        "tipo":       np.array(valores[1], dtype=str),
+        "tramo":      np.array(valores[2], dtype=float),
+        "n":          np.array(valores[-3], dtype=float),
+        "n_valor":    np.array(valores[-2], dtype=float),
+        "suma":       np.array(valores[-1], dtype=float),
+    }
+    if por_dia:
+        c["dia"] = np.array([d if d != SIN_FECHA else None for d in valores[3]], dtype="datetime64[D]")
+    return c
+
+
+def estadisticos(db: Session, project_ids) -> dict:
+    """Campos emocionales del IVB → arreglo con un valor por proyecto, en el
+    orden de `project_ids`."""
+    ids = np.asarray(list(project_ids), dtype=float)
+    c = columnas(db, project_ids)
+    orden = np.argsort(ids)
+    pos = orden[np.searchsorted(ids, c["project_id"], sorter=orden)]
+    return {campo: np.bincount(pos, weights=v, minlength=len(ids))
+            for campo, v in contribuciones(c).items()}
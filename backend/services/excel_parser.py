@@ -1,161 +1,390 @@
+import datetime
+import numpy as np
+import openpyxl
 import pandas as pd
-import tempfile, os
+import tempfile, os, time
+import multiprocessing, queue, traceback
+from contextlib import closing
+from pandas.api.types import is_datetime64_any_dtype
 from sqlalchemy.orm import Session
+from config import settings
 from models.narrative import Narrative
 from models.emotion import Emotion
 from models.archetype import Archetype
 from models.language_code import LanguageCode
 from models.community import Community
 from models.risk import Risk
+from services import masivo
 
-def _safe_date(val):
-    try:
-        if pd.isna(val): return None
-        return pd.to_datetime(val).date()
-    except:
+LOTE = 5000          # filas de la hoja por lote: la memoria no depende del tamaño del libro
+MAX_ERRORES = 1000   # celdas inválidas listadas por hoja (el total se informa siempre)
+# Textos que cuentan como celda vacía: los nulos que reconoce pandas al leer
+# un Excel y los errores de fórmula de Excel
+_NULOS = frozenset({
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+    "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+    "#NULL!", "#DIV/0!", "#VALUE!", "#REF!", "#NAME?", "#NUM!",
+})
+MIN_FILAS_PROCESOS = 20000   # por debajo, las hojas se leen en el mismo hilo (lanzar procesos cuesta ~1 s)
+
+# Conversión de una celda; se usa sólo con las que la pasada por columnas
+# rechaza (formatos que pandas no reconoce en bloque: "10/03/2026", " 6 ", ...).
+# Si también falla, la celda es inválida y queda el default.
+def _a_fecha(val):
+    return pd.to_datetime(val).date()
+
+def _a_real(val):
+    return float(val)
+
+def _a_entero(val):
+    return int(val)
+
+def _valor_crudo(val):
+    if isinstance(val, (datetime.date, datetime.time)):
+        return val.isoformat()
+    return val.item() if isinstance(val, np.generic) else val
+
+def _texto(s: pd.Series) -> pd.Series:
+    """str sin espacios a los costados; None si la celda está vacía."""
+    t = s.astype(object).astype(str).str.strip()
+    return pd.Series(np.where(s.notna() & (t != ""), t, None), index=s.index)
+
+def _numeros(s: pd.Series) -> pd.Series:
+    if is_datetime64_any_dtype(s):
+        return pd.Series(np.nan, index=s.index)
+    return pd.to_numeric(s, errors="coerce").astype(float)
+
+class _Hoja:
+    """Coerción por columnas de una hoja, lote por lote, y registro de las
+    celdas inválidas (con valor, pero no convertibles: se guardan con el
+    default). El índice del DataFrame es el número de fila en el Excel."""
+
+    def __init__(self, df: pd.DataFrame = None):
+        self.df = df
+        self.omitidas = 0
+        self.errores = []
+        self.total_errores = 0
+
+    def lote(self, df: pd.DataFrame) -> "_Hoja":
+        self.df = df
+        return self
+
+    def _serie(self, col: str) -> pd.Series:
+        if col in self.df.columns:
+            return self.df[col]
+        return pd.Series(None, index=self.df.index, dtype=object)
+
+    def clave(self, col: str) -> list:
+        """Texto del campo clave; descarta las filas que no lo tienen."""
+        valores = _texto(self._serie(col))
+        mascara = valores.notna().to_numpy()
+        self.omitidas += int((~mascara).sum())
+        self.df = self.df[mascara]
+        return valores[mascara].tolist()
+
+    def texto(self, col: str, default=None) -> list:
+        t = _texto(self._serie(col))
+        return (t if default is None else t.where(t.notna(), default)).tolist()
+
+    def real(self, col: str, default: float) -> list:
+        s = self._serie(col)
+        v = _numeros(s)
+        return self._completar(col, s, v.where(s.notna(), default).tolist(), s.notna() & v.isna(), _a_real, default)
+
+    def entero(self, col: str, default: int) -> list:
+        s = self._serie(col)
+        v = _numeros(s)
+        # Texto o número, la parte decimal se trunca igual ("12000.7" → 12000);
+        # fuera de int64 (e inf): celda por celda
+        validas = s.notna() & (v.abs() < 2 ** 63)
+        valores = np.trunc(v.where(validas, default)).astype(np.int64).tolist()
+        return self._completar(col, s, valores, s.notna() & ~validas, _a_entero, default)
+
+    def fecha(self, col: str) -> list:
+        s = self._serie(col)
+        ts = s if is_datetime64_any_dtype(s) else pd.to_datetime(s, errors="coerce", format="ISO8601")
+        if not is_datetime64_any_dtype(ts):
+            # zonas horarias mezcladas: todo celda por celda
+            ts = pd.Series(pd.NaT, index=s.index)
+        valores = np.where(ts.notna(), ts.dt.date, None).tolist()
+        return self._completar(col, s, valores, s.notna() & ts.isna(), _a_fecha, None)
+
+    def _completar(self, col, s, valores, rechazadas, conversion, default) -> list:
+        for i in np.flatnonzero(rechazadas.to_numpy()):
+            crudo = s.iloc[i]
+            try:
+                valores[i] = conversion(crudo)
+            except Exception:
+                valores[i] = default
+                self.total_errores += 1
+                if len(self.errores) < MAX_ERRORES:
+                    self.errores.append({"fila": int(s.index[i]), "columna": col,
+                                         "valor": _valor_crudo(crudo), "aplicado": default})
+        return valores
+
+    def reporte(self, filas: int) -> dict:
+        return {"filas": filas, "omitidas": self.omitidas,
+                "total_errores": self.total_errores,
+                "errores": sorted(self.errores, key=lambda e: e["fila"])}
+
+# Cada _parse_* arma las columnas de su tabla (columna → lista de valores) a
+# partir de la hoja; las filas sin el campo clave se descartan. La escritura la
+# hace masivo.insertar() en lotes, sin objetos del ORM.
+
+def _parse_narrativas(h: _Hoja, project_id: int) -> dict:
+    texto = h.clave("texto")
+    return {
+        "project_id":      [project_id] * len(texto),
+        "texto":           texto,
+        "tipo":            h.texto("tipo", "dominante"),
+        "actor_politico":  h.texto("actor"),
+        "fecha_deteccion": h.fecha("fecha"),
+        "peso":            h.real("peso", 5.0),
+    }
+
+def _parse_emociones(h: _Hoja, project_id: int) -> dict:
+    tipo = h.clave("tipo")
+    return {
+        "project_id": [project_id] * len(tipo),
+        "tipo":       [t.lower() for t in tipo],
+        "intensidad": h.real("intensidad", 5.0),
+        "fuente":     h.texto("fuente"),
+        "fecha":      h.fecha("fecha"),
+        "notas":      h.texto("notas"),
+    }
+
+def _canales(canales_raw) -> list:
+    return [c.strip() for c in canales_raw.split(",")] if canales_raw else []
+
+def _parse_arquetipos(h: _Hoja, project_id: int) -> dict:
+    nombre = h.clave("nombre")
+    return {
+        "project_id":        [project_id] * len(nombre),
+        "nombre":            nombre,
+        "descripcion":       h.texto("descripcion"),
+        "peso_relativo":     h.real("peso_relativo", 0.0),
+        "emocion_dominante": h.texto("emocion"),
+        "canales":           [_canales(v) for v in h.texto("canales")],
+        "valores_clave":     h.texto("valores_clave"),
+        "miedos":            h.texto("miedos"),
+    }
+
+def _parse_lenguaje(h: _Hoja, project_id: int) -> dict:
+    termino = h.clave("termino")
+    return {
+        "project_id":      [project_id] * len(termino),
+        "termino":         termino,
+        "tipo":            h.texto("tipo", "frase"),
+        "frecuencia":      h.entero("frecuencia", 1),
+        "contexto":        h.texto("contexto"),
+        "fecha_deteccion": h.fecha("fecha"),
+    }
+
+def _parse_comunidades(h: _Hoja, project_id: int) -> dict:
+    nombre = h.clave("nombre")
+    return {
+        "project_id":       [project_id] * len(nombre),
+        "plataforma":       h.texto("plataforma"),
+        "nombre_grupo":     nombre,
+        "tipo":             h.texto("tipo", "activo"),
+        "tamanio_estimado": h.entero("tamanio", 0),
+        "descripcion":      h.texto("descripcion"),
+        "influencia":       h.entero("influencia", 5),
+    }
+
+def _parse_riesgos(h: _Hoja, project_id: int) -> dict:
+    tema = h.clave("tema")
+    return {
+        "project_id":            [project_id] * len(tema),
+        "tema":                  tema,
+        "descripcion":           h.texto("descripcion"),
+        "nivel":                 h.texto("nivel", "amarillo"),
+        "velocidad_crecimiento": h.entero("velocidad", 3),
+        "fecha_deteccion":       h.fecha("fecha"),
+        "activo":                [True] * len(tema),
+    }
+
+SHEET_MAP = {
+    "narrativas":  (Narrative, _parse_narrativas),
+    "emociones":   (Emotion, _parse_emociones),
+    "arquetipos":  (Archetype, _parse_arquetipos),
+    "lenguaje":    (LanguageCode, _parse_lenguaje),
+    "comunidades": (Community, _parse_comunidades),
+    "riesgos":     (Risk, _parse_riesgos),
+}
+
+def _celda(val):
+    """Valor de la celda como lo entrega el lector de pandas: vacías, textos
+    nulos ("NA", "#N/A", ...) y errores de fórmula → None; float entero → int."""
+    if val is None or (isinstance(val, str) and val in _NULOS):
         return None
+    if isinstance(val, float) and val.is_integer():
+        return int(val)
+    return val
 
-def _safe_float(val, default=5.0):
+def _filas(ws):
+    """(número de fila, valores) de una hoja abierta en modo read-only. Se
+    ignora la dimensión que declara la hoja (algunos programas la escriben
+    mal) y se lee hasta la última fila; iter_rows completa las filas que
+    faltan en el archivo, así que la posición es el número de fila."""
+    ws.reset_dimensions()
+    return enumerate(ws.iter_rows(values_only=True), start=1)
+
+def _lotes(ws):
+    """DataFrames de hasta LOTE filas de la hoja, leída en modo streaming.
+    Columnas con el encabezado en minúsculas (si se repite, vale la primera),
+    dtype object (cada celda con su tipo) e índice = fila del Excel. Las filas
+    vacías se saltean."""
+    filas = _filas(ws)
+    _, encabezado = next(filas, (None, None))
+    if encabezado is None:
+        return
+    posiciones = {}
+    for i, c in enumerate(encabezado):
+        posiciones.setdefault(str(c).lower().strip() if c is not None else f"unnamed: {i}", i)
+    columnas, indices = list(posiciones), list(posiciones.values())
+    numeros, datos = [], []
+    for numero, fila in filas:
+        valores = [_celda(fila[i]) if i < len(fila) else None for i in indices]
+        if all(v is None for v in valores):
+            continue
+        numeros.append(numero)
+        datos.append(valores)
+        if len(datos) == LOTE:
+            yield pd.DataFrame(datos, columns=columnas, index=numeros, dtype=object)
+            numeros, datos = [], []
+    if datos:
+        yield pd.DataFrame(datos, columns=columnas, index=numeros, dtype=object)
+
+def _hoja_en_lotes(ws, key: str, project_id: int):
+    """(columnas, progreso) de cada lote de la hoja ya validado: el progreso
+    es el reporte acumulado más la última fila leída y las filas que declara
+    la hoja."""
+    parser = SHEET_MAP[key][1]
+    hoja, filas, declaradas = _Hoja(), 0, ws.max_row
+    for df in _lotes(ws):
+        cols = parser(hoja.lote(df), project_id)
+        filas += len(cols["project_id"])
+        yield cols, {**hoja.reporte(filas), "fila_actual": int(df.index[-1]), "filas_hoja": declaradas}
+
+def _en_serie(wb, hojas: list, project_id: int):
+    for titulo, key, _ in hojas:
+        for cols, progreso in _hoja_en_lotes(wb[titulo], key, project_id):
+            yield titulo, cols, progreso
+
+def _leer_hoja(path: str, titulo: str, key: str, project_id: int, cola):
+    """Proceso hijo: abre el libro, lee y valida una hoja y manda cada lote
+    por `cola` (acotada: si el padre no da abasto, el hijo espera)."""
     try:
-        if pd.isna(val): return default
-        return float(val)
-    except:
-        return default
+        wb = openpyxl.load_workbook(path, read_only=True, data_only=True, keep_links=False)
+        try:
+            for cols, progreso in _hoja_en_lotes(wb[titulo], key, project_id):
+                cola.put(("lote", titulo, cols, progreso))
+        finally:
+            wb.close()
+        cola.put(("fin", titulo, None, None))
+    except Exception:
+        cola.put(("error", titulo, traceback.format_exc(), None))
 
-def _safe_int(val, default=0):
+def _en_paralelo(path: str, hojas: list, project_id: int, procesos: int):
+    """Como _en_serie, pero cada hoja se lee y valida en su propio proceso
+    (a lo sumo `procesos` a la vez, las más grandes primero). Los lotes de
+    una hoja llegan en orden; los de hojas distintas, intercalados. Al
+    cerrar el generador (fin, error o corte) se terminan los procesos vivos."""
+    # spawn y no fork: el proceso padre tiene hilos (uvicorn, el pool de
+    # importaciones) y conexiones abiertas que el hijo no debe heredar
+    ctx = multiprocessing.get_context("spawn")
+    cola = ctx.Queue(maxsize=2 * procesos)
+    pendientes = sorted(hojas, key=lambda h: -(h[2] or 0))
+    vivos = {}
     try:
-        if pd.isna(val): return default
-        return int(val)
-    except:
-        return default
-
-def _safe_str(val):
-    if pd.isna(val): return None
-    return str(val).strip() or None
-
-def _parse_narrativas(df: pd.DataFrame, project_id: int, db: Session) -> int:
-    count = 0
-    for _, row in df.iterrows():
-        texto = _safe_str(row.get("texto"))
-        if not texto: continue
-        db.add(Narrative(
-            project_id=project_id,
-            texto=texto,
-            tipo=_safe_str(row.get("tipo")) or "dominante",
-            actor_politico=_safe_str(row.get("actor")),
-            fecha_deteccion=_safe_date(row.get("fecha")),
-            peso=_safe_float(row.get("peso"), 5.0),
-        ))
-        count += 1
-    return count
-
-def _parse_emociones(df: pd.DataFrame, project_id: int, db: Session) -> int:
-    count = 0
-    for _, row in df.iterrows():
-        tipo = _safe_str(row.get("tipo"))
-        if not tipo: continue
-        db.add(Emotion(
-            project_id=project_id,
-            tipo=tipo.lower(),
-            intensidad=_safe_float(row.get("intensidad"), 5.0),
-            fuente=_safe_str(row.get("fuente")),
-            fecha=_safe_date(row.get("fecha")),
-            notas=_safe_str(row.get("notas")),
-        ))
-        count += 1
-    return count
-
-def _parse_arquetipos(df: pd.DataFrame, project_id: int, db: Session) -> int:
-    count = 0
-    for _, row in df.iterrows():
-        nombre = _safe_str(row.get("nombre"))
-        if not nombre: continue
-        canales_raw = _safe_str(row.get("canales"))
-        canales = [c.strip() for c in canales_raw.split(",")] if canales_raw else []
-        db.add(Archetype(
-            project_id=project_id,
-            nombre=nombre,
-            descripcion=_safe_str(row.get("descripcion")),
-            peso_relativo=_safe_float(row.get("peso_relativo"), 0.0),
-            emocion_dominante=_safe_str(row.get("emocion")),
-            canales=canales,
-            valores_clave=_safe_str(row.get("valores_clave")),
-            miedos=_safe_str(row.get("miedos")),
-        ))
-        count += 1
-    return count
-
-def _parse_lenguaje(df: pd.DataFrame, project_id: int, db: Session) -> int:
-    count = 0
-    for _, row in df.iterrows():
-        termino = _safe_str(row.get("termino"))
-        if not termino: continue
-        db.add(LanguageCode(
-            project_id=project_id,
-            termino=termino,
-            tipo=_safe_str(row.get("tipo")) or "frase",
-            frecuencia=_safe_int(row.get("frecuencia"), 1),
-            contexto=_safe_str(row.get("contexto")),
-            fecha_deteccion=_safe_date(row.get("fecha")),
-        ))
-        count += 1
-    return count
-
-def _parse_comunidades(df: pd.DataFrame, project_id: int, db: Session) -> int:
-    count = 0
-    for _, row in df.iterrows():
-        nombre = _safe_str(row.get("nombre"))
-        if not nombre: continue
-        db.add(Community(
-            project_id=project_id,
-            plataforma=_safe_str(row.get("plataforma")),
-            nombre_grupo=nombre,
-            tipo=_safe_str(row.get("tipo")) or "activo",
-            tamanio_estimado=_safe_int(row.get("tamanio")),
-            descripcion=_safe_str(row.get("descripcion")),
-            influencia=_safe_int(row.get("influencia"), 5),
-        ))
-        count += 1
-    return count
-
-def _parse_riesgos(df: pd.DataFrame, project_id: int, db: Session) -> int:
-    count = 0
-    for _, row in df.iterrows():
-        tema = _safe_str(row.get("tema"))
-        if not tema: continue
-        db.add(Risk(
-            project_id=project_id,
-            tema=tema,
-            descripcion=_safe_str(row.get("descripcion")),
-            nivel=_safe_str(row.get("nivel")) or "amarillo",
-            velocidad_crecimiento=_safe_int(row.get("velocidad"), 3),
-            fecha_deteccion=_safe_date(row.get("fecha")),
-            activo=True,
-        ))
-        count += 1
-    return count
+        while pendientes or vivos:
+            while pendientes and len(vivos) < procesos:
+                titulo, key, _ = pendientes.pop(0)
+                vivos[titulo] = ctx.Process(target=_leer_hoja, args=(path, titulo, key, project_id, cola),
+                                            daemon=True)
+                vivos[titulo].start()
+            try:
+                tipo, titulo, datos, progreso = cola.get(timeout=1)
+            except queue.Empty:
+                caidos = [t for t, p in vivos.items() if p.exitcode not in (None, 0)]
+                if caidos:
+                    raise RuntimeError(f"Se interrumpió la lectura de la hoja {caidos[0]}")
+                continue
+            if tipo == "error":
+                raise RuntimeError(f"Error leyendo la hoja {titulo}: {datos.strip().splitlines()[-1]}")
+            if tipo == "fin":
+                vivos.pop(titulo).join()
+            else:
+                yield titulo, datos, progreso
+    finally:
+        for p in vivos.values():
+            p.terminate()
+        for p in vivos.values():
+            p.join()
+        cola.close()
 
-SHEET_MAP = {
-    "narrativas":  _parse_narrativas,
-    "emociones":   _parse_emociones,
-    "arquetipos":  _parse_arquetipos,
-    "lenguaje":    _parse_lenguaje,
-    "comunidades": _parse_comunidades,
-    "riesgos":     _parse_riesgos,
-}
+def _procesos(procesos) -> int:
+    if procesos is None:
+        procesos = settings.import_processes
+    return procesos if procesos > 0 else os.cpu_count() or 1
+
+def parse_excel(path: str, project_id: int, db: Session, dry_run: bool = False,
+                al_avanzar=None, procesos: int = None) -> dict:
+    """Importa las hojas conocidas del Excel en una sola transacción.
+    El libro se lee en modo read-only (fila por fila, ver _filas) y cada lote
+    de LOTE filas se valida e inserta antes de leer el siguiente.
+    Devuelve las filas importadas por hoja, el reporte de validación (filas
+    sin clave y celdas inválidas) y el rendimiento (filas/s). Con dry_run
+    sólo valida: no escribe nada.
 
-def parse_excel(path: str, project_id: int, db: Session) -> dict:
-    xl = pd.ExcelFile(path)
-    importados = {}
-    for sheet in xl.sheet_names:
-        key = sheet.lower().strip()
-        if key in SHEET_MAP:
-            df = xl.parse(sheet)
-            df.columns = [str(c).lower().strip() for c in df.columns]
-            count = SHEET_MAP[key](df, project_id, db)
-            importados[key] = count
-    db.commit()
-    return importados
+    Si el libro tiene varias hojas y al menos MIN_FILAS_PROCESOS filas, la
+    lectura y validación de cada hoja corre en un proceso aparte (hasta
+    `procesos`; por defecto settings.import_processes, 0 = uno por CPU) y
+    este hilo sólo inserta, así el libro tarda más o menos lo que su hoja
+    más grande. Con procesos=1 todo corre en el hilo que llama.
+
+    al_avanzar(hoja, progreso) se llama después de cada lote con el reporte
+    de la hoja más la última fila leída y el total de filas que declara la
+    hoja; si lanza una excepción, la importación se corta sin confirmar."""
+    inicio = time.perf_counter()
+    wb = openpyxl.load_workbook(path, read_only=True, data_only=True, keep_links=False)
+    try:
+        hojas = [(ws.title, ws.title.lower().strip(), ws.max_row) for ws in wb.worksheets
+                 if ws.title.lower().strip() in SHEET_MAP]
+        procesos = min(_procesos(procesos), len(hojas))
+        if procesos > 1 and sum(n or 0 for _, _, n in hojas) >= MIN_FILAS_PROCESOS:
+            lotes = _en_paralelo(path, hojas, project_id, procesos)
+        else:
+            lotes = _en_serie(wb, hojas, project_id)
+        claves = {titulo: key for titulo, key, _ in hojas}
+        reportes = {titulo: _Hoja().reporte(0) for titulo in claves}
+        with closing(lotes):
+            for titulo, cols, progreso in lotes:
+                key = claves[titulo]
+                if not dry_run:
+                    masivo.insertar(db, SHEET_MAP[key][0], cols)
+                reportes[titulo] = progreso
+                if al_avanzar:
+                    al_avanzar(key, progreso)
+    finally:
+        wb.close()
+    if not dry_run:
+        db.commit()
+    importados, validacion, total = {}, {}, 0
+    for titulo, key in claves.items():
+        r = reportes[titulo]
+        importados[key] = r["filas"]
+        validacion[key] = {k: r[k] for k in ("filas", "omitidas", "total_errores", "errores")}
+        total += r["filas"]
+    segundos = time.perf_counter() - inicio
+    return {
+        "importados": importados,
+        "validacion": validacion,
+        "dry_run": dry_run,
+        "segundos": round(segundos, 3),
+        "filas_por_segundo": round(total / segundos) if segundos else None,
+    }
 
 def generate_template() -> str:
     path = tempfile.mktemp(suffix=".xlsx")
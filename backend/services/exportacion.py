@@ -0,0 +1,187 @@
+"""
+Exportación completa de un proyecto en streaming (Parquet, Arrow IPC o NDJSON).
+
+Cada tabla se lee con `yield_per` (cursor del lado del servidor en
+PostgreSQL) en lotes de LOTE filas, y cada lote se escribe y se entrega
+apenas se lee: la memoria queda acotada a un lote sin importar el tamaño del
+proyecto.
+
+  ndjson   una línea JSON por fila, con la tabla en "tabla"
+  parquet  zip con un .parquet por tabla (un row group por lote)
+  arrow    zip con un stream Arrow IPC (.arrows) por tabla
+
+El zip se escribe sin comprimir (Parquet ya comprime) y sin volver atrás, así
+sale por la respuesta a medida que se arma. Parquet y Arrow necesitan pyarrow,
+que es opcional (`pip install pyarrow`).
+"""
+import datetime
+import io
+import json
+import zipfile
+from sqlalchemy import JSON, Boolean, Date, DateTime, Float, Integer, select
+from database import SessionLocal
+from models.project import Project
+from models.narrative import Narrative
+from models.emotion import Emotion
+from models.archetype import Archetype
+from models.language_code import LanguageCode
+from models.community import Community
+from models.risk import Risk
+from models.simulation import Simulation
+
+LOTE = 5000
+FORMATOS = {
+    "ndjson":  ("application/x-ndjson", "ndjson"),
+    "parquet": ("application/zip", "zip"),
+    "arrow":   ("application/zip", "zip"),
+}
+# Tablas con los datos cargados del proyecto (las derivadas se recalculan)
+TABLAS = [Project, Narrative, Emotion, Archetype, LanguageCode, Community, Risk, Simulation]
+
+
+def pyarrow_disponible() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _lotes(db, model, project_id: int):
+    """Filas de la tabla del proyecto en lotes de LOTE (tuplas en el orden de las columnas)."""
+    filtro = model.id if model is Project else model.project_id
+    resultado = db.execute(
+        select(*model.__table__.columns).where(filtro == project_id).order_by(model.id)
+        .execution_options(yield_per=LOTE)
+    )
+    yield from resultado.partitions()
+
+
+def _abrir():
+    db = SessionLocal()
+    if db.get_bind().dialect.name == "postgresql":
+        # Todas las tablas desde la misma foto de la base
+        db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+    return db
+
+
+# ── NDJSON ─────────────────────────────────────────────────────────────────────
+
+def _json(v):
+    if isinstance(v, (datetime.date, datetime.datetime)):
+        return v.isoformat()
+    raise TypeError(f"No serializable: {type(v).__name__}")
+
+
+def ndjson(project_id: int):
+    db = _abrir()
+    try:
+        for model in TABLAS:
+            nombres = [c.name for c in model.__table__.columns]
+            for lote in _lotes(db, model, project_id):
+                yield "".join(
+                    json.dumps({"tabla": model.__tablename__, **dict(zip(nombres, fila))},
+                               default=_json, ensure_ascii=False) + "\n"
+                    for fila in lote
+                ).encode()
+    finally:
+        db.close()
+
+
+# ── Parquet / Arrow ────────────────────────────────────────────────────────────
+
+class _Salida(io.RawIOBase):
+    """Destino del zip: acumula lo escrito hasta que el generador lo entrega."""
+
+    def __init__(self):
+        self._partes = []
+
+    def writable(self):
+        return True
+
+    def write(self, datos):
+        self._partes.append(bytes(datos))
+        return len(datos)
+
+    def vaciar(self) -> bytes:
+        datos = b"".join(self._partes)
+        self._partes.clear()
+        return datos
+
+
+class _Entrada(io.RawIOBase):
+    """Archivo del zip con tell(), que pyarrow pide al escribir."""
+
+    def __init__(self, destino):
+        self._destino, self._pos = destino, 0
+
+    def writable(self):
+        return True
+
+    def write(self, datos):
+        self._destino.write(datos)
+        self._pos += len(datos)
+        return len(datos)
+
+    def tell(self):
+        return self._pos
+
+
+def _tipo_arrow(pa, columna):
+    t = columna.type
+    if isinstance(t, Boolean):
+        return pa.bool_()
+    if isinstance(t, Integer):
+        return pa.int64()
+    if isinstance(t, Float):
+        return pa.float64()
+    if isinstance(t, DateTime):
+        return pa.timestamp("us", tz="UTC" if t.timezone else None)
+    if isinstance(t, Date):
+        return pa.date32()
+    return pa.string()   # String, Text y JSON (serializado)
+
+
+def _esquema(pa, model):
+    return pa.schema([pa.field(c.name, _tipo_arrow(pa, c), nullable=c.nullable)
+                      for c in model.__table__.columns])
+
+
+def _lote_arrow(pa, esquema, model, filas):
+    columnas = list(zip(*filas))
+    arreglos = []
+    for i, c in enumerate(model.__table__.columns):
+        valores = columnas[i]
+        if isinstance(c.type, JSON):
+            valores = [json.dumps(v, ensure_ascii=False) if v is not None else None for v in valores]
+        arreglos.append(pa.array(valores, type=esquema.field(i).type))
+    return pa.record_batch(arreglos, schema=esquema)
+
+
+def columnar(project_id: int, formato: str):
+    """Zip con un archivo por tabla; `formato` es "parquet" o "arrow"."""
+    import pyarrow as pa
+    import pyarrow.ipc
+    import pyarrow.parquet as pq
+
+    salida = _Salida()
+    db = _abrir()
+    try:
+        with zipfile.ZipFile(salida, "w", compression=zipfile.ZIP_STORED) as zf:
+            for model in TABLAS:
+                esquema = _esquema(pa, model)
+                extension = "parquet" if formato == "parquet" else "arrows"
+                with zf.open(f"{model.__tablename__}.{extension}", "w", force_zip64=True) as f:
+                    entrada = _Entrada(f)
+                    escritor = pq.ParquetWriter(entrada, esquema) if formato == "parquet" \
+                        else pa.ipc.new_stream(entrada, esquema)
+                    try:
+                        for lote in _lotes(db, model, project_id):
+                            escritor.write_batch(_lote_arrow(pa, esquema, model, lote))
+                            yield salida.vaciar()
+                    finally:
+                        escritor.close()
+                yield salida.vaciar()
+        yield salida.vaciar()
+    finally:
+        db.close()
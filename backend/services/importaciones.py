@@ -0,0 +1,198 @@
+"""
+Importaciones de Excel en segundo plano.
+
+POST /api/upload/{project_id} deja el archivo en disco, encola un trabajo y
+responde enseguida con su id; un pool de hilos corre parse_excel y el cliente
+consulta el avance en GET /api/upload/jobs/{id} (por hoja: filas importadas,
+última fila leída, celdas inválidas; en total: filas/s).
+
+Los trabajos de un mismo proyecto se ejecutan de a uno y en orden de llegada:
+cada proyecto tiene su cola y sólo la cabeza está en el pool, así un
+proyecto con varias cargas no ocupa todos los hilos ni compite consigo mismo
+por las mismas filas derivadas. En SQLite el pool es de un hilo (un solo
+escritor a la vez). Dentro de un trabajo, las hojas de un libro grande se
+leen y validan en procesos aparte (IMPORT_PROCESSES) y el hilo sólo inserta.
+
+Cancelar un trabajo en cola lo saca de la cola; uno en curso se corta al
+terminar el lote actual y la transacción se descarta (no queda nada escrito).
+
+El registro es en memoria y por proceso: con varios workers de uvicorn, el
+avance se consulta en el mismo proceso que recibió la carga.
+"""
+import datetime
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from config import settings
+from database import SessionLocal, engine
+from services.excel_parser import parse_excel
+
+_MAX_TERMINADOS = 100   # trabajos terminados que se siguen informando
+
+EN_COLA, EN_CURSO, COMPLETO, ERROR, CANCELADO = "en_cola", "en_curso", "completo", "error", "cancelado"
+_TERMINADOS = {COMPLETO, ERROR, CANCELADO}
+
+
+class Cancelada(Exception):
+    pass
+
+
+class Trabajo:
+    def __init__(self, project_id: int, ruta: str, archivo: str, dry_run: bool):
+        self.id = uuid.uuid4().hex
+        self.project_id = project_id
+        self.ruta = ruta
+        self.archivo = archivo
+        self.dry_run = dry_run
+        self.estado = EN_COLA
+        self.creado = datetime.datetime.now(datetime.timezone.utc)
+        self.iniciado = self.terminado = None
+        self.hojas = {}
+        self.resultado = None
+        self.error = None
+        self.cancelar = threading.Event()
+        self._inicio = self._fin = None
+
+    def _avance(self, hoja: str, progreso: dict):
+        self.hojas[hoja] = progreso
+        if self.cancelar.is_set():
+            raise Cancelada()
+
+    def estado_json(self) -> dict:
+        hojas = dict(self.hojas)    # el hilo del trabajo la sigue actualizando
+        filas = sum(h["filas"] for h in hojas.values())
+        fin = self._fin if self._fin is not None else time.monotonic()
+        segundos = fin - self._inicio if self._inicio is not None else 0
+        return {
+            "id": self.id,
+            "project_id": self.project_id,
+            "archivo": self.archivo,
+            "dry_run": self.dry_run,
+            "estado": self.estado,
+            "posicion": posicion(self),
+            "creado": self.creado,
+            "iniciado": self.iniciado,
+            "terminado": self.terminado,
+            "hojas": hojas,
+            "filas": filas,
+            "segundos": round(segundos, 3),
+            "filas_por_segundo": round(filas / segundos) if segundos else None,
+            "resultado": self.resultado,
+            "error": self.error,
+        }
+
+
+_trabajos = OrderedDict()   # id → Trabajo, en orden de llegada
+_colas = {}                 # project_id → deque de trabajos (la cabeza es la que corre)
+_lock = threading.Lock()
+_pool = ThreadPoolExecutor(
+    max_workers=1 if engine.dialect.name == "sqlite" else max(1, settings.import_workers),
+    thread_name_prefix="importacion",
+)
+
+
+def _terminar(t: Trabajo, estado: str):
+    t.estado = estado
+    t.terminado = datetime.datetime.now(datetime.timezone.utc)
+    t._fin = time.monotonic()
+    try:
+        os.unlink(t.ruta)
+    except FileNotFoundError:
+        pass
+
+
+def _siguiente(t: Trabajo):
+    """Saca `t` de la cola de su proyecto y lanza el próximo."""
+    with _lock:
+        cola = _colas[t.project_id]
+        cola.remove(t)
+        if cola:
+            _pool.submit(_correr, cola[0])
+        else:
+            del _colas[t.project_id]
+
+
+def _correr(t: Trabajo):
+    if t.cancelar.is_set():
+        _terminar(t, CANCELADO)
+        _siguiente(t)
+        return
+    t.estado = EN_CURSO
+    t.iniciado = datetime.datetime.now(datetime.timezone.utc)
+    t._inicio = time.monotonic()
+    db = SessionLocal()
+    try:
+        t.resultado = parse_excel(t.ruta, t.project_id, db, dry_run=t.dry_run, al_avanzar=t._avance)
+        _terminar(t, COMPLETO)
+    except Cancelada:
+        db.rollback()
+        _terminar(t, CANCELADO)
+    except Exception as e:
+        db.rollback()
+        t.error = str(e) or type(e).__name__
+        _terminar(t, ERROR)
+    finally:
+        db.close()
+        _siguiente(t)
+
+
+def _depurar():
+    terminados = [i for i, t in _trabajos.items() if t.estado in _TERMINADOS]
+    for i in terminados[:max(0, len(terminados) - _MAX_TERMINADOS)]:
+        del _trabajos[i]
+
+
+def encolar(project_id: int, ruta: str, archivo: str, dry_run: bool = False) -> Trabajo:
+    """Registra la importación del archivo en `ruta` (que pasa a ser del
+    trabajo: se borra al terminar) y la lanza si el proyecto no tiene otra."""
+    t = Trabajo(project_id, ruta, archivo, dry_run)
+    with _lock:
+        _depurar()
+        _trabajos[t.id] = t
+        cola = _colas.setdefault(project_id, deque())
+        cola.append(t)
+        if len(cola) == 1:
+            _pool.submit(_correr, t)
+    return t
+
+
+def obtener(trabajo_id: str):
+    return _trabajos.get(trabajo_id)
+
+
+def listar(project_id: int = None) -> list:
+    with _lock:
+        return [t for t in _trabajos.values() if project_id is None or t.project_id == project_id]
+
+
+def posicion(t: Trabajo):
+    """Trabajos del mismo proyecto por delante (None si no está en cola)."""
+    with _lock:
+        if t.estado != EN_COLA:
+            return None
+        cola = _colas.get(t.project_id, ())
+        return next((i for i, x in enumerate(cola) if x is t), None)
+
+
+def cancelar(t: Trabajo) -> bool:
+    """Pide cortar el trabajo. Uno en cola (que no sea la cabeza, ya enviada
+    al pool) sale de la cola enseguida; el resto se corta en el próximo lote."""
+    with _lock:
+        if t.estado in _TERMINADOS:
+            return False
+        t.cancelar.set()
+        cola = _colas.get(t.project_id)
+        if t.estado == EN_COLA and cola and cola[0] is not t:
+            cola.remove(t)
+            _terminar(t, CANCELADO)
+    return True
+
+
+def cancelar_todos():
+    """Al apagar la app: corta lo que esté en curso o en cola (el pool espera
+    a sus hilos antes de salir)."""
+    for t in listar():
+        cancelar(t)
@@ -0,0 +1,140 @@
+"""
+Incertidumbre del IVB — bootstrap vectorizado y sensibilidad a los pesos.
+
+Cada estadístico del índice es una suma de aportes por fila
+(ivb_engine.contribuciones), así que una réplica bootstrap es una suma ponderada
+por cuántas veces salió cada fila. Las filas con el mismo vector de aporte son
+intercambiables: se agrupan en patrones distintos y la réplica se obtiene con un
+sorteo multinomial sobre los patrones (equivalente exacto a remuestrear filas;
+si casi todas las filas son distintas se sortean filas y se cuentan por patrón).
+Todas las réplicas salen de un producto matriz (réplicas × patrones) @
+(patrones × campos), sin bucles por réplica.
+
+Se remuestrean narrativas, emociones, lenguaje y comunidades; arquetipos y
+riesgos son catálogos curados y quedan fijos.
+"""
+from typing import Optional
+import numpy as np
+from sqlalchemy.orm import Session
+from services import ivb_engine
+from services.ivb_engine import CAMPOS, PESOS
+
+REMUESTREO = ("narrativas", "emociones", "lenguaje", "comunidades")
+
+# Mismos cortes que routes/ivb._estado
+_CORTES = (30, 55, 75)
+_NIVELES = ("bajo", "medio", "alto", "critico")
+
+# Tope de celdas (réplicas × filas) por bloque al sortear filas
+_CELDAS = 4_000_000
+
+
+def _patrones(tabla: str, c: dict):
+    """(campos, patrones distintos de aporte, patrón de cada fila, filas por patrón)."""
+    aportes = ivb_engine.contribuciones(tabla, c)
+    campos = tuple(aportes)
+    m = np.column_stack([aportes[k] for k in campos])
+    orden = np.lexsort(m.T[::-1])
+    ms = m[orden]
+    nuevo = np.r_[True, (ms[1:] != ms[:-1]).any(axis=1)]
+    patron = np.empty(len(m), dtype=np.int64)
+    patron[orden] = np.cumsum(nuevo) - 1
+    return campos, ms[nuevo], patron, np.bincount(patron)
+
+
+def _conteos(patron: np.ndarray, cuenta: np.ndarray, b: int, rng: np.random.Generator) -> np.ndarray:
+    """Veces que sale cada patrón en cada réplica (b × patrones)."""
+    n, k = len(patron), len(cuenta)
+    if k * 8 <= n:
+        # Pocos patrones: sorteo multinomial directo
+        return rng.multinomial(n, cuenta / n, size=b)
+    # Casi todas las filas distintas: sortear filas y contar, por bloques de réplicas
+    out = np.empty((b, k), dtype=np.int64)
+    bloque = max(1, _CELDAS // n)
+    for i in range(0, b, bloque):
+        r = min(bloque, b - i)
+        filas = patron[rng.integers(0, n, size=(r, n))] + (np.arange(r) * k)[:, None]
+        out[i:i + r] = np.bincount(filas.ravel(), minlength=r * k).reshape(r, k)
+    return out
+
+
+def patrones(cols: dict) -> dict:
+    """tabla → patrones de aporte (se calculan una vez por análisis)."""
+    return {t: _patrones(t, c) for t, c in cols.items() if len(c["project_id"])}
+
+
+def puntual(pats: dict) -> dict:
+    """Estadísticos de los datos originales a partir de los patrones."""
+    s = dict.fromkeys(CAMPOS, 0.0)
+    for campos, unicos, _, cuenta in pats.values():
+        for campo, x in zip(campos, cuenta @ unicos):
+            s[campo] += float(x)
+    return s
+
+
+def replicas(pats: dict, b: int, rng: np.random.Generator) -> dict:
+    """Estadísticos de b réplicas bootstrap: campo → arreglo de largo b."""
+    s = {c: np.zeros(b) for c in CAMPOS}
+    for tabla, (campos, unicos, patron, cuenta) in pats.items():
+        if tabla in REMUESTREO:
+            sumas = _conteos(patron, cuenta, b, rng) @ unicos
+        else:
+            sumas = np.broadcast_to(cuenta @ unicos, (b, len(campos)))
+        for j, campo in enumerate(campos):
+            s[campo] += sumas[:, j]
+    return s
+
+
+def _resumen(puntual: float, valores: np.ndarray, nivel: float) -> dict:
+    alfa = (1 - nivel) / 2
+    lo, hi = np.quantile(valores, [alfa, 1 - alfa])
+    return {
+        "valor": round(float(puntual), 1),
+        "media": round(float(valores.mean()), 1),
+        "error_estandar": round(float(valores.std(ddof=1)), 2) if len(valores) > 1 else 0.0,
+        "intervalo": [round(float(lo), 1), round(float(hi), 1)],
+    }
+
+
+def sensibilidad(comp: dict, delta: float) -> list:
+    """Cuánto se mueve el IVB si el peso de un componente sube o baja `delta`
+    (los pesos se renormalizan para seguir sumando 1)."""
+    ivb = float(ivb_engine.indice(comp))
+    result = []
+    for k, w in PESOS.items():
+        c = float(comp[k])
+        baja = min(delta, w)
+        mas = (ivb + delta * c) / (1 + delta)
+        menos = (ivb - baja * c) / (1 - baja)
+        result.append({
+            "componente": k,
+            "peso": w,
+            "valor": round(c, 1),
+            "ivb_peso_mas": round(mas, 1),
+            "ivb_peso_menos": round(menos, 1),
+            # dIVB/dδ en δ = 0: positivo si el componente está por encima del índice
+            "pendiente": round(c - ivb, 1),
+        })
+    return sorted(result, key=lambda x: -abs(x["pendiente"]))
+
+
+def analizar(db: Session, project_id: int, replicas_n: int = 2000, nivel: float = 0.95,
+             delta: float = 0.05, semilla: Optional[int] = None) -> dict:
+    cols = ivb_engine.load_columns(db, [project_id])
+    rng = np.random.default_rng(semilla)
+
+    pats = patrones(cols)
+    comp = ivb_engine.componentes(puntual(pats))
+    comp_b = ivb_engine.componentes(replicas(pats, replicas_n, rng))
+    ivb_b = ivb_engine.indice(comp_b)
+
+    zonas = np.bincount(np.digitize(np.round(ivb_b, 1), _CORTES, right=True), minlength=len(_NIVELES))
+    return {
+        "replicas": replicas_n,
+        "nivel": nivel,
+        "filas": {t: len(cols[t]["project_id"]) for t in REMUESTREO},
+        "ivb": _resumen(ivb_engine.indice(comp), ivb_b, nivel),
+        "componentes": {k: _resumen(comp[k], comp_b[k], nivel) for k in PESOS},
+        "probabilidad_zona": {z: round(float(p), 3) for z, p in zip(_NIVELES, zonas / replicas_n)},
+        "sensibilidad_pesos": sensibilidad(comp, delta),
+    }
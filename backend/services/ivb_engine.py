@@ -0,0 +1,310 @@
+"""
+Motor columnar del IVB (Indicador de Voto Blando).
+
+En lugar de materializar objetos ORM, trae sólo las columnas que usa el índice
+como arreglos NumPy (uno por columna) y reduce cada tabla a un pequeño vector de
+estadísticos suficientes: conteos, sumas de frecuencia, sumas de intensidad por
+tipo, pesos de comunidades, etc. Los cinco sub-índices se derivan de esos
+estadísticos con las mismas fórmulas que routes/ivb.py.
+
+`componentes()` opera elemento a elemento, así que acepta tanto escalares como
+arreglos de estadísticos (varios proyectos, varias fechas o réplicas bootstrap).
+"""
+import numpy as np
+from sqlalchemy import Boolean, Date, String, case
+from sqlalchemy.orm import Session
+from models.narrative import Narrative
+from models.emotion import Emotion
+from models.language_code import LanguageCode
+from models.community import Community
+from models.risk import Risk
+from models.archetype import Archetype
+from models.lexical_feature import LexicalFeature
+from services import lexical_index
+from services.lexicon import MATCHER
+
+_TEXTO = np.dtypes.StringDType()
+
+# Columnas que necesita cada tabla (además de project_id)
+COLUMNAS = {
+    "narrativas":  (Narrative,    ("texto", "tipo", "peso")),
+    "lenguaje":    (LanguageCode, ("termino", "contexto", "frecuencia")),
+    "emociones":   (Emotion,      ("tipo", "intensidad")),
+    "comunidades": (Community,    ("tipo", "tamanio_estimado", "influencia")),
+    "arquetipos":  (Archetype,    ("peso_relativo", "emocion_dominante")),
+    "riesgos":     (Risk,         ("velocidad_crecimiento", "activo")),
+}
+
+# Columna de fecha de las tablas que la tienen (series temporales)
+FECHAS = {
+    "narrativas": "fecha_deteccion",
+    "lenguaje":   "fecha_deteccion",
+    "emociones":  "fecha",
+    "riesgos":    "fecha_deteccion",
+}
+
+# Estadísticos suficientes del índice
+CAMPOS = (
+    "narrativas", "narr_indecision", "narr_volatiles", "narr_condicionales",
+    "lenguaje", "leng_frecuencia", "leng_indecision", "leng_condicional",
+    "emociones", "blandas_n", "blandas_suma", "duras_n", "duras_suma",
+    "esperanza_n", "esperanza_baja_n", "esperanza_baja_suma", "esperanza_cond_n",
+    "comunidades", "comunidades_peso", "comunidades_peso_tipo",
+    "arquetipos", "arquetipos_peso", "arquetipos_blando",
+    "riesgos", "riesgos_velocidad",
+)
+
+SOFT_TYPES  = ("desconfianza", "frustracion", "miedo")
+HARD_TYPES  = ("ira", "orgullo")
+VOLATILES   = ("emergente", "contrarrelato")
+TIPO_W      = {"silencioso": 100, "amplificador": 65, "activo": 35, "polarizado": 5}
+BLANDO_EMOC = ("desconfianza", "miedo", "frustracion")
+PESOS       = {"IIN": 0.25, "IEB": 0.20, "INM": 0.20, "IVN": 0.20, "ICC": 0.15}
+
+
+# ── Carga columnar ─────────────────────────────────────────────────────────────
+
+def _array(column, values) -> np.ndarray:
+    """Convierte una columna a arreglo: texto → StringDType ('' si nulo),
+    booleano → bool (nulo = False), fecha → datetime64[D] (nulo = NaT),
+    numérico → float64 (nulo = NaN)."""
+    if isinstance(column.type, Date):
+        return np.array(values, dtype="datetime64[D]")
+    if isinstance(column.type, String):
+        return np.array([v if v is not None else "" for v in values], dtype=_TEXTO)
+    if isinstance(column.type, Boolean):
+        return np.asarray(values, dtype=object) == True
+    return np.array(values, dtype=float)
+
+
+def columns_from_rows(tabla: str, nombres, rows) -> dict:
+    """Arma el diccionario columna → arreglo a partir de tuplas de filas."""
+    valores = list(zip(*rows)) if rows else [()] * len(nombres)
+    return to_columns(tabla, dict(zip(nombres, valores)), fechas=FECHAS.get(tabla) in nombres)
+
+
+def _nombres(tabla: str, fechas: bool = False) -> tuple:
+    nombres = ("project_id",) + COLUMNAS[tabla][1]
+    if fechas and tabla in FECHAS:
+        nombres += (FECHAS[tabla],)
+    return nombres
+
+
+def to_columns(tabla: str, data: dict, fechas: bool = False) -> dict:
+    """columna → secuencia de valores  ⇒  columna → arreglo (sólo las que usa el IVB)."""
+    model = COLUMNAS[tabla][0]
+    cols = {n: _array(getattr(model, n), data[n]) for n in _nombres(tabla, fechas)}
+    for name in MATCHER.names:
+        if name in data:
+            # Banderas del índice léxico: 1/0, NaN si la fila no tiene índice vigente
+            cols[name] = np.array(data[name], dtype=float)
+    return cols
+
+
+def load_columns(db: Session, project_ids, fechas: bool = False, tablas=None) -> dict:
+    """Trae, para los proyectos dados, sólo las columnas que usa el IVB
+    (y la columna de fecha de cada tabla, si fechas=True), de todas las tablas
+    o de las indicadas en `tablas`.
+
+    Narrativas y lenguaje traen las banderas del índice léxico persistido; el
+    texto sólo viaja para las filas que no tienen índice vigente."""
+    cols = {}
+    for tabla, (model, _) in COLUMNAS.items():
+        if tablas is not None and tabla not in tablas:
+            continue
+        nombres = _nombres(tabla, fechas)
+        campos = [getattr(model, n) for n in nombres]
+        if tabla in lexical_index.TEXTOS:
+            textos = lexical_index.TEXTOS[tabla][1]
+            campos = [case((LexicalFeature.fila_id == None, col), else_=None) if n in textos else col
+                      for n, col in zip(nombres, campos)]
+            campos += [getattr(LexicalFeature, name) for name in MATCHER.names]
+            nombres += MATCHER.names
+        q = db.query(*campos).filter(model.project_id.in_(list(project_ids)))
+        if tabla in lexical_index.TEXTOS:
+            q = q.outerjoin(LexicalFeature, lexical_index.vigente(tabla))
+        if model is Risk:
+            q = q.filter(Risk.activo == True)
+        cols[tabla] = columns_from_rows(tabla, nombres, q.all())
+    return cols
+
+
+# ── Contribuciones por fila ────────────────────────────────────────────────────
+
+def lexicon_masks(*columns) -> dict:
+    """Léxico → máscara booleana por fila (todas las columnas de texto de la fila
+    se buscan juntas, con una sola llamada al matcher por columna completa)."""
+    bits = MATCHER.scan_many(*columns)
+    return {name: (bits & (1 << i)) != 0 for i, name in enumerate(MATCHER.names)}
+
+
+def _lexicos(c: dict, *textos) -> dict:
+    """Léxico → máscara por fila, desde el índice persistido cuando está y
+    buscando en el texto sólo las filas sin índice."""
+    if MATCHER.names[0] not in c:
+        return lexicon_masks(*[c[t] for t in textos])
+    faltan = np.isnan(c[MATCHER.names[0]])
+    hits = {name: c[name] == 1 for name in MATCHER.names}
+    if faltan.any():
+        buscados = lexicon_masks(*[c[t][faltan] for t in textos])
+        for name in MATCHER.names:
+            hits[name][faltan] = buscados[name]
+    return hits
+
+
+def _or(x: np.ndarray, default: float) -> np.ndarray:
+    """Equivalente vectorial de `x or default` (nulo o cero → default)."""
+    return np.where(np.isnan(x) | (x == 0), default, x)
+
+
+def contribuciones(tabla: str, c: dict) -> dict:
+    """Aporte de cada fila de `tabla` a los estadísticos (campo → arreglo por fila)."""
+    n = len(c["project_id"])
+    uno = np.ones(n)
+
+    if tabla == "narrativas":
+        tipo = c["tipo"]
+        peso = np.nan_to_num(c["peso"])
+        return {
+            "narrativas":         uno,
+            "narr_indecision":    _lexicos(c, "texto")["indecision"].astype(float),
+            "narr_volatiles":     np.isin(tipo, VOLATILES).astype(float),
+            "narr_condicionales": ((tipo == "emergente") & (peso >= 3) & (peso <= 7)).astype(float),
+        }
+
+    if tabla == "lenguaje":
+        f = np.nan_to_num(c["frecuencia"])
+        hits = _lexicos(c, "termino", "contexto")
+        return {
+            "lenguaje":         uno,
+            "leng_frecuencia":  f,
+            "leng_indecision":  f * hits["indecision"],
+            "leng_condicional": f * hits["condicional"],
+        }
+
+    if tabla == "emociones":
+        tipo = c["tipo"]
+        v = np.where(np.isnan(c["intensidad"]), 5.0, c["intensidad"])   # default de la columna
+        soft = np.isin(tipo, SOFT_TYPES)
+        hard = np.isin(tipo, HARD_TYPES)
+        hope = tipo == "esperanza"
+        baja = hope & (v <= 6)
+        return {
+            "emociones":           uno,
+            "blandas_n":           soft.astype(float),
+            "blandas_suma":        v * soft,
+            "duras_n":             hard.astype(float),
+            "duras_suma":          v * hard,
+            "esperanza_n":         hope.astype(float),
+            "esperanza_baja_n":    baja.astype(float),
+            "esperanza_baja_suma": v * baja,
+            "esperanza_cond_n":    (hope & (v >= 3) & (v <= 7)).astype(float),
+        }
+
+    if tabla == "comunidades":
+        w = _or(c["tamanio_estimado"], 100) * _or(c["influencia"], 5)
+        tw = np.full(n, 50.0)
+        for tipo, peso in TIPO_W.items():
+            tw[c["tipo"] == tipo] = peso
+        return {
+            "comunidades":           uno,
+            "comunidades_peso":      w,
+            "comunidades_peso_tipo": w * tw,
+        }
+
+    if tabla == "arquetipos":
+        p = np.nan_to_num(c["peso_relativo"])
+        return {
+            "arquetipos":        uno,
+            "arquetipos_peso":   p,
+            "arquetipos_blando": p * np.isin(c["emocion_dominante"], BLANDO_EMOC),
+        }
+
+    if tabla == "riesgos":
+        activo = c["activo"]
+        return {
+            "riesgos":           activo.astype(float),
+            "riesgos_velocidad": _or(c["velocidad_crecimiento"], 3) * activo,
+        }
+
+    raise ValueError(f"Tabla desconocida: {tabla}")
+
+
+def matriz(tabla: str, c: dict) -> np.ndarray:
+    """Contribuciones como matriz filas × CAMPOS (ceros en los campos ajenos a la tabla)."""
+    m = np.zeros((len(c["project_id"]), len(CAMPOS)))
+    for campo, v in contribuciones(tabla, c).items():
+        m[:, CAMPOS.index(campo)] = v
+    return m
+
+
+def estadisticos(cols: dict) -> dict:
+    """Suma las contribuciones de todas las tablas → campo → float."""
+    s = dict.fromkeys(CAMPOS, 0.0)
+    for tabla, c in cols.items():
+        for campo, v in contribuciones(tabla, c).items():
+            s[campo] += float(v.sum())
+    return s
+
+
+def estadisticos_por_proyecto(cols: dict, project_ids) -> dict:
+    """Como `estadisticos`, pero agrupado: campo → arreglo con un valor por
+    proyecto, en el orden de `project_ids`."""
+    ids = np.asarray(list(project_ids), dtype=float)
+    orden = np.argsort(ids)
+    s = {c: np.zeros(len(ids)) for c in CAMPOS}
+    for tabla, c in cols.items():
+        pos = orden[np.searchsorted(ids, c["project_id"], sorter=orden)]
+        for campo, v in contribuciones(tabla, c).items():
+            s[campo] += np.bincount(pos, weights=v, minlength=len(ids))
+    return s
+
+
+# ── Sub-índices ────────────────────────────────────────────────────────────────
+
+def componentes(s: dict) -> dict:
+    """Los cinco sub-índices (0-100) a partir de los estadísticos suficientes.
+    Replica _iin, _ieb, _inm, _ivn e _icc de routes/ivb.py."""
+    # Las divisiones por cero sólo ocurren en posiciones que np.where descarta
+    with np.errstate(divide="ignore", invalid="ignore"):
+        g = {k: np.asarray(v, dtype=float) for k, v in s.items()}
+
+        # IIN — Indefinición Narrativa
+        n_score = np.where(g["narrativas"] > 0, g["narr_indecision"] / g["narrativas"] * 100, 0.0)
+        l_score = np.where(g["leng_frecuencia"] > 0, g["leng_indecision"] / g["leng_frecuencia"] * 100, 0.0)
+        iin = np.minimum(100.0, (n_score * 0.5 + l_score * 0.5) * 2.5)
+
+        # IEB — Emocional Blando
+        soft_avg = np.where(g["blandas_n"] > 0, g["blandas_suma"] / g["blandas_n"], 5.0)
+        hard_avg = np.where(g["duras_n"] > 0, g["duras_suma"] / g["duras_n"], 5.0)
+        hope_bonus = np.where(g["esperanza_baja_n"] > 0,
+                              (g["esperanza_baja_suma"] / g["esperanza_baja_n"] / 10) * 15, 0.0)
+        base = ((soft_avg - hard_avg + 10) / 20) * 80
+        ieb = np.where(g["emociones"] > 0, np.minimum(100.0, np.maximum(0.0, base + hope_bonus)), 50.0)
+
+        # INM — No-Militancia
+        inm_comm = np.where((g["comunidades"] > 0) & (g["comunidades_peso"] != 0),
+                            g["comunidades_peso_tipo"] / g["comunidades_peso"], 50.0)
+        total_p = np.where(g["arquetipos_peso"] != 0, g["arquetipos_peso"], 1.0)
+        inm_arch = np.where(g["arquetipos"] > 0, g["arquetipos_blando"] / total_p * 100, 50.0)
+        inm = inm_comm * 0.6 + inm_arch * 0.4
+
+        # IVN — Volatilidad Narrativa
+        div_score = np.where(g["narrativas"] > 0, g["narr_volatiles"] / g["narrativas"] * 100, 50.0)
+        vel_score = np.where(g["riesgos"] > 0, (g["riesgos_velocidad"] / g["riesgos"] / 5) * 100, 50.0)
+        ivn = div_score * 0.5 + vel_score * 0.5
+
+        # ICC — Confianza Condicional
+        n_cond = np.where(g["narrativas"] > 0, g["narr_condicionales"] / g["narrativas"] * 100, 0.0)
+        h_cond = np.where(g["esperanza_n"] > 0, g["esperanza_cond_n"] / g["esperanza_n"] * 100, 0.0)
+        total_freq = np.where(g["leng_frecuencia"] != 0, g["leng_frecuencia"], 1.0)
+        l_cond = g["leng_condicional"] / total_freq * 100
+        icc = np.minimum(100.0, n_cond * 0.5 + h_cond * 0.3 + l_cond * 0.2 + 15)
+
+        return {"IIN": iin, "IEB": ieb, "INM": inm, "IVN": ivn, "ICC": icc}
+
+
+def indice(comp: dict):
+    """IVB compuesto (sin redondear) a partir de los sub-índices."""
+    return (PESOS["IIN"] * comp["IIN"] + PESOS["IEB"] * comp["IEB"] + PESOS["INM"] * comp["INM"]
+            + PESOS["IVN"] * comp["IVN"] + PESOS["ICC"] * comp["ICC"])
@@ -0,0 +1,136 @@
+"""
+Serie temporal del IVB en una sola pasada.
+
+Cada fila fechada (narrativas y lenguaje por fecha_deteccion, emociones por
+fecha, riesgos por fecha_deteccion) se convierte en su vector de aporte a los
+estadísticos del índice. Los eventos se ordenan por fecha una única vez y la
+ventana avanza periodo a periodo sumando los aportes que entran y restando los
+que salen (sumas acumuladas), de modo que el costo es lineal en filas + periodos.
+
+Comunidades y arquetipos no tienen fecha: aportan a todos los puntos. En modo
+acumulado, las filas sin fecha cuentan desde el primer punto. Las emociones
+llegan ya agrupadas por día desde su rollup (services/emotion_rollup.py): cada
+fila del rollup pesa por las emociones que resume.
+
+El eje va del primer al último periodo con eventos, recortado a desde/hasta:
+fuera de ese tramo la serie acumulada no cambia, así que no se generan puntos
+vacíos. Una serie de más de MAX_PUNTOS puntos se rechaza (ValueError).
+
+Las series se guardan en la caché de resultados (services/result_cache.py)
+hasta que se confirma una escritura en el proyecto.
+"""
+from datetime import date
+from typing import Optional
+import numpy as np
+from sqlalchemy.orm import Session
+from services import data_version, emotion_rollup, ivb_engine, result_cache
+from services.ivb_engine import CAMPOS
+
+MAX_PUNTOS = 5000   # ~13 años por día, ~95 por semana
+_PASO = {"dia": 1, "semana": 7}
+_TABLAS = tuple(t for t in ivb_engine.COLUMNAS if t != "emociones")
+
+
+def _inicio_periodo(fechas: np.ndarray, granularidad: str) -> np.ndarray:
+    if granularidad == "semana":
+        # 1970-01-01 fue jueves: (días + 3) % 7 es el día de la semana con lunes = 0
+        dias = fechas.astype("int64")
+        return fechas - ((dias + 3) % 7).astype("timedelta64[D]")
+    return fechas
+
+
+def calcular(db: Session, project_id: int, granularidad: str = "dia", modo: str = "acumulado",
+             ventana: int = 7, desde: Optional[date] = None, hasta: Optional[date] = None) -> dict:
+    # (matriz de aportes, fechas o None, eventos que representa cada fila)
+    bloques = []
+    for tabla, c in ivb_engine.load_columns(db, [project_id], fechas=True, tablas=_TABLAS).items():
+        col_fecha = ivb_engine.FECHAS.get(tabla)
+        bloques.append((ivb_engine.matriz(tabla, c), c[col_fecha] if col_fecha else None,
+                        np.ones(len(c["project_id"]))))
+    r = emotion_rollup.columnas(db, [project_id], por_dia=True)
+    bloques.append((emotion_rollup.matriz(r), r["dia"], r["n"]))
+
+    base = np.zeros(len(CAMPOS))
+    fechas, filas, pesos = [], [], []
+    for m, f, w in bloques:
+        if f is None:
+            base += m.sum(axis=0)
+            continue
+        sin_fecha = np.isnat(f)
+        if modo == "acumulado":
+            base += m[sin_fecha].sum(axis=0)
+        fechas.append(f[~sin_fecha])
+        filas.append(m[~sin_fecha])
+        pesos.append(w[~sin_fecha])
+
+    fechas = np.concatenate(fechas)
+    filas = np.concatenate(filas)
+    pesos = np.concatenate(pesos)
+    resultado = {"granularidad": granularidad, "modo": modo,
+                 "ventana": ventana if modo == "movil" else None, "puntos": []}
+    if len(fechas) == 0:
+        return resultado
+
+    # Orden único por periodo
+    periodos = _inicio_periodo(fechas, granularidad)
+    orden = np.argsort(periodos, kind="stable")
+    periodos, filas, pesos = periodos[orden], filas[orden], pesos[orden]
+
+    paso = _PASO[granularidad]
+    un_paso = np.timedelta64(paso, "D")
+    primero, ultimo = periodos[0], periodos[-1]
+    if desde is not None:
+        primero = max(primero, _inicio_periodo(np.datetime64(desde, "D"), granularidad))
+    if hasta is not None:
+        ultimo = min(ultimo, _inicio_periodo(np.datetime64(hasta, "D"), granularidad))
+    if ultimo < primero:
+        return resultado
+    n_puntos = int((ultimo - primero).astype("int64")) // paso + 1
+    if n_puntos > MAX_PUNTOS:
+        raise ValueError(f"La serie tendría {n_puntos} puntos (máximo {MAX_PUNTOS}): "
+                         "acotar desde/hasta o usar granularidad=semana")
+
+    # El eje empieza antes del primer punto sólo lo que necesita la ventana
+    # móvil; en modo acumulado lo anterior entra de una vez en la base
+    inicio = max(periodos[0], primero - (ventana - 1) * un_paso if modo == "movil" else primero)
+    eje = np.arange(inicio, ultimo + un_paso, un_paso)
+    desde_i = np.searchsorted(periodos, inicio)
+    hasta_i = np.searchsorted(periodos, ultimo, side="right")
+    previos = 0
+    if modo == "acumulado":
+        base += filas[:desde_i].sum(axis=0)
+        previos = int(pesos[:desde_i].sum())
+    periodos, filas, pesos = periodos[desde_i:hasta_i], filas[desde_i:hasta_i], pesos[desde_i:hasta_i]
+
+    # Aporte de cada periodo (los eventos ya están agrupados por el orden)
+    idx = (periodos - eje[0]).astype("int64") // paso
+    por_periodo = np.zeros((len(eje), len(CAMPOS)))
+    eventos = np.zeros(len(eje), dtype=np.int64)
+    if len(idx):
+        grupos, cortes = np.unique(idx, return_index=True)
+        por_periodo[grupos] = np.add.reduceat(filas, cortes, axis=0)
+        eventos[grupos] = np.add.reduceat(pesos, cortes).astype(np.int64)
+
+    # Barrido: acumulado suma todo lo visto; la ventana móvil resta lo que sale
+    acumulado = np.cumsum(por_periodo, axis=0)
+    en_ventana = np.cumsum(eventos) + previos
+    if modo == "movil":
+        acumulado[ventana:] -= acumulado[:-ventana].copy()
+        en_ventana[ventana:] -= en_ventana[:-ventana].copy()
+
+    s = base + acumulado
+    comp = ivb_engine.componentes({c: s[:, i] for i, c in enumerate(CAMPOS)})
+    ivb = ivb_engine.indice(comp)
+
+    for p in range(len(eje) - n_puntos, len(eje)):
+        punto = {"fecha": str(eje[p]), "ivb": round(float(ivb[p]), 1), "eventos": int(en_ventana[p])}
+        punto.update({k: round(float(v[p]), 1) for k, v in comp.items()})
+        resultado["puntos"].append(punto)
+    return resultado
+
+
+# ── Caché hasta la próxima escritura ───────────────────────────────────────────
+
+def get(db: Session, project_id: int, **params) -> dict:
+    return result_cache.CACHE.obtener("ivb_series", project_id, data_version.leida(db, project_id),
+                                      tuple(sorted(params.items())), lambda: calcular(db, project_id, **params))
@@ -0,0 +1,139 @@
+"""
+Motor SQL del IVB — los estadísticos suficientes (ver ivb_engine.CAMPOS) se
+calculan con consultas GROUP BY en la base de datos, sin traer filas a Python.
+
+El vocabulario (indecisión / condicional en narrativas y lenguaje) se suma
+desde el índice léxico persistido (services/lexical_index.py); sólo las filas
+sin índice vigente traen su texto para buscarlo en Python (y del lenguaje,
+sólo las de frecuencia distinta de cero, que son las únicas que aportan).
+Las emociones salen del rollup por tipo y día (services/emotion_rollup.py).
+
+Usa únicamente CASE, COALESCE, NULLIF y CAST, así que corre igual en SQLite y
+en PostgreSQL.
+"""
+import numpy as np
+from sqlalchemy import Float, and_, case, cast, func
+from sqlalchemy.orm import Session
+from models.narrative import Narrative
+from models.language_code import LanguageCode
+from models.community import Community
+from models.risk import Risk
+from models.archetype import Archetype
+from models.lexical_feature import LexicalFeature
+from services import emotion_rollup, ivb_engine, lexical_index
+from services.ivb_engine import CAMPOS, VOLATILES, TIPO_W, BLANDO_EMOC
+
+
+def _si(condicion, valor=1.0):
+    """SUM(CASE WHEN condicion THEN valor ELSE 0 END)."""
+    return func.sum(case((condicion, valor), else_=0.0))
+
+
+def _o(columna, default: float):
+    """Equivalente SQL de `x or default` (nulo o cero → default)."""
+    return func.coalesce(func.nullif(cast(columna, Float), 0.0), default)
+
+
+def estadisticos(db: Session, project_ids) -> dict:
+    """Campo → arreglo con un valor por proyecto, en el orden de `project_ids`."""
+    ids = list(project_ids)
+    pos = {pid: i for i, pid in enumerate(ids)}
+    s = {c: np.zeros(len(ids)) for c in CAMPOS}
+
+    def sumar(campo, pid, valor):
+        s[campo][pos[pid]] += float(valor or 0)
+
+    # Narrativas
+    peso = func.coalesce(Narrative.peso, 0.0)
+    for pid, n, volatiles, condicionales, indecision in db.query(
+        Narrative.project_id,
+        func.count(Narrative.id),
+        _si(Narrative.tipo.in_(VOLATILES)),
+        _si(and_(Narrative.tipo == "emergente", peso >= 3, peso <= 7)),
+        _si(LexicalFeature.indecision == True),
+    ).outerjoin(LexicalFeature, lexical_index.vigente("narrativas")) \
+     .filter(Narrative.project_id.in_(ids)).group_by(Narrative.project_id):
+        sumar("narrativas", pid, n)
+        sumar("narr_volatiles", pid, volatiles)
+        sumar("narr_condicionales", pid, condicionales)
+        sumar("narr_indecision", pid, indecision)
+
+    # Lenguaje (ponderado por frecuencia)
+    f = func.coalesce(LanguageCode.frecuencia, 0)
+    for pid, n, frecuencia, indecision, condicional in db.query(
+        LanguageCode.project_id,
+        func.count(LanguageCode.id),
+        func.sum(f),
+        _si(LexicalFeature.indecision == True, f),
+        _si(LexicalFeature.condicional == True, f),
+    ).outerjoin(LexicalFeature, lexical_index.vigente("lenguaje")) \
+     .filter(LanguageCode.project_id.in_(ids)).group_by(LanguageCode.project_id):
+        sumar("lenguaje", pid, n)
+        sumar("leng_frecuencia", pid, frecuencia)
+        sumar("leng_indecision", pid, indecision)
+        sumar("leng_condicional", pid, condicional)
+
+    # Emociones, desde el rollup por tipo y tramo de intensidad
+    for campo, v in emotion_rollup.estadisticos(db, ids).items():
+        s[campo] += v
+
+    # Comunidades, por tipo (peso = tamaño × influencia)
+    for pid, tipo, n, peso in db.query(
+        Community.project_id, Community.tipo,
+        func.count(Community.id),
+        func.sum(_o(Community.tamanio_estimado, 100.0) * _o(Community.influencia, 5.0)),
+    ).filter(Community.project_id.in_(ids)).group_by(Community.project_id, Community.tipo):
+        sumar("comunidades", pid, n)
+        sumar("comunidades_peso", pid, peso)
+        sumar("comunidades_peso_tipo", pid, (peso or 0) * TIPO_W.get(tipo, 50.0))
+
+    # Arquetipos, por emoción dominante
+    for pid, emocion, n, peso in db.query(
+        Archetype.project_id, Archetype.emocion_dominante,
+        func.count(Archetype.id),
+        func.sum(func.coalesce(Archetype.peso_relativo, 0.0)),
+    ).filter(Archetype.project_id.in_(ids)).group_by(Archetype.project_id, Archetype.emocion_dominante):
+        sumar("arquetipos", pid, n)
+        sumar("arquetipos_peso", pid, peso)
+        if emocion in BLANDO_EMOC:
+            sumar("arquetipos_blando", pid, peso)
+
+    # Riesgos activos
+    for pid, n, velocidad in db.query(
+        Risk.project_id,
+        func.count(Risk.id),
+        func.sum(_o(Risk.velocidad_crecimiento, 3.0)),
+    ).filter(Risk.project_id.in_(ids), Risk.activo == True).group_by(Risk.project_id):
+        sumar("riesgos", pid, n)
+        sumar("riesgos_velocidad", pid, velocidad)
+
+    # Vocabulario de las filas todavía sin índice vigente
+    filas = db.query(Narrative.project_id, Narrative.texto) \
+              .outerjoin(LexicalFeature, lexical_index.vigente("narrativas")) \
+              .filter(Narrative.project_id.in_(ids), LexicalFeature.fila_id == None).all()
+    if filas:
+        pids, textos = zip(*filas)
+        hits = ivb_engine.lexicon_masks([t or "" for t in textos])["indecision"]
+        for pid, h in zip(pids, hits):
+            if h:
+                sumar("narr_indecision", pid, 1)
+
+    filas = db.query(LanguageCode.project_id, LanguageCode.termino, LanguageCode.contexto,
+                     LanguageCode.frecuencia) \
+              .outerjoin(LexicalFeature, lexical_index.vigente("lenguaje")) \
+              .filter(LanguageCode.project_id.in_(ids), LanguageCode.frecuencia != 0,
+                      LexicalFeature.fila_id == None).all()
+    if filas:
+        pids, terminos, contextos, frecuencias = zip(*filas)
+        hits = ivb_engine.lexicon_masks([t or "" for t in terminos], [t or "" for t in contextos])
+        for pid, f, ind, cond in zip(pids, frecuencias, hits["indecision"], hits["condicional"]):
+            if ind:
+                sumar("leng_indecision", pid, f)
+            if cond:
+                sumar("leng_condicional", pid, f)
+
+    return s
+
+
+def estadisticos_proyecto(db: Session, project_id: int) -> dict:
+    return {c: float(v[0]) for c, v in estadisticos(db, [project_id]).items()}
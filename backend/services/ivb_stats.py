@@ -0,0 +1,83 @@
+"""
+Estadísticos del IVB mantenidos en escritura (tabla ivb_stats).
+
+Cada flush suma o resta el aporte de las filas tocadas (services/changes.py),
+así el endpoint arma el índice en O(1). Los proyectos que todavía no tienen
+fila se calculan desde cero la primera vez que se consultan.
+"""
+import numpy as np
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from models.ivb_stats import IVBStats
+from models.project import Project
+from services import ivb_engine
+from services.ivb_engine import CAMPOS
+
+_TABLAS = {model: tabla for tabla, (model, _) in ivb_engine.COLUMNAS.items()}
+
+
+def apply_changes(session: Session, cs):
+    """Mantenedor de services/changes.py: aplica los deltas por proyecto."""
+    if cs.deleted_projects or cs.new_projects:
+        session.execute(delete(IVBStats).where(
+            IVBStats.project_id.in_(cs.deleted_projects | cs.new_projects)))
+    for pid in cs.new_projects - cs.deleted_projects:
+        session.execute(insert(IVBStats).values(project_id=pid, **dict.fromkeys(CAMPOS, 0.0)))
+
+    deltas = {}
+    for model, signo, data in cs.items():
+        tabla = _TABLAS.get(model)
+        if tabla is None:
+            continue
+        cols = ivb_engine.to_columns(tabla, data)
+        pids, idx = np.unique(cols["project_id"], return_inverse=True)
+        for campo, v in ivb_engine.contribuciones(tabla, cols).items():
+            sumas = np.bincount(idx, weights=v, minlength=len(pids))
+            for pid, x in zip(pids, sumas):
+                d = deltas.setdefault(int(pid), dict.fromkeys(CAMPOS, 0.0))
+                d[campo] += signo * float(x)
+
+    for pid, d in deltas.items():
+        if pid in cs.deleted_projects or not any(d.values()):
+            continue
+        # Sin fila todavía → se calculará desde cero en la primera lectura
+        session.execute(
+            update(IVBStats).where(IVBStats.project_id == pid)
+            .values({getattr(IVBStats, c): getattr(IVBStats, c) + v for c, v in d.items() if v})
+        )
+
+
+def recompute(db: Session, project_id: int) -> dict:
+    """Estadísticos calculados desde cero con el motor columnar."""
+    return ivb_engine.estadisticos(ivb_engine.load_columns(db, [project_id]))
+
+
+def read(db: Session, project_id: int):
+    row = db.execute(select(*[getattr(IVBStats, c) for c in CAMPOS])
+                     .where(IVBStats.project_id == project_id)).first()
+    return dict(zip(CAMPOS, row)) if row else None
+
+
+def rebuild(db: Session, project_id: int) -> dict:
+    """Recalcula y guarda los estadísticos del proyecto."""
+    s = recompute(db, project_id)
+    db.execute(delete(IVBStats).where(IVBStats.project_id == project_id))
+    db.execute(insert(IVBStats).values(project_id=project_id, **s))
+    db.commit()
+    return s
+
+
+def get(db: Session, project_id: int) -> dict:
+    """Estadísticos guardados; si el proyecto aún no los tiene, se construyen."""
+    s = read(db, project_id)
+    if s is not None:
+        return s
+    if db.get(Project, project_id) is None:
+        return recompute(db, project_id)
+    try:
+        return rebuild(db, project_id)
+    except IntegrityError:
+        # Otra petición los construyó en paralelo
+        db.rollback()
+        return read(db, project_id)
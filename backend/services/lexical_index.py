@@ -0,0 +1,134 @@
+"""
+Índice léxico persistido (tabla lexical_features).
+
+Guarda, por narrativa y por código de lenguaje, el texto normalizado y qué
+léxicos aparecen en él, junto con la versión de los léxicos usada
+(services/lexicon.LEXICON_VERSION). Se mantiene en cada escritura como
+mantenedor de services/changes.py; cuando cambian los léxicos, un hilo en
+segundo plano reindexa por lotes lo guardado con otra versión.
+
+Los lectores (services/ivb_engine.py, services/ivb_sql.py) usan las banderas
+vigentes y sólo buscan en el texto las filas que todavía no tienen índice.
+"""
+import threading
+from sqlalchemy import and_, delete, func, insert, or_, select
+from sqlalchemy.orm import Session
+from models.lexical_feature import LexicalFeature
+from models.narrative import Narrative
+from models.language_code import LanguageCode
+from services.lexicon import MATCHER, LEXICON_VERSION, normalize_many
+
+# tabla → (modelo, columnas de texto que se indexan)
+TEXTOS = {
+    "narrativas": (Narrative,    ("texto",)),
+    "lenguaje":   (LanguageCode, ("termino", "contexto")),
+}
+_TABLAS = {model: tabla for tabla, (model, _) in TEXTOS.items()}
+
+_LOTE = 5000
+
+
+def vigente(tabla: str):
+    """Condición de join de `tabla` con su índice en la versión actual."""
+    model = TEXTOS[tabla][0]
+    return and_(LexicalFeature.tabla == tabla, LexicalFeature.fila_id == model.id,
+                LexicalFeature.version == LEXICON_VERSION)
+
+
+def indexar(session: Session, tabla: str, ids, project_ids, *textos):
+    """Escribe (o reemplaza) el índice de las filas dadas."""
+    ids = list(ids)
+    for i in range(0, len(ids), _LOTE):
+        session.execute(delete(LexicalFeature).where(
+            LexicalFeature.tabla == tabla, LexicalFeature.fila_id.in_(ids[i:i + _LOTE])))
+    normalizados = normalize_many(*textos)
+    bits = MATCHER.scan_normalized(normalizados)
+    filas = [
+        {"tabla": tabla, "fila_id": fila_id, "project_id": pid, "texto_normalizado": texto,
+         "version": LEXICON_VERSION,
+         **{name: bool(b & (1 << k)) for k, name in enumerate(MATCHER.names)}}
+        for fila_id, pid, texto, b in zip(ids, project_ids, normalizados, bits.tolist())
+    ]
+    if filas:
+        session.execute(insert(LexicalFeature), filas)
+
+
+def apply_changes(session: Session, cs):
+    """Mantenedor de services/changes.py."""
+    if cs.deleted_projects:
+        session.execute(delete(LexicalFeature).where(LexicalFeature.project_id.in_(cs.deleted_projects)))
+    for model, cols in cs.removed.items():
+        tabla = _TABLAS.get(model)
+        if tabla is not None:
+            session.execute(delete(LexicalFeature).where(
+                LexicalFeature.tabla == tabla, LexicalFeature.fila_id.in_(cols["id"])))
+    for model, cols in cs.added.items():
+        tabla = _TABLAS.get(model)
+        if tabla is not None:
+            indexar(session, tabla, cols["id"], cols["project_id"], *[cols[t] for t in TEXTOS[tabla][1]])
+
+
+# ── Reindexado ─────────────────────────────────────────────────────────────────
+
+def _pendientes(tabla: str):
+    """Filas de `tabla` sin índice o con índice de otra versión."""
+    model, textos = TEXTOS[tabla]
+    return select(model.id, model.project_id, *[getattr(model, t) for t in textos]) \
+        .outerjoin(LexicalFeature, and_(LexicalFeature.tabla == tabla, LexicalFeature.fila_id == model.id)) \
+        .where(or_(LexicalFeature.fila_id == None, LexicalFeature.version != LEXICON_VERSION))
+
+
+def pendientes(db: Session) -> int:
+    return sum(db.scalar(select(func.count()).select_from(_pendientes(t).subquery())) for t in TEXTOS)
+
+
+def reindexar(db: Session, al_avanzar=None) -> int:
+    """Indexa por lotes todo lo pendiente (un commit por lote) y borra el índice
+    de filas que ya no existen. Devuelve la cantidad de filas indexadas."""
+    total = 0
+    for tabla, (model, _) in TEXTOS.items():
+        while True:
+            filas = db.execute(_pendientes(tabla).limit(_LOTE)).all()
+            if not filas:
+                break
+            ids, pids, *textos = zip(*filas)
+            indexar(db, tabla, ids, pids, *textos)
+            db.commit()
+            total += len(filas)
+            if al_avanzar:
+                al_avanzar(total)
+        db.execute(delete(LexicalFeature).where(
+            LexicalFeature.tabla == tabla, LexicalFeature.fila_id.not_in(select(model.id))))
+        db.commit()
+    return total
+
+
+_estado = {"estado": "inactivo", "procesadas": 0, "error": None}
+_lock = threading.Lock()
+
+
+def _trabajo():
+    from database import SessionLocal
+    db = SessionLocal()
+    try:
+        n = reindexar(db, al_avanzar=lambda n: _estado.update(procesadas=n))
+        _estado.update(estado="completo", procesadas=n)
+    except Exception as e:
+        db.rollback()
+        _estado.update(estado="error", error=str(e))
+    finally:
+        db.close()
+
+
+def iniciar_reindexado() -> bool:
+    """Lanza el reindexado en segundo plano (False si ya hay uno en curso)."""
+    with _lock:
+        if _estado["estado"] == "en_curso":
+            return False
+        _estado.update(estado="en_curso", procesadas=0, error=None)
+    threading.Thread(target=_trabajo, name="reindexado-lexico", daemon=True).start()
+    return True
+
+
+def estado(db: Session) -> dict:
+    return {**_estado, "version": LEXICON_VERSION, "pendientes": pendientes(db)}
@@ -0,0 +1,159 @@
+"""
+Léxicos del IVB — vocabulario de indecisión y de apoyo condicional.
+Compartidos por los motores del índice (routes/ivb.py y services/ivb_engine.py).
+
+`KeywordMatcher` se construye una vez con todos los léxicos y en una sola
+llamada informa qué léxicos aparecen en un texto o en una columna entera.
+Textos y palabras clave se normalizan igual: minúsculas y sin tildes, de modo
+que "todavia" y "todavía" coinciden.
+
+`LEXICON_VERSION` resume el contenido de los léxicos: cambia sola cuando se
+edita una lista, y services/lexical_index.py reindexa lo guardado con otra versión.
+"""
+import hashlib
+import re
+import numpy as np
+
+# ── Vocabulario de indecisión ──────────────────────────────────────────────────
+INDECISION = [
+    "todavía", "estoy viendo", "no me convence", "último momento", "capaz",
+    "depende", "aún no", "sin decidir", "ninguno", "todos tienen",
+    "no hay por quién", "puede definirlo", "indeciso", "blando",
+    "a último", "viendo opciones", "evaluando",
+]
+
+CONDITIONAL = [
+    "si cumple", "por ahora", "me gusta pero", "a ver si",
+    "voto si", "si hace", "todavía viendo", "con reservas",
+]
+
+
+# ── Normalización ──────────────────────────────────────────────────────────────
+
+_TILDES = list(zip("áéíóúüñ", "aeiouun"))
+
+
+def normalize(text: str) -> str:
+    """Minúsculas y sin tildes ("Todavía" → "todavia")."""
+    t = (text or "").lower()
+    if not t.isascii():
+        for con, sin in _TILDES:
+            if con in t:
+                t = t.replace(con, sin)
+    return t
+
+
+# ── Matcher multi-léxico ───────────────────────────────────────────────────────
+
+def _patron(nodo: dict) -> str:
+    """Alternancia de las palabras del trie `nodo`, factorizada por prefijos
+    ("a(?: ultimo|un no)|c(?:apaz|on reservas)|..."): en cada posición el
+    motor de re descarta casi todo con el primer carácter, en vez de probar
+    cada palabra. Los sufijos opcionales son codiciosos, así que la
+    coincidencia es la palabra más larga que empieza en esa posición."""
+    ramas = [re.escape(c) + _patron(hijo) for c, hijo in sorted(nodo.items()) if c]
+    if not ramas:
+        return ""
+    cuerpo = ramas[0] if len(ramas) == 1 else f"(?:{'|'.join(ramas)})"
+    return f"(?:{cuerpo})?" if "" in nodo else cuerpo
+
+
+class KeywordMatcher:
+    """Busca varios léxicos a la vez e informa cuáles aparecen en cada texto.
+
+    Se construye una sola vez: normaliza y deduplica las palabras clave y las
+    compila en una única expresión regular (una alternancia factorizada por
+    prefijos, ver `_patron`). Cada texto se recorre una sola vez, con un costo
+    que no depende de la cantidad de palabras clave. Cada palabra lleva la
+    máscara de bits de los léxicos a los que pertenecen ella y sus prefijos
+    (bit i = léxico i de `names`): en "todavia viendo" (condicional) también
+    está "todavia" (indecisión).
+
+    - `scan()` / `match()`: un texto (o varios campos de una misma fila).
+    - `scan_many()`: una columna completa. Une todos los textos en una sola
+      cadena, la normaliza y la recorre una vez; las coincidencias se asignan a
+      su fila por desplazamiento.
+    """
+
+    def __init__(self, lexicons: dict):
+        self.names = tuple(lexicons)
+        firma = "\n".join(f"{n}:{'|'.join(sorted(map(normalize, lexicons[n])))}" for n in self.names)
+        self.version = hashlib.sha1(firma.encode("utf-8")).hexdigest()[:12]
+        bits, trie = {}, {}
+        for i, name in enumerate(self.names):
+            for kw in lexicons[name]:
+                kw = normalize(kw)
+                bits[kw] = bits.get(kw, 0) | (1 << i)
+                nodo = trie
+                for c in kw:
+                    nodo = nodo.setdefault(c, {})
+                nodo[""] = True
+        # Máscara de cada palabra: la suya más la de sus prefijos que también
+        # son palabras clave (empiezan en la misma posición y no se reportan aparte)
+        self._bits = {}
+        for kw in bits:
+            for p, b in bits.items():
+                if kw.startswith(p):
+                    self._bits[kw] = self._bits.get(kw, 0) | b
+        self._search = re.compile(_patron(trie)).search
+        self._all = (1 << len(self.names)) - 1
+        self._sets = [frozenset(n for i, n in enumerate(self.names) if m & (1 << i))
+                      for m in range(self._all + 1)]
+
+    def _coincidencias(self, t: str):
+        """Cada palabra clave presente en `t`, con su posición; incluye las
+        que se solapan (la búsqueda sigue un carácter después del comienzo de
+        la anterior, no después de su final)."""
+        search = self._search
+        m = search(t)
+        while m:
+            yield m.start(), self._bits[m.group()]
+            m = search(t, m.start() + 1)
+
+    def scan(self, *texts) -> int:
+        """Máscara de bits de los léxicos presentes en los textos dados."""
+        t = normalize(texts[0] if len(texts) == 1 else "\n".join(x for x in texts if x))
+        search, bits, todos, found = self._search, self._bits, self._all, 0
+        m = search(t)
+        while m and found != todos:
+            found |= bits[m.group()]
+            m = search(t, m.start() + 1)
+        return found
+
+    def match(self, *texts) -> frozenset:
+        """Nombres de los léxicos presentes en los textos dados."""
+        return self._sets[self.scan(*texts)]
+
+    def scan_many(self, *columns) -> np.ndarray:
+        """Máscara de bits por fila; cada columna aporta un campo de texto de la fila."""
+        return self.scan_normalized(normalize_many(*columns))
+
+    def scan_normalized(self, textos: list) -> np.ndarray:
+        """Como `scan_many`, sobre textos ya normalizados (uno por fila)."""
+        n = len(textos)
+        out = np.zeros(n, dtype=np.int64)
+        if n == 0:
+            return out
+        pos, bits = [], []
+        for p, bit in self._coincidencias("\x00".join(textos)):
+            pos.append(p)
+            bits.append(bit)
+        if pos:
+            # Fin (exclusivo) de cada fila en la cadena
+            fines = np.cumsum(np.fromiter(map(len, textos), dtype=np.int64, count=n) + 1)
+            np.bitwise_or.at(out, np.searchsorted(fines, pos, side="right"), bits)
+        return out
+
+
+def normalize_many(*columns) -> list:
+    """Texto normalizado por fila (los campos de la fila unidos con salto de
+    línea). Normaliza toda la columna en una sola llamada."""
+    n = len(columns[0]) if columns else 0
+    if n == 0:
+        return []
+    filas = ("\n".join(x.replace("\x00", " ") for x in fila if x) for fila in zip(*columns))
+    return normalize("\x00".join(filas)).split("\x00")
+
+
+MATCHER = KeywordMatcher({"indecision": INDECISION, "condicional": CONDITIONAL})
+LEXICON_VERSION = MATCHER.version
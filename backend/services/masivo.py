@@ -0,0 +1,200 @@
+"""
+Altas, modificaciones y bajas masivas (rutas /bulk de cada entidad).
+
+Cada pedido es una sola transacción sin instancias del ORM:
+  crear      INSERT de varias filas por sentencia ... RETURNING
+  modificar  UPDATE por id (executemany, agrupado por columnas tocadas)
+  borrar     DELETE ... WHERE id IN (...)
+  insertar   filas en formato columnar (importación de Excel): INSERT de
+             varias filas por lotes, o COPY en PostgreSQL; no confirma
+Como no pasan por el flush, cada operación arma su ChangeSet (filas viejas y
+nuevas, leídas con RETURNING o con un SELECT previo) y lo aplica con
+changes.apply() antes del commit: las tablas derivadas quedan al día en la
+misma transacción.
+
+La validación de cada fila la hace FastAPI con el esquema de la entidad (422
+con loc = ["body", índice, campo]). Los errores que sólo se ven contra la base
+(proyecto o id inexistente, id repetido) se devuelven igual, y si hay alguno
+no se escribe nada.
+"""
+import json
+from fastapi import HTTPException
+from pydantic import BaseModel, create_model
+from sqlalchemy import JSON, delete, insert, select, text, update
+from sqlalchemy.orm import Session
+from config import settings
+from models.project import Project
+from services import changes
+
+MAX_FILAS = settings.bulk_max_rows
+_PARTE = 1000   # ids por IN (...): lejos del límite de parámetros de SQLite
+_LOTE = 5000    # filas por execute() en insertar()
+
+
+def esquema_parcial(schema: type[BaseModel]) -> type[BaseModel]:
+    """Esquema de modificación: `id` obligatorio y el resto de los campos de
+    `schema` sin default (sólo se tocan los enviados; los obligatorios no
+    aceptan null)."""
+    campos = {nombre: (f.annotation, None) for nombre, f in schema.model_fields.items()}
+    return create_model(f"{schema.__name__}Parcial", id=(int, ...), **campos)
+
+
+def _partes(valores: list):
+    for i in range(0, len(valores), _PARTE):
+        yield valores[i:i + _PARTE]
+
+
+def _error(indice: int, campo: str, mensaje: str) -> dict:
+    return {"type": "value_error", "loc": ["body", indice, campo], "msg": mensaje}
+
+
+def _rechazar(errores: list):
+    if errores:
+        raise HTTPException(422, errores)
+
+
+def _columnar(model, filas) -> dict:
+    nombres = [c.name for c in model.__table__.columns]
+    return {n: [f[i] for f in filas] for i, n in enumerate(nombres)}
+
+
+def _leer(db: Session, model, ids: list) -> dict:
+    """id → fila completa (tupla en el orden de las columnas)."""
+    out = {}
+    for parte in _partes(ids):
+        for fila in db.execute(select(*model.__table__.columns).where(model.id.in_(parte))):
+            out[fila.id] = tuple(fila)
+    return out
+
+
+def _proyectos_faltantes(db: Session, filas: list) -> list:
+    errores, ids = [], sorted({f["project_id"] for f in filas if "project_id" in f})
+    existentes = set()
+    for parte in _partes(ids):
+        existentes.update(db.scalars(select(Project.id).where(Project.id.in_(parte))))
+    for i, f in enumerate(filas):
+        if "project_id" in f and f["project_id"] not in existentes:
+            errores.append(_error(i, "project_id", f"El proyecto {f['project_id']} no existe"))
+    return errores
+
+
+def crear(db: Session, model, filas: list) -> list:
+    """Inserta las filas y devuelve sus ids, en el mismo orden."""
+    if not filas:
+        return []
+    _rechazar(_proyectos_faltantes(db, filas))
+    nuevas = db.execute(
+        insert(model).returning(*model.__table__.columns, sort_by_parameter_order=True), filas
+    ).all()
+    cs = changes.ChangeSet()
+    cs.extend(model, _columnar(model, nuevas))
+    changes.apply(db, cs)
+    db.commit()
+    return [f.id for f in nuevas]
+
+
+def modificar(db: Session, model, filas: list) -> int:
+    """Aplica a cada id los campos enviados. Devuelve la cantidad de filas."""
+    if not filas:
+        return 0
+    errores, vistos = [], {}
+    for i, f in enumerate(filas):
+        if f["id"] in vistos:
+            errores.append(_error(i, "id", f"id {f['id']} repetido (fila {vistos[f['id']]})"))
+        vistos.setdefault(f["id"], i)
+    viejas = _leer(db, model, list(vistos))
+    errores += [_error(i, "id", f"No existe {model.__tablename__} con id {f['id']}")
+                for i, f in enumerate(filas) if f["id"] not in viejas]
+    errores += _proyectos_faltantes(db, filas)
+    _rechazar(sorted(errores, key=lambda e: e["loc"][1]))
+
+    cambios = [f for f in filas if len(f) > 1]
+    if not cambios:
+        return len(filas)
+    nombres = [c.name for c in model.__table__.columns]
+    antes = [viejas[f["id"]] for f in cambios]
+    despues = [tuple(f.get(n, v) for n, v in zip(nombres, fila)) for f, fila in zip(cambios, antes)]
+    db.execute(update(model), cambios)
+
+    cs = changes.ChangeSet()
+    cs.extend(model, _columnar(model, antes), removed=True)
+    cs.extend(model, _columnar(model, despues))
+    changes.apply(db, cs)
+    db.commit()
+    return len(filas)
+
+
+def borrar(db: Session, model, ids: list) -> int:
+    """Borra las filas de los ids (repetidos se ignoran). Devuelve la cantidad."""
+    unicos = list(dict.fromkeys(ids))
+    if not unicos:
+        return 0
+    viejas = _leer(db, model, unicos)
+    _rechazar([{"type": "value_error", "loc": ["body", i], "msg": f"No existe {model.__tablename__} con id {x}"}
+               for i, x in enumerate(ids) if x not in viejas])
+    ids = unicos
+    for parte in _partes(ids):
+        db.execute(delete(model).where(model.id.in_(parte)))
+
+    cs = changes.ChangeSet()
+    cs.extend(model, _columnar(model, list(viejas.values())), removed=True)
+    changes.apply(db, cs)
+    db.commit()
+    return len(ids)
+
+
+def _con_defaults(model, cols: dict, n: int) -> dict:
+    """Completa las columnas que faltan con el default del modelo (COPY no
+    los aplica y el ChangeSet necesita los valores)."""
+    cols = dict(cols)
+    for c in model.__table__.columns:
+        if c.name in cols or c.primary_key or c.default is None:
+            continue
+        d = c.default
+        cols[c.name] = [d.arg(None) for _ in range(n)] if d.is_callable else [d.arg] * n
+    return cols
+
+
+def _insertar_lotes(db: Session, model, cols: dict, n: int) -> list:
+    tabla = model.__table__
+    nombres = list(cols)
+    ids = []
+    for i in range(0, n, _LOTE):
+        filas = [dict(zip(nombres, valores)) for valores in zip(*(cols[k][i:i + _LOTE] for k in nombres))]
+        ids += db.scalars(insert(tabla).returning(tabla.c.id, sort_by_parameter_order=True), filas).all()
+    return ids
+
+
+def _copiar(db: Session, model, cols: dict, n: int) -> list:
+    """COPY ... FROM STDIN con los ids reservados antes en la secuencia."""
+    tabla = model.__table__
+    ids = db.scalars(text("SELECT nextval(pg_get_serial_sequence(:t, 'id')) FROM generate_series(1, :n)"),
+                     {"t": tabla.name, "n": n}).all()
+    nombres = ["id", *cols]
+    valores = [ids, *cols.values()]
+    for j, k in enumerate(nombres):
+        if isinstance(tabla.c[k].type, JSON):
+            valores[j] = [json.dumps(v, ensure_ascii=False) if v is not None else None for v in valores[j]]
+    crudo = db.connection().connection.driver_connection
+    with crudo.cursor() as cur, cur.copy(f"COPY {tabla.name} ({', '.join(nombres)}) FROM STDIN") as copia:
+        for fila in zip(*valores):
+            copia.write_row(fila)
+    return ids
+
+
+def insertar(db: Session, model, cols: dict) -> list:
+    """Inserta filas en formato columnar (columna → lista de valores) y aplica
+    su ChangeSet, sin confirmar: el llamador decide el commit. Devuelve los
+    ids, en el orden de las filas."""
+    n = len(next(iter(cols.values()), ()))
+    if not n:
+        return []
+    cols = _con_defaults(model, cols, n)
+    if db.get_bind().dialect.name == "postgresql":
+        ids = _copiar(db, model, cols, n)
+    else:
+        ids = _insertar_lotes(db, model, cols, n)
+    cs = changes.ChangeSet()
+    cs.extend(model, {"id": ids, **cols})
+    changes.apply(db, cs)
+    return ids
@@ -0,0 +1,135 @@
+"""
+Paginación por clave (keyset) de los listados.
+
+Cada listado se ordena por su clave de siempre más el id como desempate (en
+el mismo sentido que la clave, así el índice (project_id, clave), que en
+SQLite termina en el rowid, da el orden completo sin ordenar empates). El
+cursor guarda los valores de esa clave en la última fila de la página, y la
+página siguiente arranca con un WHERE sobre ellos en lugar de un OFFSET: cada
+página recorre el índice (project_id, clave) desde el cursor y cuesta lo mismo
+sin importar cuán lejos esté.
+
+El cuerpo sigue siendo el arreglo de filas; la paginación va en cabeceras:
+  X-Next-Cursor   cursor opaco de la página siguiente (no está en la última)
+  X-Total-Count   total de filas, sólo con ?total=true
+
+Los nulos quedan donde los pone cada base (SQLite: menores que todo;
+PostgreSQL: mayores que todo), así el orden es el mismo que sin paginar y los
+índices sirven en ambas.
+"""
+import base64
+import binascii
+import datetime
+import json
+import math
+from typing import Optional
+from fastapi import HTTPException, Query, Response
+from sqlalchemy import and_, false, or_
+from config import settings
+
+
+class Pagina:
+    """Parámetros de paginación de la petición (?limit, ?cursor, ?total)."""
+
+    def __init__(
+        self,
+        limit: int = Query(None, ge=1, le=settings.page_size_max),
+        cursor: Optional[str] = None,
+        total: bool = False,
+    ):
+        self.limit = limit or settings.page_size_default
+        self.cursor = cursor
+        self.total = total
+
+
+def _codificar(valores) -> str:
+    texto = json.dumps(list(valores), default=lambda v: v.isoformat(), separators=(",", ":"))
+    return base64.urlsafe_b64encode(texto.encode()).decode().rstrip("=")
+
+
+def _valor(v, tipo):
+    """Valor del cursor convertido al tipo de su clave; ValueError si no corresponde."""
+    if v is None:
+        return None
+    if tipo in (datetime.datetime, datetime.date) and isinstance(v, str):
+        return tipo.fromisoformat(v)
+    # bool es subclase de int: sólo vale en claves booleanas
+    if isinstance(v, bool):
+        if tipo in (bool, None):
+            return v
+    elif tipo is int and isinstance(v, int):
+        return v
+    elif tipo is float and isinstance(v, (int, float)) and math.isfinite(v):
+        return float(v)
+    elif tipo is str and isinstance(v, str):
+        return v
+    elif tipo is None and isinstance(v, (int, float, str)):
+        # Expresiones sin tipo conocido: al menos un escalar
+        return v
+    raise ValueError(v)
+
+
+def _decodificar(cursor: str, claves) -> list:
+    try:
+        valores = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(400, "Cursor inválido")
+    if not isinstance(valores, list) or len(valores) != len(claves):
+        raise HTTPException(400, "Cursor inválido")
+    out = []
+    for v, (expr, _) in zip(valores, claves):
+        try:
+            tipo = expr.type.python_type
+        except NotImplementedError:
+            tipo = None
+        try:
+            out.append(_valor(v, tipo))
+        except (TypeError, ValueError):
+            raise HTTPException(400, "Cursor inválido")
+    return out
+
+
+def _despues(claves, valores, dialecto: str):
+    """Filas que van después de `valores` en el orden de `claves`:
+    c1 > v1 OR (c1 = v1 AND (c2 > v2 OR (c2 = v2 AND ...)))."""
+    condicion = None
+    for (expr, desc), v in reversed(list(zip(claves, valores))):
+        # Dónde quedan los nulos en este sentido, según la base
+        nulos_primero = desc == (dialecto == "postgresql")
+        if v is None:
+            mayor = expr != None if nulos_primero else false()
+            igual = expr == None
+        else:
+            mayor = expr < v if desc else expr > v
+            if not nulos_primero and getattr(expr, "nullable", True):
+                mayor = or_(mayor, expr == None)
+            igual = expr == v
+        condicion = mayor if condicion is None else or_(mayor, and_(igual, condicion))
+    return condicion
+
+
+def paginar(query, claves, pagina: Pagina):
+    """Aplica orden, cursor y límite a `query`. `claves` es una lista de
+    (expresión, descendente) que debe terminar en una columna única (el id).
+    Devuelve (filas de la página como tuplas de lo seleccionado en `query`,
+    cursor siguiente o None)."""
+    dialecto = query.session.get_bind().dialect.name
+    n = len(claves)
+    q = query.add_columns(*[expr.label(f"_clave{i}") for i, (expr, _) in enumerate(claves)])
+    if pagina.cursor:
+        q = q.filter(_despues(claves, _decodificar(pagina.cursor, claves), dialecto))
+    q = q.order_by(*[expr.desc() if desc else expr.asc() for expr, desc in claves])
+    filas = q.limit(pagina.limit + 1).all()
+
+    siguiente = None
+    if len(filas) > pagina.limit:
+        filas = filas[:pagina.limit]
+        siguiente = _codificar(filas[-1][-n:])
+    return [tuple(f[:-n]) for f in filas], siguiente
+
+
+def cabeceras(response: Response, siguiente: Optional[str], total: Optional[int] = None):
+    if siguiente:
+        response.headers["X-Next-Cursor"] = siguiente
+    if total is not None:
+        response.headers["X-Total-Count"] = str(total)
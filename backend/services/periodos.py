@@ -0,0 +1,76 @@
+"""
+Agrupación por periodos (día, semana o mes) portable entre SQLite y PostgreSQL.
+
+`inicio()` arma la expresión SQL del primer día del periodo de una columna de
+fecha: funciones de fecha de SQLite o `date_trunc` en PostgreSQL. Los
+modificadores van como literales en el SQL (no como parámetros) para que la
+expresión del SELECT y la del GROUP BY sean idénticas también con el binding
+del lado del servidor de psycopg.
+
+`eje()` da todos los periodos de un rango, para completar los vacíos en el
+servidor.
+"""
+from datetime import date, timedelta
+from sqlalchemy import Date, DateTime, cast, func, literal_column
+
+GRANULARIDADES = ("dia", "semana", "mes")
+
+_SQLITE = {
+    # 'weekday 0' avanza al domingo siguiente (o se queda si ya es domingo): -6 días = lunes
+    "semana": ("'weekday 0'", "'-6 days'"),
+    "mes":    ("'start of month'",),
+}
+_POSTGRES = {"semana": "'week'", "mes": "'month'"}
+
+
+def inicio(columna, granularidad: str, dialecto: str):
+    """Expresión SQL (tipo Date) del inicio del periodo; semanas de lunes a domingo."""
+    if granularidad == "dia":
+        return columna
+    if dialecto == "sqlite":
+        modificadores = [literal_column(m) for m in _SQLITE[granularidad]]
+        return func.date(columna, *modificadores, type_=Date)
+    if dialecto == "postgresql":
+        return cast(func.date_trunc(literal_column(_POSTGRES[granularidad]), cast(columna, DateTime)), Date)
+    raise ValueError(f"Base de datos no soportada: {dialecto}")
+
+
+def truncar(d: date, granularidad: str) -> date:
+    """Inicio del periodo de una fecha (equivalente Python de `inicio()`)."""
+    if granularidad == "semana":
+        return d - timedelta(days=d.weekday())
+    if granularidad == "mes":
+        return d.replace(day=1)
+    return d
+
+
+def siguiente(d: date, granularidad: str) -> date:
+    if granularidad == "semana":
+        return d + timedelta(days=7)
+    if granularidad == "mes":
+        return (d.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return d + timedelta(days=1)
+
+
+def eje(desde: date, hasta: date, granularidad: str) -> list:
+    """Inicios de todos los periodos entre desde y hasta (inclusive)."""
+    out, d = [], truncar(desde, granularidad)
+    while d <= hasta:
+        out.append(d)
+        d = siguiente(d, granularidad)
+    return out
+
+
+def cantidad(desde: date, hasta: date, granularidad: str) -> int:
+    """Cantidad de periodos entre desde y hasta, sin armar el eje."""
+    a, b = truncar(desde, granularidad), truncar(hasta, granularidad)
+    if b < a:
+        return 0
+    if granularidad == "mes":
+        return (b.year - a.year) * 12 + b.month - a.month + 1
+    return (b - a).days // (7 if granularidad == "semana" else 1) + 1
+
+
+def etiqueta(d: date, granularidad: str) -> str:
+    """'YYYY-MM' por mes; fecha de inicio 'YYYY-MM-DD' por día o semana."""
+    return d.strftime("%Y-%m") if granularidad == "mes" else d.isoformat()
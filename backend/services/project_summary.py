@@ -0,0 +1,115 @@
+"""
+Contadores por proyecto (tabla project_summaries).
+
+Cada flush suma o resta las filas agregadas y quitadas (services/changes.py),
+así el listado de proyectos y los totales del dashboard salen de una sola fila
+por proyecto en lugar de un COUNT por tabla. Los proyectos sin fila se
+construyen desde cero la primera vez que se consultan; `rebuild()` (o el script
+rebuild_counters.py) repara los contadores a partir de las tablas.
+"""
+from collections import Counter
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from models.project import Project
+from models.project_summary import ProjectSummary
+from models.narrative import Narrative
+from models.emotion import Emotion
+from models.archetype import Archetype
+from models.language_code import LanguageCode
+from models.community import Community
+from models.risk import Risk
+
+# Modelo → contador de filas
+_CONTADORES = {
+    Narrative:    "narrativas",
+    Emotion:      "emociones",
+    Archetype:    "arquetipos",
+    LanguageCode: "lenguaje",
+    Community:    "comunidades",
+}
+NIVELES = ("rojo", "amarillo", "verde")
+
+CAMPOS = tuple(_CONTADORES.values()) + ("riesgos_activos",) + tuple(f"riesgos_{n}" for n in NIVELES)
+
+
+def apply_changes(session: Session, cs):
+    """Mantenedor de services/changes.py: suma y resta filas por proyecto."""
+    if cs.deleted_projects or cs.new_projects:
+        session.execute(delete(ProjectSummary).where(
+            ProjectSummary.project_id.in_(cs.deleted_projects | cs.new_projects)))
+    for pid in cs.new_projects - cs.deleted_projects:
+        session.execute(insert(ProjectSummary).values(project_id=pid, **dict.fromkeys(CAMPOS, 0)))
+
+    deltas = {}
+    for model, signo, cols in cs.items():
+        if model in _CONTADORES:
+            campo = _CONTADORES[model]
+            for pid in cols["project_id"]:
+                deltas.setdefault(pid, Counter())[campo] += signo
+        elif model is Risk:
+            for pid, activo, nivel in zip(cols["project_id"], cols["activo"], cols["nivel"]):
+                if activo:
+                    d = deltas.setdefault(pid, Counter())
+                    d["riesgos_activos"] += signo
+                    if nivel in NIVELES:
+                        d[f"riesgos_{nivel}"] += signo
+
+    for pid, d in deltas.items():
+        valores = {getattr(ProjectSummary, c): getattr(ProjectSummary, c) + v for c, v in d.items() if v}
+        if pid in cs.deleted_projects or not valores:
+            continue
+        # Sin fila todavía → se calculará desde cero en la primera lectura
+        session.execute(update(ProjectSummary).where(ProjectSummary.project_id == pid).values(valores))
+
+
+def recompute(db: Session, project_ids) -> dict:
+    """Contadores calculados desde las tablas: project_id → campo → int."""
+    ids = list(project_ids)
+    out = {pid: dict.fromkeys(CAMPOS, 0) for pid in ids}
+    for model, campo in _CONTADORES.items():
+        for pid, n in db.execute(select(model.project_id, func.count(model.id))
+                                 .where(model.project_id.in_(ids)).group_by(model.project_id)):
+            out[pid][campo] = n
+    for pid, nivel, n in db.execute(
+        select(Risk.project_id, Risk.nivel, func.count(Risk.id))
+        .where(Risk.project_id.in_(ids), Risk.activo == True).group_by(Risk.project_id, Risk.nivel)
+    ):
+        out[pid]["riesgos_activos"] += n
+        if nivel in NIVELES:
+            out[pid][f"riesgos_{nivel}"] = n
+    return out
+
+
+def rebuild(db: Session, project_ids=None) -> dict:
+    """Recalcula y guarda los contadores (de todos los proyectos si no se indican)."""
+    if project_ids is None:
+        project_ids = db.scalars(select(Project.id)).all()
+    conteos = recompute(db, project_ids)
+    ids = list(conteos)
+    db.execute(delete(ProjectSummary).where(ProjectSummary.project_id.in_(ids)))
+    if conteos:
+        db.execute(insert(ProjectSummary), [{"project_id": pid, **c} for pid, c in conteos.items()])
+    db.commit()
+    return conteos
+
+
+def read(db: Session, project_id: int):
+    row = db.execute(select(*[getattr(ProjectSummary, c) for c in CAMPOS])
+                     .where(ProjectSummary.project_id == project_id)).first()
+    return dict(zip(CAMPOS, row)) if row else None
+
+
+def get(db: Session, project_id: int) -> dict:
+    """Contadores guardados; si el proyecto aún no los tiene, se construyen."""
+    s = read(db, project_id)
+    if s is not None:
+        return s
+    if db.get(Project, project_id) is None:
+        return recompute(db, [project_id])[project_id]
+    try:
+        return rebuild(db, [project_id])[project_id]
+    except IntegrityError:
+        # Otra petición los construyó en paralelo
+        db.rollback()
+        return read(db, project_id)
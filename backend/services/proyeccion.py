@@ -0,0 +1,58 @@
+"""
+Proyección de columnas de los listados (?fields=).
+
+Cada listado declara sus campos de salida: nombre → columna, o (columna o
+tupla de columnas, formato) para los que se arman con una función. La
+consulta trae sólo las columnas de los campos pedidos, como tuplas (sin
+instancias del ORM ni identity map), y el serializador emite sólo esas
+claves, en el orden de la declaración. Sin ?fields= salen todos los campos,
+igual que antes.
+
+    CAMPOS = {"id": Narrative.id, "created_at": (Narrative.created_at, str), ...}
+    proy = Proyeccion(CAMPOS, fields)
+    filas = db.query(*proy.columnas)...
+    return [proy.fila(f) for f in filas]
+"""
+from typing import Optional
+from fastapi import HTTPException
+
+
+def lista(v):
+    return v or []
+
+
+class Proyeccion:
+    def __init__(self, disponibles: dict, fields: Optional[str] = None):
+        pedidos = {f.strip() for f in (fields or "").split(",") if f.strip()}
+        desconocidos = sorted(pedidos - set(disponibles))
+        if desconocidos:
+            raise HTTPException(400, f"Campos desconocidos: {', '.join(desconocidos)}. "
+                                     f"Disponibles: {', '.join(disponibles)}")
+        self.columnas, self._campos = [], []
+        for nombre, spec in disponibles.items():
+            if pedidos and nombre not in pedidos:
+                continue
+            columnas, formato = spec if isinstance(spec, tuple) else (spec, None)
+            if not isinstance(columnas, tuple):
+                columnas = (columnas,)
+            self._campos.append((nombre, [self._posicion(c) for c in columnas], formato))
+        # Un campo por columna y sin formato: la fila sale de un zip
+        self._nombres = [n for n, _, _ in self._campos]
+        self._directa = all(f is None and p == [i] for i, (_, p, f) in enumerate(self._campos))
+
+    def _posicion(self, columna) -> int:
+        # Una columna compartida por varios campos se selecciona una sola vez
+        for i, c in enumerate(self.columnas):
+            if c is columna:
+                return i
+        self.columnas.append(columna)
+        return len(self.columnas) - 1
+
+    def incluye(self, nombre: str) -> bool:
+        return any(n == nombre for n, _, _ in self._campos)
+
+    def fila(self, valores) -> dict:
+        if self._directa:
+            return dict(zip(self._nombres, valores))
+        return {nombre: valores[pos[0]] if formato is None else formato(*(valores[i] for i in pos))
+                for nombre, pos, formato in self._campos}
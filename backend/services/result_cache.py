@@ -0,0 +1,130 @@
+"""
+Caché en memoria de resultados analíticos (IVB, dashboard, evolución, radar...).
+
+Son funciones puras de los datos de un proyecto: se guardan por
+(endpoint, project_id, versión de datos, parámetros) en un LRU acotado, con
+vencimiento opcional. La versión es la que leyó la petición para su ETag
+(data_version.leida), así que el cuerpo guardado siempre corresponde al ETag
+con el que se sirve: una escritura en otro proceso (varios workers), o una que
+ya se confirmó y todavía no avisó a esta caché, sube la versión y la lectura
+siguiente calcula de nuevo.
+
+Al confirmar una escritura en el proyecto (services/changes.py: rutas de
+alta/edición/baja, carga de Excel y borrado del proyecto) se descartan sus
+entradas para liberar memoria; las de versiones viejas que dejó otro proceso
+salen por el LRU o por el vencimiento.
+
+    @router.get("/{project_id}")
+    @cacheada("dashboard")
+    def get_dashboard(project_id: int, db: Session = Depends(get_db)): ...
+"""
+import functools
+import inspect
+import threading
+import time
+from collections import OrderedDict
+from config import settings
+from services import changes, data_version
+
+
+class ResultCache:
+    """LRU con vencimiento y contadores de aciertos/fallos por endpoint."""
+
+    def __init__(self, max_entradas: int, ttl: float = 0):
+        self.max_entradas = max_entradas
+        self.ttl = ttl
+        self._datos = OrderedDict()     # (endpoint, project_id, versión, params) → (vence, valor)
+        self._generacion = {}           # project_id → invalidaciones
+        self._epoca = 0                 # invalidaciones totales
+        self._contadores = {}           # endpoint → [aciertos, fallos]
+        self._lock = threading.Lock()
+
+    def _contar(self, endpoint: str, acierto: bool):
+        self._contadores.setdefault(endpoint, [0, 0])[0 if acierto else 1] += 1
+
+    def obtener(self, endpoint: str, project_id: int, version: int, params: tuple, calcular):
+        clave = (endpoint, project_id, version, params)
+        ahora = time.monotonic()
+        with self._lock:
+            entrada = self._datos.get(clave)
+            if entrada is not None and (entrada[0] is None or entrada[0] > ahora):
+                self._datos.move_to_end(clave)
+                self._contar(endpoint, True)
+                return entrada[1]
+            if entrada is not None:
+                del self._datos[clave]
+            self._contar(endpoint, False)
+            generacion = (self._epoca, self._generacion.get(project_id, 0))
+
+        valor = calcular()
+        if self.max_entradas <= 0:
+            return valor
+
+        with self._lock:
+            # Si hubo una escritura mientras se calculaba, el resultado puede ser viejo
+            if (self._epoca, self._generacion.get(project_id, 0)) == generacion:
+                vence = time.monotonic() + self.ttl if self.ttl > 0 else None
+                self._datos[clave] = (vence, valor)
+                self._datos.move_to_end(clave)
+                while len(self._datos) > self.max_entradas:
+                    self._datos.popitem(last=False)
+        return valor
+
+    def invalidar(self, project_ids=None):
+        """Descarta los resultados de los proyectos indicados (todos si no se indican)."""
+        with self._lock:
+            if project_ids is None:
+                self._datos.clear()
+                self._epoca += 1
+                return
+            ids = set(project_ids)
+            for pid in ids:
+                self._generacion[pid] = self._generacion.get(pid, 0) + 1
+            for clave in [k for k in self._datos if k[1] in ids]:
+                del self._datos[clave]
+
+    def estado(self) -> dict:
+        with self._lock:
+            por_endpoint = {ep: {"aciertos": a, "fallos": f} for ep, (a, f) in sorted(self._contadores.items())}
+            aciertos = sum(a for a, _ in self._contadores.values())
+            fallos = sum(f for _, f in self._contadores.values())
+            return {
+                "entradas": len(self._datos), "max_entradas": self.max_entradas,
+                "ttl": self.ttl or None,
+                "aciertos": aciertos, "fallos": fallos,
+                "tasa_aciertos": round(aciertos / (aciertos + fallos), 4) if aciertos + fallos else None,
+                "por_endpoint": por_endpoint,
+            }
+
+
+CACHE = ResultCache(settings.result_cache_size, settings.result_cache_ttl)
+
+
+@changes.on_commit
+def _invalidar(project_ids):
+    CACHE.invalidar(project_ids)
+
+
+def cacheada(endpoint: str):
+    """Decorador para rutas `fn(project_id, ..., db)`: la clave son el
+    project_id, su versión de datos y el resto de los argumentos salvo la
+    sesión. La firma se conserva para FastAPI; `fn.__wrapped__` calcula sin
+    caché."""
+    def decorador(fn):
+        firma = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        def envoltura(*args, **kwargs):
+            argumentos = firma.bind(*args, **kwargs)
+            argumentos.apply_defaults()
+            params = dict(argumentos.arguments)
+            db = params.pop("db")
+            project_id = params.pop("project_id")
+            return CACHE.obtener(endpoint, project_id, data_version.leida(db, project_id),
+                                 tuple(sorted(params.items())), lambda: fn(*args, **kwargs))
+        return envoltura
+    return decorador
+
+
+def estado() -> dict:
+    return CACHE.estado()
@@ -0,0 +1,26 @@
+import os, sys, tempfile, contextlib, io
+import pytest
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+# Base temporal: config y database leen DATABASE_URL al importarse
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'tests.db')}"
+
+
+@pytest.fixture(scope="session")
+def pid():
+    """Proyecto de seed_gobierno en la base temporal."""
+    import main   # rutas (sin el evento de arranque)
+    from database import SessionLocal, create_tables
+    from models.project import Project
+    create_tables()
+    with contextlib.redirect_stdout(io.StringIO()):
+        import seed_gobierno
+    with SessionLocal() as db:
+        return db.query(Project.id).order_by(Project.id).limit(1).scalar()
+
+
+@pytest.fixture
+def client(pid):
+    import main
+    from fastapi.testclient import TestClient
+    return TestClient(main.app)
@@ -0,0 +1,50 @@
+import datetime
+import openpyxl
+import pandas as pd
+from services.excel_parser import _Hoja, _lotes, _parse_comunidades
+
+
+def _hoja(**columnas):
+    n = len(next(iter(columnas.values())))
+    return _Hoja(pd.DataFrame(columnas, index=range(2, n + 2), dtype=object))
+
+
+def test_entero_trunca_texto_decimal_como_numero():
+    h = _hoja(tamanio=["12000.7", 12000.7, " 6 ", "-3.9", "1e3", 7])
+    assert h.entero("tamanio", 0) == [12000, 12000, 6, -3, 1000, 7]
+    assert h.reporte(6)["total_errores"] == 0
+
+
+def test_entero_no_numerico_queda_en_el_reporte():
+    h = _hoja(tamanio=["abc", None, "12000.7"])
+    assert h.entero("tamanio", 0) == [0, 0, 12000]
+    r = h.reporte(3)
+    assert r["total_errores"] == 1
+    assert r["errores"] == [{"fila": 2, "columna": "tamanio", "valor": "abc", "aplicado": 0}]
+
+
+def test_parse_comunidades_texto_decimal_en_columna_entera():
+    h = _hoja(nombre=["grupo"], tamanio=["12000.7"], influencia=["7.2"])
+    cols = _parse_comunidades(h, 1)
+    assert cols["tamanio_estimado"] == [12000]
+    assert cols["influencia"] == [7]
+
+
+def test_lotes_numera_filas_del_excel(tmp_path):
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.append(["Nombre ", "Fecha", "nombre"])
+    ws.append(["a", datetime.date(2026, 1, 2), "duplicada"])
+    ws.append([None, None, None])
+    ws.append(["b", "NA", None])
+    ws["A7"] = "c"
+    path = tmp_path / "libro.xlsx"
+    wb.save(path)
+
+    wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    (df,) = list(_lotes(wb.active))
+    wb.close()
+    assert list(df.columns) == ["nombre", "fecha"]
+    assert list(df.index) == [2, 4, 7]
+    assert df["nombre"].tolist() == ["a", "b", "c"]
+    assert df["fecha"].tolist() == [datetime.datetime(2026, 1, 2), None, None]
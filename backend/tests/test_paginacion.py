@@ -0,0 +1,22 @@
+import pytest
+from services.paginacion import _codificar
+
+
+@pytest.mark.parametrize("valores", [[{"a": 1}, 3], ["x", "y", 1], [True, 1, 1], [0, 1.5, 1], [0, 1]])
+def test_cursor_con_valores_de_otro_tipo(client, pid, valores):
+    r = client.get(f"/api/risks/{pid}", params={"cursor": _codificar(valores)})
+    assert r.status_code == 400
+    assert r.json()["detail"] == "Cursor inválido"
+
+
+def test_cursor_siguiente_recorre_todo(client, pid):
+    completo = client.get(f"/api/risks/{pid}").json()
+    filas, params = [], {"limit": 2}
+    while True:
+        r = client.get(f"/api/risks/{pid}", params=params)
+        assert r.status_code == 200
+        filas += r.json()
+        if "x-next-cursor" not in r.headers:
+            break
+        params["cursor"] = r.headers["x-next-cursor"]
+    assert filas == completo
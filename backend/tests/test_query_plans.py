@@ -0,0 +1,18 @@
+import check_query_plans as planes
+
+
+def test_rutas_usan_indices(client, pid):
+    capturadas, fallas = planes.chequear(client, pid)
+    assert capturadas
+    assert [(ruta, problema) for ruta, problema, _, _ in fallas] == []
+
+
+def test_detecta_recorrido_completo_y_orden_aparte():
+    fallas = planes.revisar([
+        ("/a", False, "SELECT id FROM narratives WHERE texto = ?", ("x",)),
+        ("/b", True, "SELECT id FROM narratives WHERE project_id = ? ORDER BY texto LIMIT ?", (1, 10)),
+    ])
+    assert [(ruta, problema) for ruta, problema, _, _ in fallas] == [
+        ("/a", "recorre toda la tabla narratives"),
+        ("/b", "ordena la página fuera del índice"),
+    ]
@@ -0,0 +1,32 @@
+import datetime
+from database import SessionLocal
+from models.risk import Risk
+from services import changes, result_cache
+
+
+def _escritura_de_otro_worker(monkeypatch, pid):
+    # El commit de otro proceso no avisa a la caché de este
+    monkeypatch.setattr(changes, "_AL_CONFIRMAR",
+                        [f for f in changes._AL_CONFIRMAR if f is not result_cache._invalidar])
+    with SessionLocal() as db:
+        db.add(Risk(project_id=pid, tema="Riesgo nuevo", nivel="rojo", velocidad_crecimiento=5,
+                    fecha_deteccion=datetime.date(2026, 3, 1)))
+        db.commit()
+
+
+def test_escritura_en_otro_worker_no_deja_cuerpo_viejo(client, pid, monkeypatch):
+    antes = client.get(f"/api/dashboard/{pid}")
+    assert antes.status_code == 200
+    etag = antes.headers["etag"]
+    assert client.get(f"/api/dashboard/{pid}", headers={"If-None-Match": etag}).status_code == 304
+
+    _escritura_de_otro_worker(monkeypatch, pid)
+
+    despues = client.get(f"/api/dashboard/{pid}", headers={"If-None-Match": etag})
+    assert despues.status_code == 200
+    assert despues.headers["etag"] != etag
+    assert despues.json() != antes.json()
+    # El cuerpo nuevo queda guardado con el ETag nuevo
+    assert client.get(f"/api/dashboard/{pid}",
+                      headers={"If-None-Match": despues.headers["etag"]}).status_code == 304
+    assert client.get(f"/api/dashboard/{pid}").json() == despues.json()
@@ -14,4 +14,16 @@ api.interceptors.response.use(
   }
 )
 
+// Listados paginados por cursor: sigue X-Next-Cursor hasta juntar todas las filas
+export async function listarTodo(url, params = {}) {
+  const filas = []
+  let cursor = null
+  do {
+    const res = await api.get(url, { params: cursor ? { ...params, cursor } : params })
+    filas.push(...res.data)
+    cursor = res.headers['x-next-cursor']
+  } while (cursor)
+  return filas
+}
+
 export default api
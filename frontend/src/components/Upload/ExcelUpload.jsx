@@ -1,4 +1,4 @@
-import { useCallback, useState } from 'react'
+import { useCallback, useEffect, useRef, useState } from 'react'
 import { useDropzone } from 'react-dropzone'
 import api from '../../api/client'
 
@@ -6,29 +6,53 @@ export default function ExcelUpload({ projectId, onSuccess }) {
   const [uploading, setUploading] = useState(false)
   const [result, setResult] = useState(null)
   const [error, setError] = useState(null)
+  const [soloValidar, setSoloValidar] = useState(false)
+  const [trabajo, setTrabajo] = useState(null)
+  const montado = useRef(true)
+
+  useEffect(() => () => { montado.current = false }, [])
 
   const onDrop = useCallback(async (files) => {
     if (!files.length || !projectId) return
     const file = files[0]
-    setUploading(true); setResult(null); setError(null)
+    setUploading(true); setResult(null); setError(null); setTrabajo(null)
     const form = new FormData()
     form.append('file', file)
     try {
-      const { data } = await api.post(`/upload/${projectId}`, form, {
-        headers: { 'Content-Type': 'multipart/form-data' }
+      // La subida no tiene timeout; la importación corre como trabajo y se consulta su avance
+      let { data: job } = await api.post(`/upload/${projectId}`, form, {
+        headers: { 'Content-Type': 'multipart/form-data' },
+        params: soloValidar ? { dry_run: true } : undefined,
+        timeout: 0
       })
-      setResult(data.importados)
-      onSuccess?.()
+      while (montado.current && (job.estado === 'en_cola' || job.estado === 'en_curso')) {
+        setTrabajo(job)
+        await new Promise(r => setTimeout(r, 1000))
+        job = (await api.get(`/upload/jobs/${job.id}`)).data
+      }
+      if (job.estado === 'completo') {
+        setResult(job.resultado)
+        if (!job.dry_run) onSuccess?.()
+      } else if (job.estado === 'cancelado') {
+        setError('Importación cancelada: no se guardó ningún dato')
+      } else if (job.estado === 'error') {
+        setError(job.error)
+      }
     } catch (e) {
       setError(e.message)
     } finally {
-      setUploading(false)
+      setUploading(false); setTrabajo(null)
     }
-  }, [projectId, onSuccess])
+  }, [projectId, onSuccess, soloValidar])
+
+  const cancelar = async () => {
+    if (!trabajo) return
+    try { await api.post(`/upload/jobs/${trabajo.id}/cancel`) } catch (e) { setError(e.message) }
+  }
 
   const { getRootProps, getInputProps, isDragActive } = useDropzone({
-    onDrop, accept: { 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet': ['.xlsx'], 'application/vnd.ms-excel': ['.xls'] },
-    multiple: false
+    onDrop, accept: { 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet': ['.xlsx'] },
+    multiple: false, disabled: uploading
   })
 
   const downloadTemplate = async () => {
@@ -47,6 +71,10 @@ export default function ExcelUpload({ projectId, onSuccess }) {
         <button className="btn btn-outline btn-sm" onClick={downloadTemplate}>
           📥 Descargar template Excel
         </button>
+        <label style={{ fontSize: 13, color: 'var(--muted)', display: 'flex', gap: 6, alignItems: 'center', marginLeft: 'auto' }}>
+          <input type="checkbox" checked={soloValidar} onChange={e => setSoloValidar(e.target.checked)} />
+          Sólo validar (no importa)
+        </label>
       </div>
 
       <div
@@ -63,25 +91,68 @@ export default function ExcelUpload({ projectId, onSuccess }) {
       >
         <input {...getInputProps()} />
         {uploading
-          ? <><div className="loader" style={{ margin: '0 auto 8px' }} /><p style={{ fontSize: 13, color: 'var(--muted)' }}>Importando datos...</p></>
+          ? <>
+              <div className="loader" style={{ margin: '0 auto 8px' }} />
+              <p style={{ fontSize: 13, color: 'var(--muted)' }}>
+                {!trabajo ? 'Subiendo archivo...'
+                  : trabajo.estado === 'en_cola' ? `En cola: ${trabajo.posicion} importación(es) antes en este proyecto`
+                  : `Importando datos... ${trabajo.filas.toLocaleString()} filas${trabajo.filas_por_segundo ? ` · ${trabajo.filas_por_segundo.toLocaleString()} filas/s` : ''}`}
+              </p>
+              {trabajo && Object.entries(trabajo.hojas).map(([hoja, h]) => (
+                <p key={hoja} style={{ fontSize: 11, color: 'var(--muted)', marginTop: 2 }}>
+                  {hoja}: {h.filas.toLocaleString()} filas
+                  {h.filas_hoja ? ` (${Math.min(100, Math.round(100 * h.fila_actual / h.filas_hoja))}%)` : ''}
+                  {h.total_errores ? ` · ${h.total_errores} celdas inválidas` : ''}
+                </p>
+              ))}
+            </>
           : <>
               <div style={{ fontSize: 32, marginBottom: 8 }}>📂</div>
               <p style={{ fontSize: 13, color: 'var(--text)' }}>
                 {isDragActive ? 'Suelta el archivo aquí' : 'Arrastra tu Excel aquí o haz clic para seleccionar'}
               </p>
-              <p style={{ fontSize: 11, color: 'var(--muted)', marginTop: 4 }}>Acepta .xlsx / .xls con las hojas del template</p>
+              <p style={{ fontSize: 11, color: 'var(--muted)', marginTop: 4 }}>Acepta .xlsx con las hojas del template</p>
             </>
         }
       </div>
 
+      {trabajo && (
+        <button className="btn btn-outline btn-sm" style={{ marginTop: 8 }} onClick={cancelar}>
+          ✕ Cancelar importación
+        </button>
+      )}
+
       {result && (
         <div style={{ marginTop: 12, padding: '12px 16px', background: 'rgba(86,197,150,.1)', border: '1px solid var(--success)', borderRadius: 8 }}>
-          <p style={{ fontSize: 13, color: 'var(--success)', fontWeight: 600, marginBottom: 6 }}>✓ Importación exitosa</p>
+          <p style={{ fontSize: 13, color: 'var(--success)', fontWeight: 600, marginBottom: 6 }}>
+            {result.dry_run ? '✓ Validación completa (no se importó nada)' : '✓ Importación exitosa'}
+          </p>
           <div style={{ display: 'flex', flexWrap: 'wrap', gap: 8 }}>
-            {Object.entries(result).map(([k, v]) => (
+            {Object.entries(result.importados).map(([k, v]) => (
               <span key={k} className="badge badge-green">{k}: {v}</span>
             ))}
           </div>
+          {result.filas_por_segundo != null && (
+            <p style={{ fontSize: 11, color: 'var(--muted)', marginTop: 6 }}>
+              {result.segundos} s · {result.filas_por_segundo.toLocaleString()} filas/s
+            </p>
+          )}
+          {Object.entries(result.validacion || {}).filter(([, v]) => v.total_errores || v.omitidas).map(([hoja, v]) => (
+            <details key={hoja} style={{ marginTop: 8, fontSize: 12 }}>
+              <summary style={{ cursor: 'pointer', color: 'var(--text)' }}>
+                {hoja}: {v.total_errores} celdas inválidas · {v.omitidas} filas sin clave omitidas
+              </summary>
+              <table style={{ width: '100%', marginTop: 6, fontSize: 11 }}>
+                <thead><tr><th>Fila</th><th>Columna</th><th>Valor</th><th>Se usó</th></tr></thead>
+                <tbody>
+                  {v.errores.slice(0, 50).map((e, i) => (
+                    <tr key={i}><td>{e.fila}</td><td>{e.columna}</td><td>{String(e.valor)}</td><td>{e.aplicado ?? '—'}</td></tr>
+                  ))}
+                </tbody>
+              </table>
+              {v.total_errores > 50 && <p style={{ color: 'var(--muted)' }}>… y {v.total_errores - 50} más</p>}
+            </details>
+          ))}
         </div>
       )}
       {error && (
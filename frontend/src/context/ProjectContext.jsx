@@ -1,5 +1,5 @@
 import { createContext, useContext, useState, useEffect } from 'react'
-import api from '../api/client'
+import { listarTodo } from '../api/client'
 
 const ProjectContext = createContext(null)
 
@@ -10,7 +10,7 @@ export function ProjectProvider({ children }) {
 
   const loadProjects = async () => {
     try {
-      const { data } = await api.get('/projects/')
+      const data = await listarTodo('/projects/')
       setProjects(data)
       // Restaurar proyecto activo desde localStorage
       const saved = localStorage.getItem('etno_active_project')
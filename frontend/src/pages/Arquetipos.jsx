@@ -1,5 +1,5 @@
 import { useState, useEffect } from 'react'
-import api from '../api/client'
+import api, { listarTodo } from '../api/client'
 import { useProject } from '../context/ProjectContext'
 import { useRole } from '../context/RoleContext'
 
@@ -14,7 +14,7 @@ export default function Arquetipos() {
   const [editItem, setEditItem] = useState(null)
   const [form, setForm] = useState({ nombre: '', descripcion: '', peso_relativo: 0, emocion_dominante: '', canales: [], valores_clave: '', miedos: '' })
 
-  const load = () => activeProject && api.get(`/archetypes/${activeProject.id}`).then(r => setItems(r.data)).catch(console.error)
+  const load = () => activeProject && listarTodo(`/archetypes/${activeProject.id}`).then(setItems).catch(console.error)
   useEffect(() => { load() }, [activeProject])
 
   const openCreate = () => { setEditItem(null); setForm({ nombre: '', descripcion: '', peso_relativo: 0, emocion_dominante: '', canales: [], valores_clave: '', miedos: '' }); setShowForm(true) }
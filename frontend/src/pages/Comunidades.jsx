@@ -1,5 +1,5 @@
 import { useState, useEffect } from 'react'
-import api from '../api/client'
+import api, { listarTodo } from '../api/client'
 import { useProject } from '../context/ProjectContext'
 import { useRole } from '../context/RoleContext'
 
@@ -14,7 +14,7 @@ export default function Comunidades() {
   const [editItem, setEditItem] = useState(null)
   const [form, setForm] = useState({ plataforma: '', nombre_grupo: '', tipo: 'activo', tamanio_estimado: '', descripcion: '', influencia: 5 })
 
-  const load = () => activeProject && api.get(`/communities/${activeProject.id}`).then(r => setItems(r.data)).catch(console.error)
+  const load = () => activeProject && listarTodo(`/communities/${activeProject.id}`).then(setItems).catch(console.error)
   useEffect(() => { load() }, [activeProject])
 
   const openCreate = () => { setEditItem(null); setForm({ plataforma: '', nombre_grupo: '', tipo: 'activo', tamanio_estimado: '', descripcion: '', influencia: 5 }); setShowForm(true) }
@@ -1,7 +1,7 @@
 import { useState, useEffect } from 'react'
 import { RadarChart, Radar, PolarGrid, PolarAngleAxis, ResponsiveContainer,
          BarChart, Bar, XAxis, YAxis, CartesianGrid, Tooltip, Cell } from 'recharts'
-import api from '../api/client'
+import api, { listarTodo } from '../api/client'
 import { useProject } from '../context/ProjectContext'
 import { useRole } from '../context/RoleContext'
 
@@ -19,7 +19,7 @@ export default function Emociones() {
 
   const load = () => {
     if (!activeProject) return
-    api.get(`/emotions/${activeProject.id}`).then(r => setItems(r.data)).catch(console.error)
+    listarTodo(`/emotions/${activeProject.id}`).then(setItems).catch(console.error)
     api.get(`/emotions/${activeProject.id}/radar`).then(r => setRadar(r.data)).catch(console.error)
   }
   useEffect(() => { load() }, [activeProject])
@@ -3,7 +3,7 @@ import {
   BarChart, Bar, XAxis, YAxis, CartesianGrid, Tooltip,
   Cell, LabelList, ResponsiveContainer
 } from 'recharts'
-import api from '../api/client'
+import api, { listarTodo } from '../api/client'
 import { useProject } from '../context/ProjectContext'
 import { useRole } from '../context/RoleContext'
 
@@ -98,7 +98,7 @@ export default function Lenguaje() {
 
   const load = () => {
     if (!activeProject) return
-    api.get(`/language/${activeProject.id}`).then(r => setItems(r.data)).catch(console.error)
+    listarTodo(`/language/${activeProject.id}`).then(setItems).catch(console.error)
   }
   useEffect(() => { load() }, [activeProject])
 
@@ -1,5 +1,5 @@
 import { useState, useEffect } from 'react'
-import api from '../api/client'
+import api, { listarTodo } from '../api/client'
 import { useProject } from '../context/ProjectContext'
 import { useRole } from '../context/RoleContext'
 
@@ -15,7 +15,7 @@ export default function Narrativas() {
   const [filter, setFilter]     = useState('')
   const [form, setForm] = useState({ texto: '', tipo: 'dominante', actor_politico: '', fecha_deteccion: '', peso: 5 })
 
-  const load = () => activeProject && api.get(`/narratives/${activeProject.id}`).then(r => setItems(r.data)).catch(console.error)
+  const load = () => activeProject && listarTodo(`/narratives/${activeProject.id}`).then(setItems).catch(console.error)
   useEffect(() => { load() }, [activeProject])
 
   const openCreate = () => { setEditItem(null); setForm({ texto: '', tipo: 'dominante', actor_politico: '', fecha_deteccion: '', peso: 5 }); setShowForm(true) }
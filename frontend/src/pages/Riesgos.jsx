@@ -1,5 +1,5 @@
 import { useState, useEffect } from 'react'
-import api from '../api/client'
+import api, { listarTodo } from '../api/client'
 import { useProject } from '../context/ProjectContext'
 import { useRole } from '../context/RoleContext'
 
@@ -17,7 +17,7 @@ export default function Riesgos() {
   const [editItem, setEditItem] = useState(null)
   const [form, setForm] = useState({ tema: '', descripcion: '', nivel: 'amarillo', velocidad_crecimiento: 3, fecha_deteccion: '', activo: true })
 
-  const load = () => activeProject && api.get(`/risks/${activeProject.id}`).then(r => setItems(r.data)).catch(console.error)
+  const load = () => activeProject && listarTodo(`/risks/${activeProject.id}`).then(setItems).catch(console.error)
   useEffect(() => { load() }, [activeProject])
 
   const openCreate = () => { setEditItem(null); setForm({ tema: '', descripcion: '', nivel: 'amarillo', velocidad_crecimiento: 3, fecha_deteccion: '', activo: true }); setShowForm(true) }